@@ -0,0 +1,308 @@
+"""基于本地禅道模拟服务的端到端拉取基准
+
+用法: python benchmarks/bench_fetch.py [--bugs 10000] [--polls 5] [--modes cli,sync,api] [--json]
+                                     [--output result.json] [--baseline previous.json]
+
+在子进程中启动 benchmarks/zentao_stub.py，分别以 CLI(async with BugFetcherCore)、
+同步包装(*_sync) 和 API(uvicorn + GET /api/bugs) 三种方式连续轮询，统计每次轮询的
+耗时分位数、首次全量拉取吞吐、峰值内存(tracemalloc)和每次轮询的上游请求数。
+两次轮询之间通过 /_stub/touch 编辑若干Bug，以覆盖增量同步路径。
+"""
+import os
+import sys
+import json
+import time
+import socket
+import contextlib
+import asyncio
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bugfetcher.core import BugFetcherCore  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float = 30) -> None:
+    async def probe() -> None:
+        deadline = time.monotonic() + timeout
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.get(url) as response:
+                        if response.status < 500:
+                            return
+                except aiohttp.ClientError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{url} did not come up in {timeout}s")
+                await asyncio.sleep(0.1)
+
+    asyncio.run(probe())
+
+
+def stub_call(base_url: str, method: str, path: str) -> Dict:
+    async def call() -> Dict:
+        async with aiohttp.ClientSession() as session:
+            async with session.request(method, f"{base_url}{path}") as response:
+                return await response.json()
+
+    return asyncio.run(call())
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class StubProcess:
+    """在子进程中运行的禅道模拟服务，避免其CPU和内存计入被测进程"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.command = [
+            sys.executable, os.path.join(ROOT, "benchmarks", "zentao_stub.py"),
+            "--port", str(self.port),
+            "--bugs", str(args.bugs),
+            "--latency-ms", str(args.latency_ms),
+            "--error-rate", str(args.error_rate),
+            "--unauthorized-rate", str(args.unauthorized_rate),
+        ]
+        self.proc: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "StubProcess":
+        self.proc = subprocess.Popen(self.command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        wait_for(f"{self.base_url}/_stub/stats")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.proc.terminate()
+        self.proc.wait(timeout=10)
+
+    def requests(self) -> int:
+        return stub_call(self.base_url, "get", "/_stub/stats")["total"]
+
+    def touch(self, count: int) -> None:
+        if count:
+            stub_call(self.base_url, "post", f"/_stub/touch?count={count}")
+
+
+def write_config(directory: str, stub: StubProcess, args: argparse.Namespace) -> str:
+    config_path = os.path.join(directory, "config.json")
+    with open(config_path, "w") as f:
+        json.dump({
+            "zentao_url": stub.base_url,
+            "zentao_username": "admin",
+            "zentao_password": "admin",
+            "feishu_webhook_url": f"{stub.base_url}/feishu/webhook",
+            "selected_product_id": "1",
+            "bug_page_size": args.page_size,
+            "bug_store_enabled": args.store,
+            "bug_store_path": os.path.join(directory, "bugs.db"),
+            "feishu_spool_dir": os.path.join(directory, "feishu_spool"),
+            # 基准测量的是每次轮询的真实上游开销，关闭接口微缓存和后台调度
+            "api_cache_ttls": {"/api/bugs": 0},
+            "scheduler_enabled": False,
+        }, f)
+    return config_path
+
+
+def run_polls(stub: StubProcess, args: argparse.Namespace, poll: Callable[[], Dict]) -> Dict:
+    """执行 args.polls 次轮询，统计耗时、请求数和峰值内存"""
+    durations: List[float] = []
+    requests: List[int] = []
+    failures = 0
+    bug_counts: List[int] = []
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        for index in range(args.polls):
+            if index:
+                stub.touch(args.edits)
+            before = stub.requests()
+            started = time.perf_counter()
+            result = poll()
+            durations.append(time.perf_counter() - started)
+            requests.append(stub.requests() - before)
+            if result.get("status") != "success":
+                failures += 1
+            bug_counts.append(len(result.get("bugs", [])))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "polls": len(durations),
+        "failures": failures,
+        "first_poll_s": round(durations[0], 4),
+        "first_poll_bugs_per_s": round(args.bugs / durations[0], 1) if durations[0] else None,
+        "p50_s": round(percentile(durations, 0.5), 4),
+        "p99_s": round(percentile(durations, 0.99), 4),
+        "mean_s": round(statistics.mean(durations), 4),
+        "requests_per_poll": requests,
+        "requests_first_poll": requests[0],
+        "requests_incremental_mean": round(statistics.mean(requests[1:]), 2) if len(requests) > 1 else None,
+        "my_bugs": bug_counts[-1] if bug_counts else 0,
+        "peak_memory_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def bench_cli(stub: StubProcess, args: argparse.Namespace, config_path: str) -> Dict:
+    """CLI 模式：一个事件循环内复用同一个 BugFetcherCore"""
+    loop = asyncio.new_event_loop()
+    fetcher = BugFetcherCore(config_path)
+    try:
+        loop.run_until_complete(fetcher.get_zentao_token())
+        return run_polls(stub, args, lambda: loop.run_until_complete(fetcher.fetch_new_bugs()))
+    finally:
+        loop.run_until_complete(fetcher.close())
+        fetcher.close_store()
+        loop.close()
+
+
+def bench_sync(stub: StubProcess, args: argparse.Namespace, config_path: str) -> Dict:
+    """同步包装模式：GUI 使用的 *_sync 接口"""
+    fetcher = BugFetcherCore(config_path)
+    try:
+        fetcher.get_zentao_token_sync()
+        return run_polls(stub, args, fetcher.fetch_new_bugs_sync)
+    finally:
+        fetcher.close_sync()
+        fetcher.close_store()
+
+
+def bench_api(stub: StubProcess, args: argparse.Namespace, config_path: str) -> Dict:
+    """API 模式：进程内 uvicorn，客户端请求 GET /api/bugs"""
+    import uvicorn
+    from bugfetcher.api import app
+
+    port = free_port()
+    api_url = f"http://127.0.0.1:{port}"
+    # lifespan 中的核心实例从工作目录读取 config.json
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(config_path))
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    loop = asyncio.new_event_loop()
+    session: Optional[aiohttp.ClientSession] = None
+    try:
+        wait_for(f"{api_url}/api/status")
+        session = loop.run_until_complete(_make_session())
+
+        async def request(method: str, path: str) -> Dict:
+            async with session.request(method, f"{api_url}{path}") as response:
+                return await response.json()
+
+        loop.run_until_complete(request("post", "/api/login"))
+        return run_polls(stub, args, lambda: loop.run_until_complete(request("get", "/api/bugs")))
+    finally:
+        if session is not None:
+            loop.run_until_complete(session.close())
+        loop.close()
+        server.should_exit = True
+        thread.join(timeout=10)
+        os.chdir(cwd)
+
+
+async def _make_session() -> aiohttp.ClientSession:
+    return aiohttp.ClientSession()
+
+
+MODES = {"cli": bench_cli, "sync": bench_sync, "api": bench_api}
+
+
+def compare(result: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """与基线比较 p50 耗时和每次轮询请求数，返回超出阈值的回归项"""
+    regressions = []
+    for mode, current in result["modes"].items():
+        previous = baseline.get("modes", {}).get(mode)
+        if not previous:
+            continue
+        for metric in ("p50_s", "first_poll_s", "peak_memory_mb", "requests_first_poll"):
+            old, new = previous.get(metric), current.get(metric)
+            if old and new and new > old * (1 + max_regression):
+                regressions.append(f"{mode}.{metric}: {old} -> {new}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end fetch benchmark against a local ZenTao stub")
+    parser.add_argument("--bugs", type=int, default=10000, help="Bugs in the stub product (10k-1M)")
+    parser.add_argument("--polls", type=int, default=5)
+    parser.add_argument("--edits", type=int, default=20, help="Bugs edited between polls")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--unauthorized-rate", type=float, default=0)
+    parser.add_argument("--store", action="store_true", help="Enable the local SQLite bug store")
+    parser.add_argument("--modes", default="cli,sync,api")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"Unknown modes: {', '.join(sorted(unknown))}")
+
+    result = {
+        "benchmark": "fetch_end_to_end",
+        "params": {
+            key: getattr(args, key)
+            for key in ("bugs", "polls", "edits", "page_size", "latency_ms", "error_rate", "unauthorized_rate", "store")
+        },
+        "modes": {},
+    }
+    # BugFetcherCore 的日志同时打印到控制台，测量期间屏蔽
+    with StubProcess(args) as stub, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for mode in modes:
+            # 每个模式使用独立的配置目录，避免本地存储和令牌互相影响
+            with tempfile.TemporaryDirectory() as directory:
+                config_path = write_config(directory, stub, args)
+                result["modes"][mode] = MODES[mode](stub, args, config_path)
+
+    regressions: List[str] = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.max_regression)
+        result["regressions"] = regressions
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for mode, stats in result["modes"].items():
+            print(
+                f"{mode:<5} first {stats['first_poll_s']:.3f}s ({stats['first_poll_bugs_per_s']} bugs/s)  "
+                f"p50 {stats['p50_s']:.3f}s  p99 {stats['p99_s']:.3f}s  "
+                f"requests {stats['requests_per_poll']}  peak {stats['peak_memory_mb']} MB  "
+                f"failures {stats['failures']}"
+            )
+        for regression in regressions:
+            print(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Bug 记录模型与原始禅道字典的内存基准
+
+用法: python benchmarks/bench_models.py [--bugs 100000] [--page-size 500] [--json]
+
+按禅道Bug接口的真实字段数(约40个，含 openedBy/assignedTo 等嵌套对象)生成分页JSON，
+分别以原始字典(json.loads 后整页保留)、Bug 记录(逐页解析后丢弃原始数据)和流式解析的
+Bug 记录(按 64KB 块增量解析，不构建整页对象树)三种方式常驻全部Bug，比较常驻内存、
+峰值内存、每个Bug的字节数、GC跟踪对象数、完整GC耗时和解析耗时。
+"""
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bugfetcher.core.stream import JSONArrayParser  # noqa: E402
+from bugfetcher.models import Bug  # noqa: E402
+
+ACCOUNTS = [f"user{i}" for i in range(50)]
+STATUSES = ["active", "resolved", "closed"]
+
+
+def user(account: str) -> Dict:
+    return {"id": ACCOUNTS.index(account) + 1, "account": account, "avatar": "", "realname": account.title()}
+
+
+def zentao_bug(bug_id: int) -> Dict:
+    """与禅道 /products/{id}/bugs 返回结构相近的Bug"""
+    opened = ACCOUNTS[bug_id % len(ACCOUNTS)]
+    assigned = ACCOUNTS[(bug_id * 7) % len(ACCOUNTS)]
+    status = STATUSES[bug_id % len(STATUSES)]
+    date = f"2024-{bug_id % 12 + 1:02d}-{bug_id % 28 + 1:02d} 10:{bug_id % 60:02d}:00"
+    return {
+        "id": bug_id, "project": 3, "product": 1, "injection": 0, "identify": 0, "branch": 0,
+        "module": bug_id % 40, "execution": 12, "plan": 0, "story": 0, "storyVersion": 1, "task": 0,
+        "toTask": 0, "toStory": 0, "title": f"Bug {bug_id}: button does not respond on settings page",
+        "keywords": "", "severity": bug_id % 4 + 1, "pri": bug_id % 4 + 1, "type": "codeerror",
+        "os": "", "browser": "", "hardware": "", "found": "", "steps": "<p>[步骤]</p><p>[结果]</p><p>[期望]</p>",
+        "status": status, "subStatus": "", "color": "", "confirmed": 1, "activatedCount": 0,
+        "activatedDate": None, "feedbackBy": "", "notifyEmail": "", "mailto": [],
+        "openedBy": user(opened), "openedDate": date, "openedBuild": "trunk",
+        "assignedTo": user(assigned), "assignedDate": date, "deadline": None,
+        "resolvedBy": user(assigned) if status != "active" else None, "resolution": "fixed" if status != "active" else "",
+        "resolvedBuild": "", "resolvedDate": date if status != "active" else None,
+        "closedBy": None, "closedDate": None, "duplicateBug": 0, "linkBug": "", "case": 0, "caseVersion": 1,
+        "result": 0, "repo": 0, "entry": "", "lines": "", "v1": "", "v2": "", "repoType": "", "testtask": 0,
+        "lastEditedBy": user(opened), "lastEditedDate": date, "deleted": False,
+    }
+
+
+def make_pages(bugs: int, page_size: int) -> List[bytes]:
+    pages = []
+    for start in range(1, bugs + 1, page_size):
+        items = [zentao_bug(bug_id) for bug_id in range(start, min(start + page_size, bugs + 1))]
+        pages.append(json.dumps({"page": len(pages) + 1, "total": bugs, "limit": page_size, "bugs": items}).encode())
+    return pages
+
+
+def load_dicts(pages: List[bytes]) -> List:
+    bugs: List = []
+    for page in pages:
+        bugs.extend(json.loads(page)["bugs"])
+    return bugs
+
+
+def load_records(pages: List[bytes]) -> List:
+    bugs: List = []
+    for page in pages:
+        bugs.extend(Bug.from_zentao(item) for item in json.loads(page)["bugs"])
+    return bugs
+
+
+def load_streamed(pages: List[bytes], chunk_size: int = 64 * 1024) -> List:
+    bugs: List = []
+    for page in pages:
+        parser = JSONArrayParser("bugs")
+        for start in range(0, len(page), chunk_size):
+            bugs.extend(Bug.from_zentao(item) for item in parser.feed(page[start:start + chunk_size]))
+        bugs.extend(Bug.from_zentao(item) for item in parser.close())
+    return bugs
+
+
+def measure(pages: List[bytes], load: Callable[[List[bytes]], List]) -> Dict:
+    gc.collect()
+    tracked_before = len(gc.get_objects())
+    tracemalloc.start()
+    started = time.perf_counter()
+    bugs = load(pages)
+    parse_s = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tracked = len(gc.get_objects()) - tracked_before
+    started = time.perf_counter()
+    gc.collect()
+    gc_s = time.perf_counter() - started
+    result = {
+        "bugs": len(bugs),
+        "resident_mb": round(current / 1024 / 1024, 2),
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "bytes_per_bug": round(current / max(1, len(bugs))),
+        "gc_tracked_objects": tracked,
+        "full_gc_ms": round(gc_s * 1000, 2),
+        "parse_s": round(parse_s, 3),
+    }
+    del bugs
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Memory footprint of Bug records vs raw ZenTao dicts")
+    parser.add_argument("--bugs", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    pages = make_pages(args.bugs, args.page_size)
+    result = {
+        "benchmark": "bug_model_memory",
+        "params": {"bugs": args.bugs, "page_size": args.page_size},
+        "modes": {
+            "dict": measure(pages, load_dicts),
+            "record": measure(pages, load_records),
+            "stream": measure(pages, load_streamed),
+        },
+    }
+    dicts, records = result["modes"]["dict"], result["modes"]["record"]
+    result["memory_ratio"] = round(dicts["resident_mb"] / records["resident_mb"], 1) if records["resident_mb"] else None
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for mode, stats in result["modes"].items():
+            print(
+                f"{mode:<6} resident {stats['resident_mb']} MB ({stats['bytes_per_bug']} B/bug)  "
+                f"peak {stats['peak_mb']} MB  gc objects {stats['gc_tracked_objects']}  "
+                f"full gc {stats['full_gc_ms']} ms  parse {stats['parse_s']}s"
+            )
+        print(f"dict / record resident memory: {result['memory_ratio']}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
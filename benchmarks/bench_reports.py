@@ -0,0 +1,138 @@
+"""Bug统计报表的耗时基准
+
+用法: python benchmarks/bench_reports.py [--bugs 1000000] [--repeat 3] [--changed 0.01] [--json]
+
+随机生成一年内创建的Bug快照(5个产品、200个指派人、300个模块、4个严重程度，约70%已解决，
+均为 Bug 记录)，分别用 NumPy(已安装时)和标准库实现计算一个月的报表，按 bug_report 的实际路径计时：
+cold         首次生成报表：快照转为列 + 聚合
+incremental  快照中 --changed 比例的Bug变更后：增量更新列 + 聚合
+aggregate    列已就绪时只做聚合
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import datetime
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bugfetcher.analytics import BugColumns, build_report, report_period  # noqa: E402
+from bugfetcher.analytics.analytics import _NumpyOps, _PythonOps, np  # noqa: E402
+from bugfetcher.models import Bug  # noqa: E402
+
+PRODUCTS = 5
+ASSIGNEES = 200
+MODULES = 300
+SEVERITIES = 4
+START = datetime.datetime(2024, 1, 1)
+
+
+def make_bug(bug_id: int, product: str, rng: random.Random) -> Bug:
+    opened = START + datetime.timedelta(seconds=rng.randrange(365 * 86400))
+    resolved = opened + datetime.timedelta(seconds=rng.randrange(60 * 86400)) if rng.random() < 0.7 else None
+    account = f"user{rng.randrange(ASSIGNEES)}"
+    return Bug(
+        bug_id,
+        status="resolved" if resolved else "active",
+        severity=rng.randrange(1, SEVERITIES + 1),
+        assigned_account=account,
+        assigned_realname=account.title(),
+        opened_date=str(opened),
+        resolved_date=str(resolved) if resolved else "0000-00-00 00:00:00",
+        product=int(product),
+        module=rng.randrange(MODULES),
+    )
+
+
+def make_snapshots(bugs: int, seed: int = 1) -> Dict[str, Dict[int, Bug]]:
+    """产品ID -> {Bug ID: Bug}，与 BugSnapshot.bugs 相同"""
+    rng = random.Random(seed)
+    snapshots: Dict[str, Dict[int, Bug]] = {str(product): {} for product in range(1, PRODUCTS + 1)}
+    for bug_id in range(bugs):
+        product = str(bug_id % PRODUCTS + 1)
+        snapshots[product][bug_id] = make_bug(bug_id, product, rng)
+    return snapshots
+
+
+def change_bugs(snapshots: Dict[str, Dict[int, Bug]], ratio: float, seed: int) -> Dict[str, Dict[int, Bug]]:
+    """复制快照并替换 ratio 比例的Bug对象，模拟一次增量同步"""
+    rng = random.Random(seed)
+    changed = {product: dict(bugs) for product, bugs in snapshots.items()}
+    for product, bugs in changed.items():
+        for bug_id in rng.sample(list(bugs), int(len(bugs) * ratio)):
+            bugs[bug_id] = make_bug(bug_id, product, rng)
+    return changed
+
+
+def update(columns: BugColumns, snapshots: Dict[str, Dict[int, Bug]]) -> BugColumns:
+    for product, bugs in snapshots.items():
+        columns.update(product, bugs)
+    return columns
+
+
+def timed(run: Callable[[], None], prepare: Callable[[], None], repeat: int) -> Dict:
+    timings: List[float] = []
+    for _ in range(repeat):
+        prepare()
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return {"best_ms": round(min(timings) * 1000, 1), "mean_ms": round(sum(timings) / len(timings) * 1000, 1)}
+
+
+def measure(snapshots: Dict, changed: List[Dict], backend, repeat: int) -> Dict:
+    since, until = report_period("2024-12")
+    state = {"columns": None, "round": 0}
+
+    def report(columns: BugColumns) -> None:
+        build_report(columns, since, until, backend=backend)
+
+    def cold() -> None:
+        report(update(BugColumns(), snapshots))
+
+    def prepare_incremental() -> None:
+        state["columns"] = update(BugColumns(), snapshots)
+
+    def incremental() -> None:
+        report(update(state["columns"], changed[state["round"]]))
+        state["round"] += 1
+
+    return {
+        "cold": timed(cold, lambda: None, repeat),
+        "incremental": timed(incremental, prepare_incremental, repeat),
+        "aggregate": timed(lambda: report(state["columns"]), lambda: None, repeat),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bug report time from snapshot to result")
+    parser.add_argument("--bugs", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--changed", type=float, default=0.01, help="Share of bugs changed between reports")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    snapshots = make_snapshots(args.bugs)
+    changed = [change_bugs(snapshots, args.changed, seed) for seed in range(args.repeat)]
+    backends = ([_NumpyOps()] if np is not None else []) + [_PythonOps()]
+    result = {
+        "benchmark": "bug_report",
+        "params": {"bugs": args.bugs, "repeat": args.repeat, "changed": args.changed},
+        "backends": {backend.name: measure(snapshots, changed, backend, args.repeat) for backend in backends},
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for name, modes in result["backends"].items():
+            for mode, stats in modes.items():
+                print(f"{name:<7} {mode:<12} {args.bugs} bugs  best {stats['best_ms']} ms  mean {stats['mean_ms']} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""CLI 单次运行路径的启动导入耗时基准
+
+用法: python benchmarks/bench_startup.py [--target-ms 700] [--runs 5] [--json]
+
+基于 ``python -X importtime`` 统计 ``main.py cli --once`` 所需导入的累计耗时，
+取多次运行的中位数，超过目标值时返回非零退出码。
+单次运行必然要发请求，aiohttp(约 170~310 ms)、asyncio 和 pydantic 是下限，
+本地多次测得中位数约 410~670 ms；默认目标 700 ms 留出机器差异的余量，主要用于发现重新引入的 Web/GUI 依赖。
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 与 main.py cli 分支相同的导入
+CLI_IMPORTS = "import asyncio; from bugfetcher.cli import run_cli"
+HEAVY_MODULES = ("fastapi", "uvicorn", "tkinter", "starlette")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(code: str) -> dict:
+    """运行一次带 -X importtime 的解释器，返回总耗时和已导入模块"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = int(cumulative_us)
+        if len(indent) == 1:  # 顶层导入，累计值已包含其子模块
+            total_us += int(cumulative_us)
+    return {"total_ms": total_us / 1000, "modules": modules}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure CLI one-shot import time")
+    parser.add_argument("--target-ms", type=float, default=700, help="Median import time budget")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    runs = [measure(CLI_IMPORTS) for _ in range(args.runs)]
+    median_ms = statistics.median(run["total_ms"] for run in runs)
+    modules = runs[-1]["modules"]
+    heavy = sorted(name for name in modules if name.split(".")[0] in HEAVY_MODULES)
+    slowest = sorted(
+        ((name, us / 1000) for name, us in modules.items() if "." not in name),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:10]
+    result = {
+        "benchmark": "cli_startup_import",
+        "median_ms": round(median_ms, 2),
+        "target_ms": args.target_ms,
+        "runs": [round(run["total_ms"], 2) for run in runs],
+        "heavy_modules": heavy,
+        "slowest_top_level": [[name, round(ms, 2)] for name, ms in slowest],
+        "passed": median_ms <= args.target_ms and not heavy,
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"CLI import time: median {result['median_ms']} ms (target {args.target_ms} ms)")
+        for name, ms in result["slowest_top_level"]:
+            print(f"  {name:<30} {ms:>8.2f} ms")
+        if heavy:
+            print(f"Unexpected heavy modules imported: {', '.join(heavy)}")
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
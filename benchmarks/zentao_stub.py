@@ -0,0 +1,209 @@
+"""本地禅道 + 飞书模拟服务，供测试和基准使用
+
+用法: python benchmarks/zentao_stub.py [--bugs 100000] [--latency-ms 20] [--port 8080]
+
+提供 /api.php/v1/tokens、/user、/products、分页的 /products/{id}/bugs 以及
+飞书 Webhook /feishu/webhook。Bug 按ID即时生成，百万级数据也不占用多少内存；
+可配置延迟、5xx 错误率和 401 比例，并按路径统计请求数。
+控制接口：GET /_stub/stats 查看请求计数，POST /_stub/touch?count=N 编辑N个Bug，
+POST /_stub/create?count=N&edited=0 新建N个Bug(edited=0 时 lastEditedDate 为禅道的空日期)，
+POST /_stub/reset 清零计数。Bug列表支持 order=lastEditedDate_desc 和 order=id_desc。
+"""
+import random
+import asyncio
+import argparse
+import itertools
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set
+from aiohttp import web
+
+BASE_DATE = 1704067200  # 2024-01-01 00:00:00 UTC
+ZERO_DATE = "0000-00-00 00:00:00"  # 禅道的空日期
+
+
+def _format_date(timestamp: int) -> str:
+    days, seconds = divmod(timestamp - BASE_DATE, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    # 只需要单调递增、可按字符串比较的日期
+    return f"{2024 + days // 336}-{days % 336 // 28 + 1:02d}-{days % 28 + 1:02d} {hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+@dataclass
+class StubConfig:
+    bugs: int = 1000  # 每个产品的Bug数
+    products: int = 1
+    accounts: List[str] = field(default_factory=lambda: ["admin", "alice", "bob", "carol"])
+    latency_ms: float = 0
+    error_rate: float = 0  # 返回 500 的比例
+    unauthorized_rate: float = 0  # 已登录请求返回 401 的比例
+    max_page_size: int = 1000
+    feishu_latency_ms: float = 0
+    seed: int = 0
+
+
+class ZenTaoStub:
+    """禅道API模拟，touch()/create() 可模拟Bug被编辑和新建以测试增量同步"""
+
+    def __init__(self, config: Optional[StubConfig] = None):
+        self.config = config or StubConfig()
+        self.requests: Counter = Counter()
+        self.feishu_messages: List[Dict] = []
+        self.tokens = set()
+        self._random = random.Random(self.config.seed)
+        self._edits: Dict[int, int] = {}  # Bug ID -> 编辑序号
+        self._unedited: Set[int] = set()  # 新建后从未编辑的Bug，lastEditedDate 为空日期
+        self._edit_seq = itertools.count(1)
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post("/api.php/v1/tokens", self.handle_tokens)
+        app.router.add_get("/api.php/v1/user", self.handle_user)
+        app.router.add_get("/api.php/v1/products", self.handle_products)
+        app.router.add_get("/api.php/v1/products/{product_id}/bugs", self.handle_bugs)
+        app.router.add_post("/feishu/webhook", self.handle_feishu)
+        app.router.add_get("/_stub/stats", self.handle_stats)
+        app.router.add_post("/_stub/touch", self.handle_touch)
+        app.router.add_post("/_stub/create", self.handle_create)
+        app.router.add_post("/_stub/reset", self.handle_reset)
+        return app
+
+    def reset_counters(self) -> None:
+        self.requests.clear()
+
+    def touch(self, count: int) -> List[int]:
+        """随机编辑 count 个Bug，返回其ID"""
+        bug_ids = self._random.sample(range(1, self.config.bugs + 1), min(count, self.config.bugs))
+        for bug_id in bug_ids:
+            self._edits[bug_id] = next(self._edit_seq)
+            self._unedited.discard(bug_id)
+        return bug_ids
+
+    def create(self, count: int, edited: bool = True) -> List[int]:
+        """新建 count 个Bug，返回其ID；edited 为 False 时与禅道一样 lastEditedDate 为空日期"""
+        bug_ids = list(range(self.config.bugs + 1, self.config.bugs + count + 1))
+        self.config.bugs += count
+        if not edited:
+            self._unedited.update(bug_ids)
+        return bug_ids
+
+    def bug(self, bug_id: int) -> Dict:
+        accounts = self.config.accounts
+        account = accounts[bug_id % len(accounts)]
+        edited = BASE_DATE + bug_id * 60
+        if bug_id in self._edits:
+            edited = BASE_DATE + (self.config.bugs + self._edits[bug_id]) * 60
+        return {
+            "id": bug_id,
+            "title": f"Bug {bug_id}",
+            "status": "active",
+            "severity": bug_id % 4 + 1,
+            "pri": bug_id % 4 + 1,
+            "assignedTo": {"account": account, "realname": account.title()},
+            "openedDate": _format_date(BASE_DATE + bug_id * 60),
+            "lastEditedDate": ZERO_DATE if bug_id in self._unedited else _format_date(edited),
+        }
+
+    def _ids_by_edit_desc(self) -> Iterator[int]:
+        edited = sorted(self._edits, key=self._edits.get, reverse=True)
+        yield from edited
+        for bug_id in range(self.config.bugs, 0, -1):
+            if bug_id not in self._edits and bug_id not in self._unedited:
+                yield bug_id
+        # 与禅道一样，空的编辑时间排在最后
+        yield from sorted(self._unedited, reverse=True)
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        if request.path.startswith("/_stub/"):
+            return await handler(request)
+        route = request.match_info.route.resource
+        self.requests[route.canonical if route is not None else request.path] += 1
+        is_feishu = request.path.startswith("/feishu")
+        latency = self.config.feishu_latency_ms if is_feishu else self.config.latency_ms
+        if latency:
+            await asyncio.sleep(latency / 1000)
+        if not is_feishu and self._random.random() < self.config.error_rate:
+            return web.json_response({"error": "Internal Server Error"}, status=500)
+        if not is_feishu and request.path != "/api.php/v1/tokens":
+            if request.headers.get("Token") not in self.tokens or self._random.random() < self.config.unauthorized_rate:
+                return web.json_response({"error": "Unauthorized"}, status=401)
+        return await handler(request)
+
+    async def handle_tokens(self, request: web.Request) -> web.Response:
+        token = f"token-{len(self.tokens) + 1}"
+        self.tokens.add(token)
+        return web.json_response({"token": token}, status=201)
+
+    async def handle_user(self, request: web.Request) -> web.Response:
+        account = self.config.accounts[0]
+        return web.json_response({"profile": {"account": account, "realname": account.title()}})
+
+    async def handle_products(self, request: web.Request) -> web.Response:
+        products = [{"id": i, "name": f"Product {i}"} for i in range(1, self.config.products + 1)]
+        return web.json_response({"page": 1, "total": len(products), "limit": len(products), "products": products})
+
+    async def handle_bugs(self, request: web.Request) -> web.Response:
+        page = max(1, int(request.query.get("page", 1)))
+        limit = min(self.config.max_page_size, max(1, int(request.query.get("limit", 20))))
+        start = (page - 1) * limit
+        if request.query.get("order") == "lastEditedDate_desc":
+            ids = list(itertools.islice(self._ids_by_edit_desc(), start, start + limit))
+        elif request.query.get("order") == "id_desc":
+            ids = range(self.config.bugs - start, max(0, self.config.bugs - start - limit), -1)
+        else:
+            ids = range(start + 1, min(start + limit, self.config.bugs) + 1)
+        return web.json_response({
+            "page": page,
+            "total": self.config.bugs,
+            "limit": limit,
+            "bugs": [self.bug(bug_id) for bug_id in ids],
+        })
+
+    async def handle_feishu(self, request: web.Request) -> web.Response:
+        self.feishu_messages.append(await request.json())
+        return web.json_response({"code": 0, "msg": "success"})
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "requests": dict(self.requests),
+            "total": sum(self.requests.values()),
+            "feishu_messages": len(self.feishu_messages),
+        })
+
+    async def handle_touch(self, request: web.Request) -> web.Response:
+        return web.json_response({"touched": self.touch(int(request.query.get("count", 1)))})
+
+    async def handle_create(self, request: web.Request) -> web.Response:
+        edited = request.query.get("edited", "1") not in ("0", "false")
+        return web.json_response({"created": self.create(int(request.query.get("count", 1)), edited=edited)})
+
+    async def handle_reset(self, request: web.Request) -> web.Response:
+        self.reset_counters()
+        return web.json_response({"status": "success"})
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run a local ZenTao + Feishu stub server")
+    parser.add_argument("--bugs", type=int, default=1000, help="Bugs per product")
+    parser.add_argument("--products", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--unauthorized-rate", type=float, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+
+    stub = ZenTaoStub(StubConfig(
+        bugs=args.bugs,
+        products=args.products,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        unauthorized_rate=args.unauthorized_rate,
+    ))
+    web.run_app(stub.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
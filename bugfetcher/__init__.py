@@ -1,8 +1,25 @@
 __version__ = "1.0.0"
 
-from .api import *
-from .cli import *
-from .config import *
-from .core import *
-from .gui import *
-from .models import *
+import importlib
+
+# 按需导入子模块，避免 CLI 等轻量入口加载 FastAPI 和 tkinter
+_LAZY_ATTRS = {
+    "app": ".api",
+    "run_cli": ".cli",
+    "BugFetcherCore": ".core",
+    "BugFetcherGUI": ".gui",
+    "ConfigModel": ".models",
+    "ProductSelection": ".models",
+    "FeishuMessage": ".models",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,9 @@
+from .analytics import (
+    DIMENSIONS,
+    BugColumns,
+    aging_labels,
+    build_report,
+    report_period,
+    report_suggestion,
+    to_timestamp,
+)
@@ -0,0 +1,504 @@
+import math
+import bisect
+import datetime
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+from ..models.bug import Bug
+from ..store import assignee
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时用标准库 array + Counter 聚合，结果相同
+    np = None
+
+# 分组维度，"all" 为不分组的汇总
+DIMENSIONS = ("product", "assignee", "module", "severity")
+DEFAULT_AGING_DAYS = (7, 30, 90)
+DEFAULT_TREND_WEEKS = 8
+
+DAY = 86400.0
+WEEK = 7 * DAY
+NAN = float("nan")
+INF = float("inf")
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+DateLike = Union[str, datetime.date, datetime.datetime, float, int, None]
+
+
+def to_timestamp(value: DateLike) -> float:
+    """禅道日期(YYYY-MM-DD[ HH:MM:SS])或 date/datetime 转为秒数，按不带时区的本地时间计，无效日期为 NaN
+
+    禅道用 "0000-00-00 00:00:00" 表示空日期。
+    """
+    if value is None or value == "":
+        return NAN
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime.datetime):
+        return (value.toordinal() - _EPOCH_ORDINAL) * DAY + value.hour * 3600 + value.minute * 60 + value.second
+    if isinstance(value, datetime.date):
+        return (value.toordinal() - _EPOCH_ORDINAL) * DAY
+    try:
+        day = datetime.date.fromisoformat(value[:10]).toordinal() - _EPOCH_ORDINAL
+        seconds = int(value[11:13] or 0) * 3600 + int(value[14:16] or 0) * 60 + int(value[17:19] or 0)
+    except (TypeError, ValueError):
+        return NAN
+    return day * DAY + seconds
+
+
+def format_timestamp(ts: float) -> str:
+    return (datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=ts)).isoformat(sep=" ")
+
+
+def format_date(ts: float) -> str:
+    return datetime.date.fromordinal(int(ts // DAY) + _EPOCH_ORDINAL).isoformat()
+
+
+class _DateParser:
+    """列构建时使用：日期部分和时间部分分别按字符串缓存，避免逐个解析"""
+
+    def __init__(self):
+        self._days: Dict[str, float] = {}
+        self._times: Dict[str, float] = {}
+
+    def __call__(self, value: Any) -> float:
+        if not isinstance(value, str):
+            return to_timestamp(value)
+        day = self._days.get(value[:10])
+        if day is None:
+            day = self._days[value[:10]] = to_timestamp(value[:10])
+        clock = value[11:19]
+        seconds = self._times.get(clock)
+        if seconds is None:
+            try:
+                seconds = int(clock[0:2] or 0) * 3600 + int(clock[3:5] or 0) * 60 + int(clock[6:8] or 0)
+            except ValueError:
+                seconds = 0
+            self._times[clock] = seconds
+        return day + seconds
+
+
+class BugColumns:
+    """按列保存的Bug数据
+
+    维度字段编码为整数(labels[维度][编码] 为原值)，日期为秒数(缺失为 NaN)，
+    全部用 array 紧凑存储，NumPy 可零拷贝读取。
+    用 update() 维护的列按快照的变化增量更新，只重写新增、变更和删除的行。
+    """
+
+    def __init__(self):
+        self.labels: Dict[str, List[Any]] = {dim: [] for dim in DIMENSIONS}
+        self.codes: Dict[str, array] = {dim: array("i") for dim in DIMENSIONS}
+        self.active = array("b")  # 状态是否为 active
+        self.opened = array("d")
+        self.resolved = array("d")
+        self._index: Dict[str, Dict[Any, int]] = {dim: {} for dim in DIMENSIONS}
+        self._parse_date = _DateParser()
+        self._rows: Dict[str, Dict[Any, int]] = {}  # update() 维护的行：产品 -> {Bug ID: 行号}
+        self._sources: List[Any] = []  # 行号 -> 生成该行的Bug对象，对象不变说明该行无需重写
+
+    def __len__(self) -> int:
+        return len(self.opened)
+
+    def _code(self, dim: str, value: Any) -> int:
+        index = self._index[dim]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(self.labels[dim])
+            self.labels[dim].append(value)
+        return code
+
+    def _fields(self, bug: Mapping) -> Tuple[Any, Any, Any, Any, Any, Any, Any]:
+        """(产品, 指派人, 模块, 严重程度, 状态, 创建日期, 解决日期)，Bug 记录直接读属性"""
+        if isinstance(bug, Bug):
+            return (
+                bug.product, bug.assigned_account or bug.assigned_realname, bug.module, bug.severity,
+                bug.status, bug.opened_date, bug.resolved_date,
+            )
+        account, realname = assignee(bug)
+        return (
+            bug.get("product"), account or realname, bug.get("module"), bug.get("severity"),
+            bug.get("status"), bug.get("openedDate"), bug.get("resolvedDate"),
+        )
+
+    def extend(self, product_id: Any, bugs: Iterable[Mapping]) -> "BugColumns":
+        """追加产品的Bug(禅道字典或 Bug 记录)，product_id 为 None 时取Bug自身的 product 字段"""
+        code, fields = self._code, self._fields
+        parse_date = self._parse_date
+        product_code = code("product", str(product_id)) if product_id is not None else None
+        products, assignees = self.codes["product"].append, self.codes["assignee"].append
+        modules, severities = self.codes["module"].append, self.codes["severity"].append
+        active, opened, resolved = self.active.append, self.opened.append, self.resolved.append
+        # 已有的值直接查字典取编码，只有新值才调用 _code
+        assignee_codes, module_codes = self._index["assignee"].get, self._index["module"].get
+        severity_codes = self._index["severity"].get
+        for bug in bugs:
+            product, account, module, severity, status, opened_date, resolved_date = fields(bug)
+            products(product_code if product_code is not None else code("product", str(product or "")))
+            value = assignee_codes(account)
+            assignees(value if value is not None else code("assignee", account))
+            value = module_codes(module or 0)
+            modules(value if value is not None else code("module", module or 0))
+            value = severity_codes(severity or 0)
+            severities(value if value is not None else code("severity", severity or 0))
+            active(status == "active")
+            opened(parse_date(opened_date))
+            resolved(parse_date(resolved_date))
+        return self
+
+    def update(self, product_id: Any, bugs: Mapping[Any, Mapping]) -> int:
+        """按产品当前的Bug(Bug ID -> Bug，即快照内容)同步列，返回重写的行数
+
+        快照合并时只替换有变化的Bug对象，因此按对象是否相同即可找出变化的行；
+        删除的行由最后一行填补。同一产品不要再混用 extend()。
+        """
+        product_id = str(product_id)
+        rows = self._rows.get(product_id)
+        if rows is None:
+            # 新产品整批追加，走 extend 的快速路径
+            start = len(self._sources)
+            self.extend(product_id, bugs.values())
+            self._rows[product_id] = dict(zip(bugs.keys(), range(start, start + len(bugs))))
+            self._sources.extend(bugs.values())
+            return len(bugs)
+
+        sources = self._sources
+        written = 0
+        for bug_id in [bug_id for bug_id in rows if bug_id not in bugs]:
+            self._remove(product_id, bug_id)
+            written += 1
+        product_code = self._code("product", product_id)
+        for bug_id, bug in bugs.items():
+            row = rows.get(bug_id)
+            if row is not None and sources[row] is bug:
+                continue
+            if row is None:
+                row = rows[bug_id] = len(sources)
+                sources.append(bug)
+                self._append_row()
+            else:
+                sources[row] = bug
+            self._write_row(row, product_code, bug)
+            written += 1
+        return written
+
+    def _append_row(self) -> None:
+        for column in (*self.codes.values(), self.active, self.opened, self.resolved):
+            column.append(0)
+
+    def _write_row(self, row: int, product_code: int, bug: Mapping) -> None:
+        _, account, module, severity, status, opened_date, resolved_date = self._fields(bug)
+        self.codes["product"][row] = product_code
+        self.codes["assignee"][row] = self._code("assignee", account)
+        self.codes["module"][row] = self._code("module", module or 0)
+        self.codes["severity"][row] = self._code("severity", severity or 0)
+        self.active[row] = status == "active"
+        self.opened[row] = self._parse_date(opened_date)
+        self.resolved[row] = self._parse_date(resolved_date)
+
+    def _remove(self, product_id: str, bug_id: Any) -> None:
+        """删除一行：最后一行移到空出的位置"""
+        row = self._rows[product_id].pop(bug_id)
+        last = len(self._sources) - 1
+        if row != last:
+            moved = self._sources[last]
+            for column in (*self.codes.values(), self.active, self.opened, self.resolved):
+                column[row] = column[last]
+            self._sources[row] = moved
+            moved_product = self.labels["product"][self.codes["product"][row]]
+            self._rows[moved_product][moved.get("id")] = row
+        for column in (*self.codes.values(), self.active, self.opened, self.resolved):
+            del column[last]
+        self._sources.pop()
+
+    @classmethod
+    def from_products(cls, bugs_by_product: Mapping[Any, Iterable[Mapping]]) -> "BugColumns":
+        columns = cls()
+        for product_id, bugs in bugs_by_product.items():
+            columns.extend(product_id, bugs)
+        return columns
+
+
+class _PythonOps:
+    """标准库实现：掩码为 bool 列表，计数用 Counter(C实现)"""
+
+    name = "python"
+
+    def column(self, values: array):
+        return values
+
+    def zeros(self, size: int):
+        return array("i", [0]) * size
+
+    def between(self, values, low: float, high: float):
+        return [low <= value < high for value in values]
+
+    def both(self, a, b):
+        return [x and y for x, y in zip(a, b)]
+
+    def either(self, a, b):
+        return [x or y for x, y in zip(a, b)]
+
+    def isnan(self, values):
+        return [value != value for value in values]
+
+    def truth(self, values):
+        return [bool(value) for value in values]
+
+    def count(self, codes, mask, size: int) -> List[int]:
+        counter = Counter(compress(codes, mask))
+        return [counter.get(code, 0) for code in range(size)]
+
+    def total(self, codes, mask, weights, size: int) -> List[float]:
+        sums = [0.0] * size
+        for code, weight in compress(zip(codes, weights), mask):
+            sums[code] += weight
+        return sums
+
+    def scale(self, values, origin, unit: float):
+        """(values - origin) / unit，origin 为标量或等长的列"""
+        if isinstance(origin, float):
+            return [(value - origin) / unit for value in values]
+        return [(value - base) / unit for value, base in zip(values, origin)]
+
+    def digitize(self, values, edges: Sequence[float]):
+        return array("i", (bisect.bisect_right(edges, value) if value == value else 0 for value in values))
+
+    def floor(self, values):
+        return array("i", (math.floor(value) if -2 ** 31 < value < 2 ** 31 else 0 for value in values))
+
+    def combine(self, codes, other, width: int):
+        return array("i", (code * width + value for code, value in zip(codes, other)))
+
+
+class _NumpyOps:
+    """NumPy 实现：掩码为布尔数组，分组计数/求和用 bincount"""
+
+    name = "numpy"
+
+    def column(self, values: array):
+        return np.frombuffer(values, dtype=values.typecode)
+
+    def zeros(self, size: int):
+        return np.zeros(size, dtype=np.intp)
+
+    def between(self, values, low: float, high: float):
+        return (values >= low) & (values < high)
+
+    def both(self, a, b):
+        return a & b
+
+    def either(self, a, b):
+        return a | b
+
+    def isnan(self, values):
+        return np.isnan(values)
+
+    def truth(self, values):
+        return values.astype(bool)
+
+    def count(self, codes, mask, size: int) -> List[int]:
+        return np.bincount(codes[mask], minlength=size).tolist()
+
+    def total(self, codes, mask, weights, size: int) -> List[float]:
+        return np.bincount(codes[mask], weights=weights[mask], minlength=size).tolist()
+
+    def scale(self, values, origin, unit: float):
+        return (values - origin) / unit
+
+    def digitize(self, values, edges: Sequence[float]):
+        return np.digitize(np.nan_to_num(values), edges)
+
+    def floor(self, values):
+        return np.floor(np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)).astype(np.intp)
+
+    def combine(self, codes, other, width: int):
+        return codes.astype(np.intp) * width + other
+
+
+def default_backend():
+    return _NumpyOps() if np is not None else _PythonOps()
+
+
+def report_period(
+    month: Optional[str] = None,
+    since: DateLike = None,
+    until: DateLike = None,
+    now: Optional[datetime.datetime] = None,
+) -> Tuple[float, float]:
+    """统计区间 [since, until)，返回秒数
+
+    month 为 "YYYY-MM" 时取该月(当月截止到 now)；只给 since 时截止到 now；都不给时为本月至今。
+    """
+    now = now or datetime.datetime.now()
+    if month:
+        try:
+            start = datetime.datetime.strptime(month, "%Y-%m")
+        except ValueError:
+            raise ValueError(f"Invalid month: {month}, expected YYYY-MM")
+        end = (start + datetime.timedelta(days=32)).replace(day=1)
+        low, high = to_timestamp(start), min(to_timestamp(end), to_timestamp(now))
+    else:
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        low = to_timestamp(since) if since else to_timestamp(month_start)
+        high = to_timestamp(until) if until else to_timestamp(now)
+    if math.isnan(low) or math.isnan(high):
+        raise ValueError("Invalid date, expected YYYY-MM-DD")
+    if high <= low:
+        raise ValueError("until must be later than since")
+    return low, high
+
+
+def _ratio(numerator: float, denominator: float, digits: int = 3) -> Optional[float]:
+    return round(numerator / denominator, digits) if denominator else None
+
+
+def _change(current: int, previous: int) -> Dict:
+    return {"current": current, "previous": previous, "change": _ratio(current - previous, previous)}
+
+
+def aging_labels(aging_days: Sequence[float]) -> List[str]:
+    """(7, 30, 90) -> ["0-7d", "7-30d", "30-90d", "90d+"]"""
+    edges = [0, *aging_days]
+    labels = [f"{edges[i]:g}-{edges[i + 1]:g}d" for i in range(len(aging_days))]
+    return labels + [f"{edges[-1]:g}d+"]
+
+
+def build_report(
+    columns: BugColumns,
+    since: float,
+    until: float,
+    aging_days: Sequence[float] = DEFAULT_AGING_DAYS,
+    trend_weeks: int = DEFAULT_TREND_WEEKS,
+    top: Optional[int] = None,
+    backend=None,
+) -> Dict:
+    """计算 [since, until) 区间的Bug统计
+
+    每个分组(汇总/产品/指派人/模块/严重程度)给出：
+    total      截止 until 已创建的Bug数
+    open       until 时仍未解决的Bug数(有解决日期按日期判断，否则按当前状态)
+    opened     区间内新建数，open_rate 为每天新建数
+    resolved   区间内解决数，resolve_rate 为每天解决数，resolution_ratio = resolved / opened
+    mttr_days  区间内解决的Bug从创建到解决的平均天数
+    aging      未解决Bug按已存在天数(到 until)分桶
+    另给出 until 之前 trend_weeks 个自然7天窗口的新建/解决数和最近两周的环比。
+    """
+    ops = backend or default_backend()
+    aging_days = sorted(aging_days)
+    labels = aging_labels(aging_days)
+    buckets = len(labels)
+    days = (until - since) / DAY
+
+    opened = ops.column(columns.opened)
+    resolved = ops.column(columns.resolved)
+    active = ops.truth(ops.column(columns.active))
+
+    existing = ops.between(opened, -INF, until)
+    opened_in = ops.between(opened, since, until)
+    resolved_in = ops.both(ops.between(resolved, since, until), ops.between(opened, -INF, INF))
+    unresolved = ops.either(ops.between(resolved, until, INF), ops.both(ops.isnan(resolved), active))
+    open_at_end = ops.both(existing, unresolved)
+    resolve_days = ops.scale(resolved, opened, DAY)
+    age_bucket = ops.digitize(ops.scale(opened, until, -DAY), aging_days)
+
+    dimensions = {"all": (ops.zeros(len(columns)), [None])}
+    for dim in DIMENSIONS:
+        dimensions[dim] = (ops.column(columns.codes[dim]), columns.labels[dim])
+
+    groups: Dict[str, List[Dict]] = {}
+    for dim, (codes, keys) in dimensions.items():
+        size = len(keys)
+        total = ops.count(codes, existing, size)
+        still_open = ops.count(codes, open_at_end, size)
+        opened_count = ops.count(codes, opened_in, size)
+        resolved_count = ops.count(codes, resolved_in, size)
+        resolve_sum = ops.total(codes, resolved_in, resolve_days, size)
+        aging = ops.count(ops.combine(codes, age_bucket, buckets), open_at_end, size * buckets)
+        rows = []
+        for code, key in enumerate(keys):
+            if not (total[code] or opened_count[code] or resolved_count[code]):
+                continue
+            rows.append({
+                "key": key,
+                "total": total[code],
+                "open": still_open[code],
+                "opened": opened_count[code],
+                "resolved": resolved_count[code],
+                "open_rate": round(opened_count[code] / days, 3),
+                "resolve_rate": round(resolved_count[code] / days, 3),
+                "resolution_ratio": _ratio(resolved_count[code], opened_count[code]),
+                "mttr_days": _ratio(resolve_sum[code], resolved_count[code], 2),
+                "aging": dict(zip(labels, aging[code * buckets:(code + 1) * buckets])),
+            })
+        rows.sort(key=lambda row: (-row["open"], -row["opened"], str(row["key"])))
+        groups[dim] = rows[:top] if top else rows
+
+    trend_start = until - trend_weeks * WEEK
+    weeks_opened = ops.count(
+        ops.floor(ops.scale(opened, trend_start, WEEK)), ops.between(opened, trend_start, until), trend_weeks
+    )
+    weeks_resolved = ops.count(
+        ops.floor(ops.scale(resolved, trend_start, WEEK)), ops.between(resolved, trend_start, until), trend_weeks
+    )
+    trend = [
+        {
+            "week_start": format_date(trend_start + week * WEEK),
+            "opened": weeks_opened[week],
+            "resolved": weeks_resolved[week],
+        }
+        for week in range(trend_weeks)
+    ]
+
+    summary = groups.pop("all")
+    summary = summary[0] if summary else {
+        "total": 0, "open": 0, "opened": 0, "resolved": 0, "open_rate": 0.0, "resolve_rate": 0.0,
+        "resolution_ratio": None, "mttr_days": None, "aging": dict.fromkeys(labels, 0),
+    }
+    summary.pop("key", None)
+    report = {
+        "status": "success",
+        "period": {"since": format_timestamp(since), "until": format_timestamp(until), "days": round(days, 2)},
+        "backend": ops.name,
+        "bugs": len(columns),
+        "summary": summary,
+        **{f"by_{dim}": rows for dim, rows in groups.items()},
+        "trend": trend,
+    }
+    if trend_weeks >= 2:
+        report["week_over_week"] = {
+            "opened": _change(trend[-1]["opened"], trend[-2]["opened"]),
+            "resolved": _change(trend[-1]["resolved"], trend[-2]["resolved"]),
+        }
+    return report
+
+
+def _percent(value: Optional[float]) -> str:
+    return f"{value * 100:+.1f}%" if value is not None else "-"
+
+
+def report_suggestion(report: Dict, top: int = 3) -> str:
+    """把报表浓缩为飞书消息的建议文本"""
+    summary = report["summary"]
+    period = report["period"]
+    parts = [
+        f"{period['since'][:10]} ~ {period['until'][:10]}：新增 {summary['opened']} 个Bug，"
+        f"解决 {summary['resolved']} 个"
+        + (f"(解决率 {summary['resolution_ratio'] * 100:.1f}%)" if summary["resolution_ratio"] is not None else "")
+        + (f"，平均解决耗时 {summary['mttr_days']} 天" if summary["mttr_days"] is not None else "")
+        + "。"
+    ]
+    aging = list(summary["aging"].items())
+    parts.append(f"未解决 {summary['open']} 个" + (f"，其中超过 {aging[-1][0][:-2]} 天 {aging[-1][1]} 个" if aging else "") + "。")
+    wow = report.get("week_over_week")
+    if wow:
+        parts.append(f"最近一周新增环比 {_percent(wow['opened']['change'])}，解决环比 {_percent(wow['resolved']['change'])}。")
+    owners = [row for row in report.get("by_assignee", []) if row["open"] and row["key"]][:top]
+    if owners:
+        parts.append("未解决最多：" + "、".join(f"{row['key']}({row['open']})" for row in owners) + "。")
+    critical = next((row for row in report.get("by_severity", []) if row["key"] == 1 and row["open"]), None)
+    if critical:
+        parts.append(f"严重程度1未解决 {critical['open']} 个，请优先处理。")
+    return "".join(parts)
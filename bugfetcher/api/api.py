@@ -1,38 +1,100 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import asyncio
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from ..analytics import report_period
 from ..core import BugFetcherCore
-from ..models import ConfigModel, ProductSelection, FeishuMessage
+from ..core.events import Subscription
+from ..core.scheduler import Scheduler
+from .middleware import RequestIDMiddleware
+from .cache import DEFAULT_API_CACHE_SIZE, DEFAULT_API_TTLS, EndpointCache, variant_etag
+from .responses import FastJSONResponse
+from .views import InvalidCursor, decode_cursor, filter_bugs, paginate, parse_fields, project
+from ..models import ConfigModel, ProductSelection, FeishuMessage, json_default, model_to_dict
 import json
 
-app = FastAPI(title="Bug Fetcher API")
-fetcher = BugFetcherCore()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """启动时创建核心实例、共享HTTP会话和飞书投递队列，关闭时释放"""
+    fetcher = app.state.fetcher = BugFetcherCore()
+    endpoint_cache = app.state.endpoint_cache = EndpointCache(
+        max_entries=fetcher._config.get("api_cache_size", DEFAULT_API_CACHE_SIZE)
+    )
+    loop = asyncio.get_running_loop()
+    # 配置变化(如切换产品或账号，包括其他进程修改 config.json)后不再返回旧结果
+    fetcher.config_listeners.append(lambda changed: loop.call_soon_threadsafe(endpoint_cache.invalidate))
+    fetcher.watch_config()
+    await fetcher.get_session()
+    await fetcher.start_delivery_queue()
+    # 进程内定时轮询，与接口共用会话、令牌和缓存
+    scheduler = app.state.scheduler = fetcher.create_scheduler() if fetcher.scheduler_enabled else None
+    if scheduler is not None:
+        scheduler.start()
+    try:
+        yield
+    finally:
+        if scheduler is not None:
+            await scheduler.stop()
+        await fetcher.close()
+        fetcher.close_store()
+
+
+app = FastAPI(title="Bug Fetcher API", lifespan=lifespan, default_response_class=FastJSONResponse)
+# 客户端声明 Accept-Encoding: gzip 时压缩较大的响应
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+# 请求处理期间的日志都带上同一个关联ID
+app.add_middleware(RequestIDMiddleware)
+
+
+def get_fetcher(request: Request) -> BugFetcherCore:
+    """当前应用的核心实例，在 lifespan 中创建"""
+    return request.app.state.fetcher
+
+
+async def cached_json(request: Request, fetcher: BugFetcherCore, key: str, fetch, view=None) -> Response:
+    """按接口配置的TTL返回缓存结果，支持 ETag/If-None-Match 条件请求
+
+    相同键的并发请求共享一次上游调用，TTL 内不再访问禅道。
+    view 用于按查询参数筛选/分页缓存结果，ETag 随查询参数变化。
+    """
+    path = request.url.path
+    ttl = {**DEFAULT_API_TTLS, **fetcher._config.get("api_cache_ttls", {})}.get(path, 0)
+    cache: EndpointCache = request.app.state.endpoint_cache
+    result, hit = await cache.get_or_fetch(f"{path}|{fetcher.zentao_username}|{key}", ttl, fetch)
+    etag = variant_etag(result.etag, request.url.query if view else "")
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={result.max_age}" if ttl else "no-cache",
+        "X-Cache": "HIT" if hit else "MISS",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    payload = view(result.payload) if view else result.payload
+    return FastJSONResponse(payload, headers=headers)
 
 
 @app.get("/api/config")
-async def get_config():
-    """获取当前配置"""
-    # 重新加载配置以确保获取最新数据
-    fetcher._load_config()
+async def get_config(fetcher: BugFetcherCore = Depends(get_fetcher)):
+    """获取当前配置，文件的外部修改由后台监视自动加载"""
     return fetcher._config
 
 
 @app.post("/api/config")
-async def update_config(config: ConfigModel):
+async def update_config(config: ConfigModel, fetcher: BugFetcherCore = Depends(get_fetcher)):
     """更新应用配置"""
     try:
-        # 合并现有配置和新配置
-        current_config = fetcher._config.copy()
-        new_config = {**current_config, **config.dict(exclude_unset=True)}
-
-        # 更新核心模块的配置并保存
-        fetcher._config = new_config
-        fetcher.save_config()
+        # 合并到核心模块的配置，依赖变化键的组件随之重建，文件在后台保存
+        fetcher.update_config(model_to_dict(config, exclude_unset=True))
         return {"status": "success", "message": "Configuration updated successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/login")
-async def login():
+async def login(fetcher: BugFetcherCore = Depends(get_fetcher)):
     """登录禅道系统获取令牌"""
     if not all([fetcher.zentao_url, fetcher.zentao_username, fetcher.zentao_password]):
         raise HTTPException(status_code=400, detail="Missing ZenTao credentials")
@@ -46,7 +108,7 @@ async def login():
 
 
 @app.get("/api/products")
-async def get_products():
+async def get_products(fetcher: BugFetcherCore = Depends(get_fetcher)):
     """获取产品列表"""
     if not fetcher.zentao_token:
         raise HTTPException(status_code=401, detail="Not logged in")
@@ -56,11 +118,12 @@ async def get_products():
 
 
 @app.post("/api/select-product")
-async def select_product(selection: ProductSelection):
+async def select_product(selection: ProductSelection, fetcher: BugFetcherCore = Depends(get_fetcher)):
     """选择当前操作的产品"""
-    fetcher._config["selected_product_id"] = selection.product_id
-    fetcher._config["selected_product"] = selection.product_name
-    fetcher.save_config()
+    fetcher.update_config({
+        "selected_product_id": selection.product_id,
+        "selected_product": selection.product_name,
+    })
     return {
         "status": "success",
         "message": f"Product '{selection.product_name}' selected",
@@ -68,33 +131,275 @@ async def select_product(selection: ProductSelection):
 
 
 @app.get("/api/bugs")
-async def fetch_bugs():
-    """获取当前用户未解决的Bug列表"""
+async def fetch_bugs(
+    request: Request,
+    status: Optional[List[str]] = Query(None),
+    severity: Optional[List[int]] = Query(None),
+    assignee: Optional[str] = None,
+    opened_since: Optional[str] = None,
+    opened_until: Optional[str] = None,
+    edited_since: Optional[str] = None,
+    edited_until: Optional[str] = None,
+    q: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    fetcher: BugFetcherCore = Depends(get_fetcher),
+):
+    """获取当前用户未解决的Bug列表
+
+    支持筛选(status/severity/assignee/日期范围/标题关键字 q)、按ID的游标分页(cursor/limit)
+    和字段选择(fields=id,title,severity)。不带参数时返回完整列表。
+    """
     if not fetcher.zentao_token:
         raise HTTPException(status_code=401, detail="Not logged in")
 
     if not fetcher.selected_product_id:
         raise HTTPException(status_code=400, detail="No product selected")
 
-    result = await fetcher.fetch_new_bugs()
-    return result
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    def view(result):
+        if result.get("status") != "success" or not request.url.query:
+            return result
+        bugs = filter_bugs(
+            result["bugs"],
+            status=status,
+            severity=severity,
+            assignee=assignee,
+            opened_since=opened_since,
+            opened_until=opened_until,
+            edited_since=edited_since,
+            edited_until=edited_until,
+            keyword=q,
+        )
+        page, next_cursor = paginate(bugs, cursor, limit)
+        response = {
+            "status": "success",
+            "bugs": project(page, parse_fields(fields)),
+            "total": len(bugs),
+            "next_cursor": next_cursor,
+        }
+        if result.get("stale"):
+            response["stale"] = True
+        return response
+
+    return await cached_json(request, fetcher, str(fetcher.selected_product_id), fetcher.fetch_new_bugs, view)
+
+
+def subscribe(
+    fetcher: BugFetcherCore,
+    product_id: Optional[List[str]],
+    assignee: Optional[str],
+    severity: Optional[List[int]],
+) -> Subscription:
+    return fetcher.events.subscribe(
+        product_ids=product_id,
+        assignee=assignee,
+        severity=severity,
+        buffer=fetcher._config.get("stream_buffer", 100),
+    )
+
+
+@app.get("/api/bugs/stream")
+async def stream_bugs(
+    request: Request,
+    product_id: Optional[List[str]] = Query(None),
+    assignee: Optional[str] = None,
+    severity: Optional[List[int]] = Query(None),
+    fetcher: BugFetcherCore = Depends(get_fetcher),
+):
+    """以SSE推送Bug变化事件(added/changed/resolved)，事件来自后台同步
+
+    缓冲区满时丢弃最旧事件并推送 overflow 事件，客户端应重新拉取 /api/bugs。
+    """
+    subscription = subscribe(fetcher, product_id, assignee, severity)
+    heartbeat = fetcher._config.get("stream_heartbeat", 15)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                data = json.dumps(event, ensure_ascii=False, default=json_default)
+                event_id = f"id: {event['id']}\n" if "id" in event else ""
+                yield f"{event_id}event: {event['type']}\ndata: {data}\n\n"
+        finally:
+            fetcher.events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/api/bugs/ws")
+async def bugs_websocket(
+    websocket: WebSocket,
+    product_id: Optional[List[str]] = Query(None),
+    assignee: Optional[str] = None,
+    severity: Optional[List[int]] = Query(None),
+):
+    """WebSocket 版本的Bug变化推送，过滤条件与 /api/bugs/stream 相同"""
+    fetcher: BugFetcherCore = websocket.app.state.fetcher
+    await websocket.accept()
+    subscription = subscribe(fetcher, product_id, assignee, severity)
+
+    async def send():
+        while True:
+            await websocket.send_text(json.dumps(await subscription.get(), ensure_ascii=False, default=json_default))
+
+    async def receive():
+        # 客户端消息只用于感知断开
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    tasks = [asyncio.create_task(send()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        fetcher.events.unsubscribe(subscription)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@app.get("/api/bugs/products")
+async def fetch_bugs_for_products(
+    request: Request, product_ids: Optional[str] = None, fetcher: BugFetcherCore = Depends(get_fetcher)
+):
+    """并发获取多个产品中当前用户的Bug，product_ids 为逗号分隔，缺省使用配置"""
+    if not fetcher.zentao_token:
+        raise HTTPException(status_code=401, detail="Not logged in")
+
+    ids = [p.strip() for p in product_ids.split(",") if p.strip()] if product_ids else fetcher.product_ids
+    if not ids:
+        raise HTTPException(status_code=400, detail="No product selected")
+
+    return await cached_json(request, fetcher, ",".join(sorted(ids)), lambda: fetcher.fetch_bugs_for_products(ids))
+
+
+@app.get("/api/bugs/local")
+async def query_local_bugs(
+    product_id: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    severity: Optional[List[int]] = Query(None),
+    opened_since: Optional[str] = None,
+    edited_since: Optional[str] = None,
+    limit: Optional[int] = None,
+    fetcher: BugFetcherCore = Depends(get_fetcher),
+):
+    """从本地存储查询Bug，不访问禅道"""
+    if fetcher.store is None:
+        raise HTTPException(status_code=400, detail="Local bug store disabled")
+
+    bugs = await fetcher.query_bugs(
+        product_id=product_id,
+        assigned_account=assigned_to,
+        status=status,
+        severity=severity,
+        opened_since=opened_since,
+        edited_since=edited_since,
+        limit=limit,
+    )
+    return {"status": "success", "bugs": bugs}
+
+
+@app.get("/api/bugs/mine")
+async def my_open_bugs(
+    product_id: Optional[str] = None, fetcher: BugFetcherCore = Depends(get_fetcher)
+):
+    """从本地存储查询当前用户的激活Bug"""
+    bugs = await fetcher.my_open_bugs(product_id or fetcher.selected_product_id or None)
+    return {"status": "success", "bugs": bugs}
+
+
+@app.get("/api/reports")
+async def get_report(
+    request: Request,
+    product_ids: Optional[str] = None,
+    month: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    top: Optional[int] = Query(None, ge=1),
+    fetcher: BugFetcherCore = Depends(get_fetcher),
+):
+    """Bug统计报表：按产品/指派人/模块/严重程度统计新建、解决、解决率、平均解决天数、账龄和按周趋势
+
+    区间为 month(YYYY-MM) 或 since/until(YYYY-MM-DD)，缺省为本月至今；top 限制每个维度返回的分组数。
+    """
+    ids = [p.strip() for p in product_ids.split(",") if p.strip()] if product_ids else fetcher.product_ids
+    if not ids:
+        raise HTTPException(status_code=400, detail="No product selected")
+    try:
+        report_period(month, since, until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    key = "|".join([",".join(sorted(ids)), month or "", since or "", until or "", str(top or "")])
+    return await cached_json(request, fetcher, key, lambda: fetcher.bug_report(ids, month, since, until, top))
 
 
 @app.post("/api/send-to-feishu")
-async def send_to_feishu(message: FeishuMessage):
-    """发送消息到飞书"""
+async def send_to_feishu(message: FeishuMessage, fetcher: BugFetcherCore = Depends(get_fetcher)):
+    """发送消息到飞书：消息进入后台投递队列，立即返回投递ID"""
     if not fetcher.feishu_webhook_url:
         raise HTTPException(status_code=400, detail="Feishu webhook URL not configured")
 
-    result = await fetcher.send_to_feishu(message)
+    result = await fetcher.deliver(message)
     if result["status"] == "error":
         raise HTTPException(status_code=500, detail=result["message"])
 
     return result
 
 
+@app.get("/api/deliveries/{delivery_id}")
+async def get_delivery(delivery_id: str, fetcher: BugFetcherCore = Depends(get_fetcher)):
+    """查询飞书投递状态"""
+    record = fetcher.deliveries.get(delivery_id) if fetcher.deliveries else None
+    if record is None:
+        raise HTTPException(status_code=404, detail="Delivery not found")
+    return {"status": "success", "delivery": record}
+
+
+@app.post("/api/notify")
+async def notify_changes(fetcher: BugFetcherCore = Depends(get_fetcher)):
+    """获取当前用户的Bug，仅在有变化时发送增量通知"""
+    if not fetcher.zentao_token:
+        raise HTTPException(status_code=401, detail="Not logged in")
+
+    if not fetcher.selected_product_id:
+        raise HTTPException(status_code=400, detail="No product selected")
+
+    return await fetcher.fetch_and_notify()
+
+
+@app.post("/api/notify-team")
+async def notify_team(fetcher: BugFetcherCore = Depends(get_fetcher)):
+    """团队模式：扫描产品一次，给每个订阅成员发送飞书通知"""
+    if not fetcher.zentao_token:
+        raise HTTPException(status_code=401, detail="Not logged in")
+
+    result = await fetcher.notify_team()
+    if result["status"] == "error":
+        raise HTTPException(status_code=400, detail=result["message"])
+    return result
+
+
 @app.get("/api/status")
-async def get_status():
+async def get_status(fetcher: BugFetcherCore = Depends(get_fetcher)):
     """获取当前应用状态"""
     return {
         "selected_product": fetcher.selected_product,
@@ -104,8 +409,51 @@ async def get_status():
     }
 
 
+@app.get("/api/cache/stats")
+async def get_cache_stats(request: Request, fetcher: BugFetcherCore = Depends(get_fetcher)):
+    """禅道响应缓存和接口缓存的命中统计"""
+    return {
+        "status": "success",
+        "cache": fetcher.cache_stats(),
+        "endpoints": request.app.state.endpoint_cache.stats,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(fetcher: BugFetcherCore = Depends(get_fetcher)):
+    """Prometheus 文本格式的指标，metrics_enabled 为 false 时返回 404"""
+    if not fetcher.metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(fetcher.metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def get_scheduler(request: Request) -> Scheduler:
+    scheduler = request.app.state.scheduler
+    if scheduler is None:
+        raise HTTPException(status_code=400, detail="Scheduler disabled")
+    return scheduler
+
+
+@app.get("/api/jobs")
+async def list_jobs(scheduler: Scheduler = Depends(get_scheduler)):
+    """列出调度任务及最近一次运行状态"""
+    return {"status": "success", "jobs": scheduler.list()}
+
+
+@app.post("/api/jobs/{name}/{action}")
+async def control_job(name: str, action: str, scheduler: Scheduler = Depends(get_scheduler)):
+    """暂停(pause)、恢复(resume)或立即运行(run)调度任务"""
+    handlers = {"pause": scheduler.pause, "resume": scheduler.resume, "run": scheduler.trigger}
+    if action not in handlers:
+        raise HTTPException(status_code=400, detail=f"Unknown action: {action}")
+    job = handlers[action](name)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"status": "success", "job": job}
+
+
 @app.get("/api/refresh")
-async def refresh_session():
+async def refresh_session(fetcher: BugFetcherCore = Depends(get_fetcher)):
     """刷新会话和用户信息"""
     if not fetcher.zentao_token:
         raise HTTPException(status_code=401, detail="Not logged in")
@@ -117,6 +465,6 @@ async def refresh_session():
         token = await fetcher.get_zentao_token()
         if not token:
             raise HTTPException(status_code=401, detail="Session refresh failed")
-        user_info = await fetcher.fetch_user_info()
+        user_info = await fetcher.fetch_user_info(fresh=True)
 
     return {"status": "success", "user_info": user_info}
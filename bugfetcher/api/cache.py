@@ -0,0 +1,114 @@
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from ..models.bug import Bug
+
+# 各接口的默认缓存秒数，可通过配置项 api_cache_ttls 覆盖，0 表示不缓存
+DEFAULT_API_TTLS = {
+    "/api/bugs": 5,
+    "/api/bugs/products": 5,
+    "/api/reports": 300,
+}
+# 缓存键含客户端传入的查询参数(产品列表、报表区间等)，条目数需要上限，可通过 api_cache_size 配置
+DEFAULT_API_CACHE_SIZE = 128
+
+
+class CachedResult:
+    __slots__ = ("payload", "etag", "expires_at")
+
+    def __init__(self, payload: Any, etag: str, expires_at: float):
+        self.payload = payload
+        self.etag = etag
+        self.expires_at = expires_at
+
+    @property
+    def max_age(self) -> int:
+        return max(0, int(self.expires_at - time.time()))
+
+
+def _etag_default(obj: Any) -> Any:
+    return obj.to_dict() if isinstance(obj, Bug) else str(obj)
+
+
+def compute_etag(payload: Any) -> str:
+    body = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=_etag_default)
+    return '"' + hashlib.sha1(body.encode("utf-8")).hexdigest() + '"'
+
+
+def variant_etag(etag: str, variant: str) -> str:
+    """同一缓存结果按不同查询参数渲染时的 ETag"""
+    if not variant:
+        return etag
+    return '"' + hashlib.sha1(f"{etag}|{variant}".encode("utf-8")).hexdigest() + '"'
+
+
+class EndpointCache:
+    """API接口结果的短时缓存，相同键的并发请求只触发一次上游调用(single-flight)
+
+    内存LRU，最多 max_entries 条；过期条目在访问或写入新结果时删除。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_API_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._results: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "coalesced": 0, "fetches": 0, "evictions": 0}
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Dict]],
+        cacheable: Callable[[Dict], bool] = lambda payload: payload.get("status") != "error",
+    ) -> Tuple[CachedResult, bool]:
+        """返回 (结果, 是否来自缓存)；失败结果只在并发请求间共享，不缓存"""
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached.expires_at > time.time():
+                self._results.move_to_end(key)
+                self.stats["hits"] += 1
+                return cached, True
+            del self._results[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(task), True
+
+        # 上游请求在独立任务中执行，并用 shield 等待：
+        # 发起请求的客户端断开时不会取消其他等待者共享的请求
+        self.stats["fetches"] += 1
+        task = asyncio.create_task(self._fetch(key, ttl, fetch, cacheable))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task), False
+
+    async def _fetch(
+        self, key: str, ttl: float, fetch: Callable[[], Awaitable[Dict]], cacheable: Callable[[Dict], bool]
+    ) -> CachedResult:
+        payload = await fetch()
+        result = CachedResult(payload, compute_etag(payload), time.time() + ttl)
+        if ttl > 0 and cacheable(payload):
+            self._remember(key, result)
+        return result
+
+    def _remember(self, key: str, result: CachedResult) -> None:
+        now = time.time()
+        for expired in [stale for stale, cached in self._results.items() if cached.expires_at <= now]:
+            del self._results[expired]
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, prefix: Optional[str] = None) -> None:
+        """清除缓存，prefix 为空时全部清除"""
+        if prefix is None:
+            self._results.clear()
+            return
+        for key in [key for key in self._results if key.startswith(prefix)]:
+            del self._results[key]
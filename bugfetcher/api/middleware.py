@@ -0,0 +1,28 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..log import bind_request_id
+
+REQUEST_ID_HEADER = "x-request-id"
+
+
+class RequestIDMiddleware:
+    """为每个HTTP/WebSocket请求绑定关联ID：沿用客户端的 X-Request-ID，没有则生成，并在响应头中返回"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        incoming = dict(scope["headers"]).get(REQUEST_ID_HEADER.encode())
+        # 限制长度，避免客户端传入的超长值进入每条日志
+        request_id = incoming.decode("latin-1")[:64] if incoming else None
+        with bind_request_id(request_id) as request_id:
+
+            async def send_with_id(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+                await send(message)
+
+            await self.app(scope, receive, send_with_id)
@@ -0,0 +1,20 @@
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+from ..models.bug import json_default
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时退回标准库 json
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """安装了 orjson 时用其序列化，否则与 JSONResponse 相同；Bug 记录按禅道格式输出"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return json.dumps(
+                content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"), default=json_default
+            ).encode("utf-8")
+        return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
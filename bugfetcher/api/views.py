@@ -0,0 +1,86 @@
+import base64
+import binascii
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from ..store import assignee as bug_assignee
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(bug_id: int) -> str:
+    return base64.urlsafe_b64encode(str(bug_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """fields=id,title,severity -> ["id", "title", "severity"]，为空表示返回全部字段"""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()] or None
+
+
+def filter_bugs(
+    bugs: Iterable[Dict],
+    status: Optional[Sequence[str]] = None,
+    severity: Optional[Sequence[int]] = None,
+    assignee: Optional[str] = None,
+    opened_since: Optional[str] = None,
+    opened_until: Optional[str] = None,
+    edited_since: Optional[str] = None,
+    edited_until: Optional[str] = None,
+    keyword: Optional[str] = None,
+) -> List[Dict]:
+    """按条件筛选Bug，日期为禅道格式字符串，按字典序比较"""
+    status_set = set(status) if status else None
+    severity_set = {int(s) for s in severity} if severity else None
+    keyword = keyword.lower() if keyword else None
+    ranges = [
+        ("openedDate", opened_since, opened_until),
+        ("lastEditedDate", edited_since, edited_until),
+    ]
+    result = []
+    for bug in bugs:
+        if status_set is not None and bug.get("status") not in status_set:
+            continue
+        if severity_set is not None and bug.get("severity") not in severity_set:
+            continue
+        if assignee and assignee not in bug_assignee(bug):
+            continue
+        if keyword and keyword not in str(bug.get("title", "")).lower():
+            continue
+        if any(
+            (since and (bug.get(field) or "") < since) or (until and (bug.get(field) or "") > until)
+            for field, since, until in ranges
+        ):
+            continue
+        result.append(bug)
+    return result
+
+
+def paginate(
+    bugs: Iterable[Dict], cursor: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """按ID升序的游标分页，返回 (当前页, 下一页游标)"""
+    ordered = sorted(bugs, key=lambda bug: int(bug["id"]))
+    if cursor:
+        after = decode_cursor(cursor)
+        ordered = [bug for bug in ordered if int(bug["id"]) > after]
+    if not limit or len(ordered) <= limit:
+        return ordered, None
+    page = ordered[:limit]
+    return page, encode_cursor(int(page[-1]["id"]))
+
+
+def project(bugs: Iterable[Dict], fields: Optional[List[str]]) -> List[Dict]:
+    """只保留请求的字段"""
+    if not fields:
+        return list(bugs)
+    return [{field: bug[field] for field in fields if field in bug} for bug in bugs]
@@ -1,6 +1,9 @@
+import json
+import time
 import argparse
 import asyncio
 from ..core import BugFetcherCore
+from ..log import bind_request_id
 
 async def run_cli(args):
     parser = argparse.ArgumentParser(description="ZenTao Bug Fetcher CLI")
@@ -9,19 +12,42 @@ async def run_cli(args):
     parser.add_argument("--password", help="ZenTao password")
     # parser.add_argument("--feishu", help="Feishu Webhook URL")
     parser.add_argument("--product", help="Product id")
+    parser.add_argument("--products", help="Comma-separated product ids to poll concurrently")
     parser.add_argument("--interval", type=int, default=60, help="Fetch interval in minutes")
     parser.add_argument("--once", action="store_true", help="Run once and exit")
+    parser.add_argument("--team", action="store_true", help="Notify every subscribed team member")
+    parser.add_argument("--notify", action="store_true", help="Send changed bugs to Feishu after each fetch")
+    subparsers = parser.add_subparsers(dest="command")
+    report = subparsers.add_parser("report", help="Print bug statistics for a month or date range")
+    report.add_argument("--month", help="Month to report, YYYY-MM (default: current month to date)")
+    report.add_argument("--since", help="Start date, YYYY-MM-DD")
+    report.add_argument("--until", help="End date, YYYY-MM-DD (default: now)")
+    report.add_argument("--top", type=int, default=10, help="Groups shown per dimension")
+    report.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    report.add_argument("--send", action="store_true", help="Send the report summary to Feishu")
     args = parser.parse_args(args)
 
-    fetcher = BugFetcherCore()
+    async with BugFetcherCore() as fetcher:
+        await _run(fetcher, args)
+
+
+async def _run(fetcher: BugFetcherCore, args):
+    overrides = {}
     if args.username:
-        fetcher._config["zentao_username"] = args.username
+        overrides["zentao_username"] = args.username
     if args.password:
-        fetcher._config["zentao_password"] = args.password
+        overrides["zentao_password"] = args.password
     if args.product:
-        fetcher._config["selected_product_id"] = args.product
-    fetcher.save_config()
-    fetcher._load_config()
+        overrides["selected_product_id"] = args.product
+    if args.products:
+        overrides["product_ids"] = [p.strip() for p in args.products.split(",") if p.strip()]
+    if overrides:
+        fetcher.update_config(overrides)
+    if args.command == "report":
+        # 报表可以只用本地存储的数据，登录由核心模块按需进行
+        with bind_request_id():
+            await run_report(fetcher, args)
+        return
     fetcher.zentao_token = ""
 
     # 统一登录凭证校验
@@ -31,8 +57,8 @@ async def run_cli(args):
 
     if not fetcher.zentao_token:
         fetcher.log_message("Getting ZenTao token")
-        fetcher.zentao_token = await fetcher.get_zentao_token()
-        fetcher.save_config()  # 保持与API相同的保存逻辑
+        # 令牌由核心模块在后台持久化
+        await fetcher.get_zentao_token()
 
     fetcher.log_message("Fetching user info")
     user_info = await fetcher.fetch_user_info()
@@ -40,7 +66,7 @@ async def run_cli(args):
         fetcher.log_message(f"Failed to fetch user info: {user_info['message']}")
         return
 
-    if not fetcher.selected_product_id:
+    if not fetcher.product_ids:
         fetcher.log_message("Fetching products")
         products = await fetcher.fetch_products()
         if products:
@@ -55,24 +81,143 @@ async def run_cli(args):
                 "selected_product_id": products[choice]['id']
             })
 
+    poll = notify_team if args.team else notify_changes if args.notify else poll_bugs
+    if args.team:
+        # 团队通知经由后台队列限流重试，退出时尽量发完
+        await fetcher.start_delivery_queue()
     if args.once:
-        fetcher.log_message("Fetching new bugs")
-        bugs = await fetcher.fetch_new_bugs()
-        if bugs["status"] == "error":
-            fetcher.log_message(f"Failed to fetch new bugs: {bugs['message']}")
-        else:
-            fetcher.log_message(f"Total new bugs: {len(bugs['bugs'])}")
-    else:
-        import time
+        with bind_request_id():
+            await poll(fetcher)
+        log_metrics_summary(fetcher)
+        return
+
+    # 常驻轮询时 config.json 的修改无需重启即可生效
+    fetcher.watch_config()
+    # 有变化时缩短间隔，无变化时逐步退避，并遵守禅道的 Retry-After
+    policy = fetcher.poll_policy(base=args.interval * 60)
+    summary_interval = fetcher._config.get("metrics_summary_interval", 300)
+    last_summary = time.monotonic()
+    try:
         while True:
-            fetcher.log_message("Fetching new bugs")
-            bugs = await fetcher.fetch_new_bugs()
+            before = fetcher.sync_changes
+            with bind_request_id():
+                await poll(fetcher)
+            if summary_interval and time.monotonic() - last_summary >= summary_interval:
+                log_metrics_summary(fetcher)
+                last_summary = time.monotonic()
+            interval = policy.update(fetcher.sync_changes != before, fetcher.retry_after())
+            print(f"Next fetch in {interval / 60:.1f} minutes")
+            await asyncio.sleep(interval)
+    finally:
+        log_metrics_summary(fetcher)
+
+
+def log_metrics_summary(fetcher: BugFetcherCore):
+    """把计数器、仪表和耗时分位数汇总为一行日志"""
+    if not fetcher.metrics.enabled:
+        return
+    summary = fetcher.metrics.summary()
+    fetcher.log_message(f"Metrics summary: {json.dumps(summary, ensure_ascii=False, sort_keys=True)}")
+
+
+async def run_report(fetcher: BugFetcherCore, args):
+    """report 子命令：统计并打印报表，--send 时把摘要发送到飞书"""
+    options = {"month": args.month, "since": args.since, "until": args.until, "top": args.top}
+    if args.send:
+        result = await fetcher.send_report(**options)
+        report = result.get("report", result)
+    else:
+        result = report = await fetcher.bug_report(**options)
+    if report["status"] == "error":
+        fetcher.log_message(f"Failed to build report: {report['message']}")
+        return
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    if args.send:
+        sent = result["notification"]
+        fetcher.log_message(f"Report notification {sent['status']}: {sent['message']}")
+
+
+def print_report(report: dict):
+    """以文本表格打印报表"""
+    period, summary = report["period"], report["summary"]
+
+    def percent(value):
+        return f"{value * 100:.1f}%" if value is not None else "-"
+
+    print(f"Bug report {period['since']} ~ {period['until']} ({period['days']} days, {report['bugs']} bugs)")
+    print(
+        f"Open {summary['open']}  opened {summary['opened']}  resolved {summary['resolved']}  "
+        f"resolution {percent(summary['resolution_ratio'])}  MTTR {summary['mttr_days'] or '-'} days"
+    )
+    print("Aging: " + "  ".join(f"{label} {count}" for label, count in summary["aging"].items()))
+    for dim in ("product", "assignee", "module", "severity"):
+        rows = report[f"by_{dim}"]
+        if not rows:
+            continue
+        print(f"\nBy {dim}:")
+        print(f"  {'key':<20}{'open':>8}{'opened':>8}{'resolved':>10}{'ratio':>8}{'mttr':>8}")
+        for row in rows:
+            print(
+                f"  {str(row['key']):<20}{row['open']:>8}{row['opened']:>8}{row['resolved']:>10}"
+                f"{percent(row['resolution_ratio']):>8}{str(row['mttr_days'] or '-'):>8}"
+            )
+    print("\nWeekly trend:")
+    for week in report["trend"]:
+        print(f"  {week['week_start']}  opened {week['opened']:>6}  resolved {week['resolved']:>6}")
+    wow = report.get("week_over_week")
+    if wow:
+        print(
+            f"Week over week: opened {percent(wow['opened']['change'])}, "
+            f"resolved {percent(wow['resolved']['change'])}"
+        )
+
+
+async def poll_bugs(fetcher: BugFetcherCore):
+    """轮询一次所有配置的产品"""
+    fetcher.log_message("Fetching new bugs")
+    if len(fetcher.product_ids) > 1:
+        result = await fetcher.fetch_bugs_for_products()
+        if result["status"] == "error":
+            fetcher.log_message(f"Failed to fetch new bugs: {result['message']}")
+            return
+        for product_id, bugs in result["products"].items():
             if bugs["status"] == "error":
-                fetcher.log_message(f"Failed to fetch new bugs: {bugs['message']}")
+                fetcher.log_message(f"[{product_id}] Failed to fetch new bugs: {bugs['message']}")
             else:
-                fetcher.log_message(f"Total new bugs: {len(bugs['bugs'])}")
-            print(f"Next fetch in {args.interval} minutes")
-            await asyncio.sleep(args.interval * 60)
+                fetcher.log_message(f"[{product_id}] Total new bugs: {len(bugs['bugs'])}")
+        fetcher.log_message(f"Total new bugs: {result['total']}")
+        return
+
+    bugs = await fetcher.fetch_new_bugs()
+    if bugs["status"] == "error":
+        fetcher.log_message(f"Failed to fetch new bugs: {bugs['message']}")
+    else:
+        fetcher.log_message(f"Total new bugs: {len(bugs['bugs'])}")
+
+async def notify_changes(fetcher: BugFetcherCore):
+    """获取当前用户的Bug，只在有变化时通知"""
+    fetcher.log_message("Fetching new bugs")
+    result = await fetcher.fetch_and_notify()
+    if result["status"] == "error":
+        fetcher.log_message(f"Failed to fetch new bugs: {result['message']}")
+        return
+    sent = result["notification"]
+    fetcher.log_message(f"Total new bugs: {len(result['bugs'])}, notification {sent['status']}: {sent['message']}")
+
+
+async def notify_team(fetcher: BugFetcherCore):
+    """团队模式：一次扫描，通知所有订阅成员"""
+    fetcher.log_message("Notifying team")
+    result = await fetcher.notify_team()
+    if result["status"] == "error":
+        fetcher.log_message(f"Failed to notify team: {result['message']}")
+        return
+    for account, sent in result["notified"].items():
+        fetcher.log_message(f"[{account}] {sent['status']}: {sent['message']}")
+
 
 if __name__ == "__main__":
     import sys
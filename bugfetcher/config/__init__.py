@@ -0,0 +1 @@
+from .config import RUNTIME_KEYS, ConfigManager, ConfigWatcher, atomic_write_json, validate_config
@@ -1,17 +1,278 @@
 import os
 import json
-from typing import Dict
+import logging
+import tempfile
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog 为可选依赖，缺失时退回后台线程定期检查 mtime
+    FileSystemEventHandler = object
+    Observer = None
+
+# 运行时状态：由程序自己频繁改写，单独保存，不进入用户编辑的 config.json
+RUNTIME_KEYS = frozenset({"zentao_token"})
+
+
+def default_state_path(config_path: str) -> str:
+    """config.json -> config.state.json"""
+    root, ext = os.path.splitext(config_path)
+    return f"{root}.state{ext or '.json'}"
+
+
+def atomic_write_json(path: str, data: Dict) -> None:
+    """写入同目录临时文件后 rename，其他进程只会读到完整的旧文件或新文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def validate_config(config: Dict, log: Callable[..., None]) -> Dict:
+    """用 ConfigModel 校验并转换已知字段，无效字段丢弃(使用默认值)，未知字段原样保留"""
+    from pydantic import ValidationError
+    from ..models import ConfigModel, model_to_dict
+
+    config = dict(config)
+    try:
+        model = ConfigModel(**config)
+    except ValidationError as e:
+        invalid = {str(error["loc"][0]) for error in e.errors() if error["loc"]}
+        log(f"Invalid config fields ignored: {', '.join(sorted(invalid))}", level=logging.ERROR)
+        for key in invalid:
+            config.pop(key, None)
+        model = ConfigModel(**config)
+    config.update(model_to_dict(model, exclude_unset=True))
+    return config
+
 
 class ConfigManager:
-    def __init__(self, config_path: str = "config.json"):
+    """配置读写
+
+    静态配置(config.json，URL、Webhook、间隔等)与运行时状态(令牌等，见 RUNTIME_KEYS)
+    分文件保存。save() 只记录待写入的快照，debounce 秒后在后台线程中原子写入，
+    期间的多次保存合并为一次；内容未变的文件不重写。
+    """
+
+    def __init__(
+        self,
+        config_path: str = "config.json",
+        state_path: Optional[str] = None,
+        debounce: float = 0.5,
+        runtime_keys: Iterable[str] = RUNTIME_KEYS,
+        log: Optional[Callable[..., None]] = None,
+    ):
         self.config_path = config_path
+        self.state_path = state_path or default_state_path(config_path)
+        self.debounce = debounce
+        self.runtime_keys = frozenset(runtime_keys)
+        self._log = log or (lambda message, level=logging.INFO: logging.getLogger("BugFetcher").log(level, message))
+        self._lock = threading.Lock()  # 保护待写入快照和定时器
+        self._write_lock = threading.Lock()  # 串行化文件写入
+        self._pending: Optional[Dict] = None
+        self._timer: Optional[threading.Timer] = None
+        self._written: Dict[str, Dict] = {}  # 路径 -> 最近一次读到或写入的内容
+        self._raw_static: Dict = {}  # config.json 中的原始内容(未经校验)
+        self._loaded_static: Dict = {}  # 校验后的内存视图
+        self.config_mtime_ns = 0  # 最近一次读到或写入的 config.json 修改时间
+
+    def split(self, config: Dict) -> Tuple[Dict, Dict]:
+        """拆分为 (静态配置, 运行时状态)"""
+        static = {key: value for key, value in config.items() if key not in self.runtime_keys}
+        state = {key: value for key, value in config.items() if key in self.runtime_keys}
+        return static, state
+
+    def _read(self, path: str) -> Dict:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            self._log(f"Config error: {path}: {str(e)}", level=logging.ERROR)
+            return {}
+        if not isinstance(data, dict):
+            self._log(f"Config error: {path} is not a JSON object", level=logging.ERROR)
+            return {}
+        return data
+
+    def load_static(self) -> Dict:
+        """读取并校验 config.json"""
+        try:
+            self.config_mtime_ns = os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            self.config_mtime_ns = 0
+        raw = self._read(self.config_path)
+        static = validate_config(raw, self._log)
+        self._raw_static = raw
+        self._loaded_static = static
+        self._written[self.config_path] = raw
+        return static
+
+    def _to_disk(self, static: Dict) -> Dict:
+        """内存中的静态配置转为写入 config.json 的内容
+
+        未修改的字段写回文件中的原值(而不是类型转换后的值)，校验失败、只从内存中
+        丢弃的字段原样保留，避免一次保存就把用户的配置永久删掉。
+        """
+        raw, loaded = self._raw_static, self._loaded_static
+        data = {
+            key: raw[key] if key in raw and key in loaded and loaded[key] == value else value
+            for key, value in static.items()
+        }
+        for key, value in raw.items():
+            if key not in loaded and key not in data and key not in self.runtime_keys:
+                data[key] = value
+        return data
+
+    def reload_static(self) -> Dict:
+        """重新读取被外部修改的 config.json
+
+        仍在等待写入的本地修改优先，其余字段取文件中的新值，合并结果继续等待写入。
+        """
+        with self._write_lock, self._lock:
+            previous = self._loaded_static
+            static = self.load_static()
+            if self._pending is not None:
+                pending_static, state = self.split(self._pending)
+                local = {key: value for key, value in pending_static.items() if previous.get(key) != value}
+                static = {**static, **local}
+                self._pending = {**static, **state}
+        return static
 
     def load(self) -> Dict:
-        if os.path.exists(self.config_path):
-            with open(self.config_path, 'r') as f:
-                return json.load(f)
-        return {}
+        """返回合并后的配置
+
+        旧版 config.json 中的令牌在状态文件没有时沿用，下次保存时移入状态文件。
+        """
+        static = self.load_static()
+        state = self._read(self.state_path)
+        self._written[self.state_path] = dict(state)
+        return {**static, **state}
 
     def save(self, config: Dict) -> None:
-        with open(self.config_path, 'w') as f:
-            json.dump(config, f)
\ No newline at end of file
+        """debounce 秒后在后台写入 config 的快照"""
+        with self._lock:
+            self._pending = dict(config)
+            if self.debounce > 0:
+                if self._timer is None:
+                    self._timer = threading.Timer(self.debounce, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        """立即写入待保存的配置(退出前调用)"""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, None
+                timer, self._timer = self._timer, None
+            if timer is not None:
+                timer.cancel()
+            if pending is None:
+                return
+            static, state = self.split(pending)
+            try:
+                for path, data in ((self.config_path, self._to_disk(static)), (self.state_path, state)):
+                    if self._written.get(path) == data:
+                        continue
+                    atomic_write_json(path, data)
+                    self._written[path] = data
+                    if path == self.config_path:
+                        self.config_mtime_ns = os.stat(path).st_mtime_ns
+                        self._raw_static, self._loaded_static = data, static
+                    self._log(f"Configuration saved: {path}", level=logging.INFO)
+            except OSError as e:
+                self._log(f"Failed to save configuration: {str(e)}", level=logging.ERROR)
+
+    def changed_on_disk(self) -> bool:
+        """config.json 是否被其他进程或用户修改过(自身写入不算)"""
+        try:
+            mtime_ns = os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return False
+        return mtime_ns != self.config_mtime_ns
+
+
+class _ConfigEventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "ConfigWatcher"):
+        self.watcher = watcher
+
+    def on_any_event(self, event) -> None:
+        paths = {getattr(event, "src_path", ""), getattr(event, "dest_path", "")}
+        if any(path and os.path.abspath(path) == self.watcher.path for path in paths):
+            self.watcher.check()
+
+
+class ConfigWatcher:
+    """监视 config.json 的外部修改并回调 on_change(静态配置)
+
+    安装了 watchdog 时使用系统文件通知(inotify/FSEvents/ReadDirectoryChangesW)，
+    否则在后台线程中每 interval 秒检查一次修改时间。回调在监视线程中执行。
+    """
+
+    def __init__(self, manager: ConfigManager, on_change: Callable[[Dict], None], interval: float = 2.0):
+        self.manager = manager
+        self.on_change = on_change
+        self.interval = interval
+        self.path = os.path.abspath(manager.config_path)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        self._check_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._observer is not None or self._thread is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        if Observer is not None:
+            self._observer = Observer()
+            self._observer.schedule(_ConfigEventHandler(self), os.path.dirname(self.path), recursive=False)
+            self._observer.daemon = True
+            self._observer.start()
+        else:
+            self._thread = threading.Thread(target=self._poll, name="config-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        observer, self._observer = self._observer, None
+        thread, self._thread = self._thread, None
+        if observer is not None:
+            observer.stop()
+            observer.join()
+        if thread is not None:
+            thread.join()
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> bool:
+        """文件有外部修改时重新加载并回调，返回是否回调"""
+        with self._check_lock:
+            if not self.manager.changed_on_disk():
+                return False
+            config = self.manager.reload_static()
+        try:
+            self.on_change(config)
+        except Exception as e:
+            self.manager._log(f"Config reload callback failed: {str(e)}", level=logging.ERROR)
+        return True
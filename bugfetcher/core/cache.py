@@ -0,0 +1,142 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+# 默认缓存规则：(路径正则, 新鲜期秒数)；Bug列表变化频繁，不在此缓存
+DEFAULT_TTLS = {
+    r"/api\.php/v1/products/?$": 600,
+    r"/api\.php/v1/user/?$": 300,
+}
+
+
+class CacheEntry:
+    __slots__ = ("data", "etag", "last_modified", "stored_at", "expires_at")
+
+    def __init__(self, data: Any, etag: str, last_modified: str, stored_at: float, expires_at: float):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class ResponseCache:
+    """禅道只读接口的响应缓存
+
+    内存LRU(条目数上限) + 可选磁盘层；按路径配置TTL，过期后在 stale 窗口内
+    先返回旧数据并在后台重新验证(ETag/Last-Modified)。
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = 256,
+        stale_ttl: float = 60,
+        disk_dir: Optional[str] = None,
+    ):
+        rules = ttls if ttls is not None else DEFAULT_TTLS
+        self.rules: List[Tuple["re.Pattern", float]] = [(re.compile(p), float(t)) for p, t in rules.items()]
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+
+    def ttl_for(self, url: str) -> float:
+        """URL 对应的新鲜期，0 表示不缓存"""
+        path = urlsplit(url).path
+        for pattern, ttl in self.rules:
+            if pattern.search(path):
+                return ttl
+        return 0
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict] = None, scope: str = "") -> str:
+        """缓存键：调用者(账号) + URL + 排序后的查询参数"""
+        query = urlencode(sorted((params or {}).items()))
+        return f"{scope}|{url}?{query}"
+
+    def is_fresh(self, entry: CacheEntry, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < entry.expires_at
+
+    def is_usable_stale(self, entry: CacheEntry, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < entry.expires_at + self.stale_ttl
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.disk_dir:
+            entry = await asyncio.to_thread(self._disk_read, key)
+            if entry is not None:
+                self.stats["disk_hits"] += 1
+                self._remember(key, entry)
+        return entry
+
+    async def put(self, key: str, data: Any, ttl: float, etag: str = "", last_modified: str = "") -> None:
+        now = time.time()
+        entry = CacheEntry(data, etag, last_modified, now, now + ttl)
+        self._remember(key, entry)
+        self.stats["stores"] += 1
+        if self.disk_dir:
+            await asyncio.to_thread(self._disk_write, key, entry)
+
+    async def touch(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        """304 重新验证成功，延长新鲜期"""
+        entry.expires_at = time.time() + ttl
+        self.stats["revalidated"] += 1
+        self._remember(key, entry)
+        if self.disk_dir:
+            await asyncio.to_thread(self._disk_write, key, entry)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def snapshot_stats(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] + self.stats["stale_hits"]) / lookups if lookups else 0.0
+        return {**self.stats, "entries": len(self._entries), "hit_rate": round(hit_rate, 4)}
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    ### **磁盘层**
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _disk_read(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._disk_path(key)) as f:
+                return CacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _disk_write(self, key: str, entry: CacheEntry) -> None:
+        os.makedirs(self.disk_dir, exist_ok=True)
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -1,11 +1,36 @@
-import os
-import json
-import datetime
+import time
 import aiohttp
 import asyncio
 import logging
-from typing import Optional, List, Dict, Any, Callable
+import threading
+import concurrent.futures
+from urllib.parse import urlsplit
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Set, Tuple
 from ..models.models import FeishuMessage
+from ..models.bug import Bug, as_dict, parse_bugs
+from ..delivery import FeishuDeliveryQueue, diff_bugs, render_feishu_payload
+from ..store import BugStore, assignee
+from ..metrics import Metrics, NullMetrics, endpoint_label
+from ..config import ConfigManager, ConfigWatcher
+from ..log import LOGGER_NAME, add_secret, configure_logging
+from .sync import BugSnapshot, index_by_assignee
+from .loop import LoopThread
+from .scheduler import AdaptiveInterval, Job, Scheduler
+from .events import BugEventHub
+from .token import TokenManager
+from .cache import CacheEntry, ResponseCache
+from .stream import iter_json_array
+
+
+# 变化后需要重新配置日志管道的配置键
+LOGGING_KEYS = frozenset({
+    "log_level", "log_format", "log_file", "log_sample_rates", "zentao_password", "feishu_webhook_url",
+})
+# 变化后需要重建调度任务的配置键
+SCHEDULE_KEYS = frozenset({
+    "product_ids", "selected_product_id", "schedule_jobs", "fetch_interval", "schedule_jitter",
+    "adaptive_polling", "poll_min_interval", "poll_max_interval", "poll_bounds",
+})
 
 
 class BugFetcherCore:
@@ -13,28 +38,113 @@ class BugFetcherCore:
         """初始化 BugFetcherCore 类"""
         self.config_path = config_path
         self.user_realname = ""  # 用户真实姓名
-        self._config = {}  # 配置缓存
-        self._config_mtime = 0  # 配置文件修改时间戳
+        self.user_account = ""  # 用户账号
+        self._config = {}  # 合并后的配置：静态配置 + 运行时状态
+        self.config_manager = ConfigManager(config_path, log=lambda *args, **kwargs: self.log_message(*args, **kwargs))
+        self._config_watcher: Optional[ConfigWatcher] = None  # config.json 外部修改监视
+        self.config_listeners: List[Callable[[Set[str]], None]] = []  # 配置变化回调，参数为变化的键
+        self._session: Optional[aiohttp.ClientSession] = None  # 共享HTTP会话
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None  # 会话所属事件循环
+        self._snapshots: Dict[str, BugSnapshot] = {}  # 按产品缓存的Bug快照
+        self._syncs: Dict[str, asyncio.Future] = {}  # 产品ID -> 进行中的同步，同一产品同时只同步一次
+        self._store: Optional[BugStore] = None  # 本地Bug存储，首次使用时打开
+        self._background_tasks: Set[asyncio.Future] = set()  # 后台缓存重新验证等任务
+        self.deliveries: Optional[FeishuDeliveryQueue] = None  # 飞书后台投递队列
+        self._fingerprints: Dict[str, Dict[str, str]] = {}  # 未启用本地存储时的通知指纹
+        self._loop_thread: Optional[LoopThread] = None  # 同步接口使用的后台事件循环
+        self._response_cache: Optional[ResponseCache] = None  # 禅道只读接口响应缓存
+        self._revalidating: Dict[str, asyncio.Task] = {}  # 正在后台重新验证的缓存键
+        self.events = BugEventHub()  # Bug变化事件广播，供SSE/WebSocket推送
+        self.sync_changes = 0  # 累计同步到的Bug变化数，轮询间隔据此自适应
+        self.rate_limited_until = 0.0  # 禅道要求的 Retry-After 截止时间
+        self.last_poll_success: Dict[str, float] = {}  # 产品ID -> 最近一次同步成功的时间
+        self.progress_callback: Optional[Callable[[int, int], None]] = None  # 分页进度回调(已完成页数, 总页数)
+        # (各产品快照指纹, BugColumns)，快照变化时增量更新；工作线程中更新和聚合时加锁
+        self._report_columns: Optional[tuple] = None
+        self._report_lock = threading.Lock()
+        self.tokens = TokenManager(
+            self._login,
+            current=lambda: self.zentao_token,
+            ttl=lambda: self.token_ttl,
+            refresh_margin=lambda: self.token_refresh_margin,
+        )
 
-        # 配置日志
-        self.logger = logging.getLogger("BugFetcher")
-        self.logger.setLevel(logging.DEBUG)  # 设置日志级别为 DEBUG
+        self.logger = logging.getLogger(LOGGER_NAME)
 
-        # 初始化时加载配置
+        # 初始化时加载配置，日志级别和输出格式由配置决定
         self._load_config()
+        self.metrics = self._create_metrics()
+
+    def _create_metrics(self):
+        """metrics_enabled 为 false 时返回空实现，热路径上的记录调用几乎没有开销"""
+        if not self._config.get("metrics_enabled", True):
+            return NullMetrics()
+        metrics = Metrics()
+        metrics.describe("api_request_seconds", "ZenTao API request latency by endpoint and status")
+        metrics.describe("token_refresh_total", "ZenTao logins by result")
+        metrics.describe("auth_retries_total", "Requests retried after a 401")
+        metrics.describe("response_cache_total", "ZenTao response cache lookups by result")
+        metrics.describe("bugs_fetched_total", "Bugs received from ZenTao by product and sync mode")
+        metrics.describe("feishu_deliveries_total", "Feishu webhook sends by status")
+        metrics.describe("delivery_queue_depth", "Feishu messages waiting in the delivery queue")
+        metrics.describe("last_poll_age_seconds", "Seconds since the last successful sync per product")
+        metrics.gauge_callback(
+            "delivery_queue_depth", lambda: {(): self.deliveries.depth if self.deliveries is not None else 0}
+        )
+        metrics.gauge_callback("last_poll_age_seconds", lambda: {
+            (("product", product_id),): time.time() - synced_at
+            for product_id, synced_at in self.last_poll_success.items()
+        })
+        return metrics
 
     def _load_config(self) -> None:
-        """智能加载配置，仅在文件修改后重新加载"""
-        try:
-            current_mtime = os.path.getmtime(self.config_path)
-            if current_mtime != self._config_mtime:
-                with open(self.config_path, "r") as f:
-                    self._config = json.load(f)
-                self._config_mtime = current_mtime
-                self.log_message("Configuration reloaded", level=logging.INFO)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            self.log_message(f"Config error: {str(e)}", level=logging.ERROR)
-            self._config = {}
+        """从磁盘加载配置和运行时状态，已知字段按 ConfigModel 校验"""
+        self._config = self.config_manager.load()
+        self._configure_logging()
+        self.log_message("Configuration reloaded", level=logging.INFO)
+
+    def update_config(self, updates: Dict) -> Set[str]:
+        """合并配置更新并在后台保存，返回值发生变化的键"""
+        changed = {key for key, value in updates.items() if self._config.get(key) != value}
+        self._config = {**self._config, **updates}
+        self._apply_config_change(changed)
+        self.save_config()
+        return changed
+
+    def _apply_config_change(self, changed: Set[str]) -> None:
+        """配置变化后重建依赖这些配置的组件"""
+        if not changed:
+            return
+        if any(key.startswith("response_cache") for key in changed):
+            # 缓存规则变化，下次请求时按新配置重建
+            self._response_cache = None
+        if "metrics_enabled" in changed:
+            self.metrics = self._create_metrics()
+        if changed & LOGGING_KEYS:
+            self._configure_logging()
+        for listener in list(self.config_listeners):
+            listener(changed)
+
+    def watch_config(self) -> ConfigWatcher:
+        """开始监视 config.json 的外部修改(其他进程或手工编辑)，变化时自动重新加载"""
+        if self._config_watcher is None:
+            self._config_watcher = ConfigWatcher(
+                self.config_manager,
+                self._on_config_file_changed,
+                interval=self._config.get("config_watch_interval", 2),
+            )
+        self._config_watcher.start()
+        return self._config_watcher
+
+    def _on_config_file_changed(self, static: Dict) -> None:
+        """监视线程中调用：替换静态配置，保留内存中的运行时状态"""
+        static, _ = self.config_manager.split(static)
+        _, state = self.config_manager.split(self._config)
+        config = {**static, **state}
+        changed = {key for key in set(config) | set(self._config) if config.get(key) != self._config.get(key)}
+        self._config = config
+        self.log_message(f"Configuration reloaded: {', '.join(sorted(changed)) or 'no changes'}", level=logging.INFO)
+        self._apply_config_change(changed)
 
     @property
     def zentao_url(self) -> str:
@@ -65,6 +175,141 @@ class BugFetcherCore:
     def zentao_token(self, value: str):
         """更新令牌"""
         self._config["zentao_token"] = value
+        add_secret(value)
+
+    @property
+    def token_ttl(self) -> float:
+        """令牌有效期(秒)，默认与禅道会话过期时间一致，0 表示不提前刷新"""
+        return self._config.get("token_ttl", 1440)
+
+    @property
+    def token_refresh_margin(self) -> float:
+        """在令牌过期前多少秒提前刷新"""
+        return self._config.get("token_refresh_margin", 60)
+
+    @property
+    def max_auth_retries(self) -> int:
+        """单个请求因401刷新令牌后的最大重试次数"""
+        return self._config.get("max_auth_retries", 1)
+
+    @property
+    def http_timeout(self) -> float:
+        """禅道请求总超时(秒)"""
+        return self._config.get("http_timeout", 30)
+
+    @property
+    def feishu_timeout(self) -> float:
+        """飞书请求总超时(秒)"""
+        return self._config.get("feishu_timeout", 10)
+
+    @property
+    def bug_page_size(self) -> int:
+        """分页获取Bug时每页条数"""
+        return self._config.get("bug_page_size", 500)
+
+    @property
+    def bug_fetch_concurrency(self) -> int:
+        """分页获取Bug时的最大并发页数"""
+        return self._config.get("bug_fetch_concurrency", 4)
+
+    @property
+    def incremental_sync(self) -> bool:
+        """是否按 lastEditedDate 水位增量同步Bug"""
+        return self._config.get("incremental_sync", True)
+
+    @property
+    def delta_page_size(self) -> int:
+        """增量同步时每页条数"""
+        return self._config.get("delta_page_size", 50)
+
+    @property
+    def bug_fields(self) -> List[str]:
+        """解析Bug时额外保留的禅道字段(默认只保留 Bug 模型中的字段)"""
+        return self._config.get("bug_fields", [])
+
+    def parse_bug(self, raw: Dict) -> Bug:
+        """把禅道返回的Bug字典转换为精简的 Bug 记录"""
+        return Bug.from_zentao(raw, self.bug_fields)
+
+    @property
+    def stream_json(self) -> bool:
+        """列表接口是否流式解析响应体(逐条转换，不在内存中保留整页原始数据)"""
+        return self._config.get("stream_json", True)
+
+    @property
+    def stream_chunk_size(self) -> int:
+        """流式解析时每次读取的字节数"""
+        return self._config.get("stream_chunk_size", 64 * 1024)
+
+    @property
+    def full_sync_interval(self) -> int:
+        """增量模式下强制全量同步的间隔(秒)，用于发现被删除的Bug"""
+        return self._config.get("full_sync_interval", 3600)
+
+    @property
+    def product_ids(self) -> List[str]:
+        """需要轮询的产品ID列表，未配置时退回到当前选择的产品"""
+        product_ids = self._config.get("product_ids")
+        if product_ids:
+            return [str(product_id) for product_id in product_ids]
+        return [str(self.selected_product_id)] if self.selected_product_id else []
+
+    @property
+    def product_poll_concurrency(self) -> int:
+        """同时轮询的最大产品数"""
+        return self._config.get("product_poll_concurrency", 8)
+
+    @property
+    def team_subscribers(self) -> Dict[str, str]:
+        """团队模式订阅成员：账号 -> 个人Webhook(空字符串表示使用默认Webhook)
+
+        配置项 team_subscribers 可以是账号列表，也可以是 {"account", "webhook"} 对象列表。
+        """
+        subscribers: Dict[str, str] = {}
+        for item in self._config.get("team_subscribers", []):
+            if isinstance(item, dict):
+                subscribers[item["account"]] = item.get("webhook", "")
+            else:
+                subscribers[str(item)] = ""
+        return subscribers
+
+    @property
+    def feishu_send_concurrency(self) -> int:
+        """团队通知时同时发送的最大消息数"""
+        return self._config.get("feishu_send_concurrency", 4)
+
+    @property
+    def notify_only_changes(self) -> bool:
+        """只在用户的Bug集合变化时通知，并只发送变化部分"""
+        return self._config.get("notify_only_changes", True)
+
+    @property
+    def store(self) -> Optional[BugStore]:
+        """本地SQLite Bug存储，bug_store_enabled 为 false 时返回 None"""
+        if self._store is None and self._config.get("bug_store_enabled", True):
+            self._store = BugStore(self._config.get("bug_store_path", "bugs.db"))
+        return self._store
+
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        """禅道GET响应缓存，response_cache_enabled 为 false 时返回 None
+
+        response_cache_ttls 为 {路径正则: 秒数}，未配置时缓存产品列表和用户信息。
+        """
+        if self._response_cache is None and self._config.get("response_cache_enabled", True):
+            self._response_cache = ResponseCache(
+                ttls=self._config.get("response_cache_ttls"),
+                max_entries=self._config.get("response_cache_size", 256),
+                stale_ttl=self._config.get("response_cache_stale", 60),
+                disk_dir=self._config.get("response_cache_dir"),
+            )
+        return self._response_cache
+
+    def cache_stats(self) -> Dict:
+        """响应缓存命中统计"""
+        if self.response_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.response_cache.snapshot_stats()}
 
     @property
     def selected_product(self) -> str:
@@ -75,98 +320,533 @@ class BugFetcherCore:
         return self._config.get("selected_product_id", "")
 
     ### **日志和配置管理**
-    def log_message(self, message: str, level: int = logging.INFO) -> None:
-        """记录日志信息"""
-        self.logger.log(level, message)
-        # 同时输出到控制台，方便调试
-        print(f"{datetime.datetime.now()}: {message}")
+    def _configure_logging(self) -> None:
+        """按配置设置日志级别、格式、文件和采样率，并登记需要脱敏的密钥"""
+        configure_logging(
+            level=self._config.get("log_level", "INFO"),
+            fmt=self._config.get("log_format", "text"),
+            log_file=self._config.get("log_file"),
+            sample_rates=self._config.get("log_sample_rates"),
+            secrets=[self.zentao_password, self.zentao_token, self.feishu_webhook_url],
+        )
+
+    def log_message(
+        self, message: str, *args, level: int = logging.INFO, event: Optional[str] = None, **fields
+    ) -> None:
+        """记录日志，级别未启用时直接返回
+
+        args 按 logging 的 % 语法在写出时才格式化；event 为事件名(用于采样)，
+        其余关键字参数作为结构化字段输出。
+        """
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, message, *args, extra={"event": event, "fields": fields})
 
     def save_config(self) -> None:
-        """保存配置到文件"""
-        with open(self.config_path, "w") as f:
-            json.dump(self._config, f)
-        self._config_mtime = os.path.getmtime(self.config_path)
-        self.log_message("Configuration saved", level=logging.INFO)
-
-    async def api_request(self, method: str, url: str, **kwargs) -> Dict:
-        """统一API请求处理方法"""
+        """保存配置：静态配置和运行时状态分文件，短时间内的多次保存合并后在后台原子写入"""
+        self.config_manager.save(self._config)
+
+    ### **HTTP会话管理**
+    async def get_session(self) -> aiohttp.ClientSession:
+        """获取共享的HTTP会话，连接池在所有禅道和飞书请求间复用"""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            return self._session
+        if self._session is not None and not self._session.closed:
+            # 会话绑定在旧的事件循环上，无法跨循环复用
+            await self._discard_session()
+
+        connector = aiohttp.TCPConnector(
+            limit=self._config.get("http_pool_limit", 100),
+            limit_per_host=self._config.get("http_pool_limit_per_host", 10),
+            ttl_dns_cache=self._config.get("http_dns_cache_ttl", 300),
+            keepalive_timeout=self._config.get("http_keepalive_timeout", 30),
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.http_timeout,
+            connect=self._config.get("http_connect_timeout", 10),
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        self._session_loop = loop
+        self.log_message("HTTP session opened", level=logging.DEBUG)
+        return self._session
+
+    async def _discard_session(self) -> None:
+        """丢弃属于其他事件循环的会话"""
+        session, self._session, self._session_loop = self._session, None, None
+        try:
+            await session.close()
+        except RuntimeError:
+            # 原事件循环已关闭，只能放弃连接
+            pass
+
+    async def close(self) -> None:
+        """关闭共享HTTP会话，停止配置监视并写入待保存的配置"""
+        if self._config_watcher is not None:
+            await asyncio.to_thread(self._config_watcher.stop)
+        await asyncio.to_thread(self.config_manager.flush)
+        if self.deliveries is not None:
+            await self.deliveries.stop()
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self._session is None:
+            return
+        session, self._session, self._session_loop = self._session, None, None
+        if not session.closed:
+            await session.close()
+            self.log_message("HTTP session closed", level=logging.DEBUG)
+
+    def close_store(self) -> None:
+        """关闭本地Bug存储"""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def __aenter__(self) -> "BugFetcherCore":
+        await self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def api_request(
+        self, method: str, url: str, auth: bool = True, cache: bool = True, **kwargs
+    ) -> Dict:
+        """统一API请求处理方法
+
+        auth 为 False 时不携带令牌，也不在401时刷新(用于登录请求本身)。
+        命中缓存规则的GET请求走响应缓存，cache 为 False 时跳过缓存直接请求并刷新缓存。
+        consume(response) 用于自行读取成功响应的响应体(如流式解析)，此类请求不走缓存。
+        """
+        response_cache = self.response_cache if method.lower() == "get" and kwargs.get("consume") is None else None
+        ttl = response_cache.ttl_for(url) if response_cache is not None else 0
+        if ttl:
+            key = response_cache.key(url, kwargs.get("params"), self.zentao_username)
+            return await self._cached_get(response_cache, key, url, ttl, auth, cache, kwargs)
+        return await self._request(method, url, auth=auth, **kwargs)
+
+    async def _cached_get(
+        self, response_cache: ResponseCache, key: str, url: str, ttl: float, auth: bool, use_cached: bool, kwargs: Dict
+    ) -> Dict:
+        """带缓存的GET：新鲜直接返回，过期但在 stale 窗口内先返回旧数据再后台重新验证"""
+        entry = await response_cache.get(key) if use_cached else None
+        if entry is not None and response_cache.is_fresh(entry):
+            response_cache.stats["hits"] += 1
+            self.metrics.inc("response_cache_total", result="hit")
+            return {"status": "success", "data": entry.data, "cached": True}
+        if entry is not None and response_cache.is_usable_stale(entry):
+            response_cache.stats["stale_hits"] += 1
+            self.metrics.inc("response_cache_total", result="stale")
+            if key not in self._revalidating:
+                task = asyncio.create_task(self._revalidate(response_cache, key, url, ttl, entry, auth, kwargs))
+                self._revalidating[key] = task
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+                task.add_done_callback(lambda _: self._revalidating.pop(key, None))
+            return {"status": "success", "data": entry.data, "cached": True, "stale": True}
+        response_cache.stats["misses"] += 1
+        self.metrics.inc("response_cache_total", result="miss")
+        return await self._revalidate(response_cache, key, url, ttl, entry, auth, kwargs)
+
+    async def _revalidate(
+        self,
+        response_cache: ResponseCache,
+        key: str,
+        url: str,
+        ttl: float,
+        entry: Optional[CacheEntry],
+        auth: bool,
+        kwargs: Dict,
+    ) -> Dict:
+        """请求并写入缓存，已有条目时带上 If-None-Match/If-Modified-Since"""
+        kwargs = dict(kwargs)
+        headers = dict(kwargs.pop("headers", {}))
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        try:
+            result = await self._request("get", url, auth=auth, headers=headers, **kwargs)
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            if entry is None:
+                raise
+            self.log_message(f"Revalidation failed, serving cached {url}", level=logging.WARNING)
+            return {"status": "success", "data": entry.data, "cached": True, "stale": True}
+        if result["status"] == "not_modified" and entry is not None:
+            await response_cache.touch(key, entry, ttl)
+            self.metrics.inc("response_cache_total", result="revalidated")
+            return {"status": "success", "data": entry.data, "cached": True}
+        if result["status"] == "success":
+            await response_cache.put(
+                key, result["data"], ttl, result.pop("etag", ""), result.pop("last_modified", "")
+            )
+        return result
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        auth: bool = True,
+        _auth_retries: int = 0,
+        consume: Optional[Callable[[aiohttp.ClientResponse], Awaitable[Any]]] = None,
+        **kwargs,
+    ) -> Dict:
+        """发送单个HTTP请求，401时刷新令牌重试"""
         headers = kwargs.pop("headers", {})
-        if "Token" not in headers and self.zentao_token:
+        if auth and "Token" not in headers and self.zentao_token:
             headers["Token"] = self.zentao_token
         if "Content-Type" not in headers:
             headers["Content-Type"] = "application/json"
 
-        self.log_message(f"API request: {method} {url}", level=logging.DEBUG)
-        self.log_message(f"Headers: {headers}", level=logging.DEBUG)
+        self.log_message("API request: %s %s", method.upper(), url, level=logging.DEBUG, event="zentao.request")
 
+        started = time.perf_counter()
+        status = "error"
         try:
-            async with aiohttp.ClientSession() as session:
-                http_method = getattr(session, method.lower())
-                async with http_method(
-                    url, headers=headers, timeout=30, **kwargs
-                ) as response:
-                    self.log_message(f"Response status: {response.status}", level=logging.DEBUG)
-                    if response.status in [200, 201]:
+            session = await self.get_session()
+            http_method = getattr(session, method.lower())
+            async with http_method(url, headers=headers, **kwargs) as response:
+                status = response.status
+                self.log_message(
+                    "Response status: %s", response.status, level=logging.DEBUG, event="zentao.response"
+                )
+                if response.status in [200, 201]:
+                    if consume is None:
                         data = await response.json()
-                        return {"status": "success", "data": data}
-                    if response.status == 401 and self.zentao_token:
-                        self.log_message("Token expired, refreshing", level=logging.WARNING)
-                        new_token = await self.get_zentao_token()
-                        if new_token:
-                            headers["Token"] = new_token
-                            return await self.api_request(method, url, headers=headers, **kwargs)
-                    response_text = await response.text()
-                    self.log_message(f"Error response: {response_text}", level=logging.ERROR)
-                    return {"status": "error", "message": response_text, "code": response.status}
+                    else:
+                        try:
+                            data = await consume(response)
+                        except ValueError as e:
+                            self.log_message(f"Invalid response body: {str(e)}", level=logging.ERROR)
+                            return {"status": "error", "message": f"Invalid response body: {str(e)}"}
+                    result = {"status": "success", "data": data}
+                    if response.headers.get("ETag"):
+                        result["etag"] = response.headers["ETag"]
+                    if response.headers.get("Last-Modified"):
+                        result["last_modified"] = response.headers["Last-Modified"]
+                    return result
+                if response.status == 304:
+                    return {"status": "not_modified", "code": 304}
+                if response.status == 401 and auth and _auth_retries < self.max_auth_retries:
+                    self.log_message("Token expired, refreshing", level=logging.WARNING)
+                    self.metrics.inc("auth_retries_total")
+                    new_token = await self.tokens.refresh(stale_token=headers.get("Token"))
+                    if new_token:
+                        headers["Token"] = new_token
+                        return await self._request(
+                            method, url, headers=headers, _auth_retries=_auth_retries + 1, consume=consume, **kwargs
+                        )
+                response_text = await response.text()
+                self.log_message(f"Error response: {response_text}", level=logging.ERROR)
+                result = {"status": "error", "message": response_text, "code": response.status}
+                retry_after = response.headers.get("Retry-After", "")
+                if response.status in (429, 503) and retry_after.isdigit():
+                    result["retry_after"] = int(retry_after)
+                    self.rate_limited_until = max(self.rate_limited_until, time.time() + int(retry_after))
+                return result
         except asyncio.TimeoutError:
+            status = "timeout"
             self.log_message("Request timed out", level=logging.ERROR)
             raise
         except aiohttp.ClientError as e:
             self.log_message(f"Request error: {str(e)}", level=logging.ERROR)
             raise
+        finally:
+            if self.metrics.enabled:
+                self.metrics.observe(
+                    "api_request_seconds",
+                    time.perf_counter() - started,
+                    method=method.upper(),
+                    endpoint=endpoint_label(urlsplit(url).path),
+                    status=status,
+                )
+
+    async def fetch_paginated(
+        self,
+        url: str,
+        key: str,
+        page_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        parse: Optional[Callable[[Dict], Any]] = None,
+    ) -> Dict:
+        """并发获取分页列表接口的全部数据
+
+        先请求第一页读取 total/limit 元数据，再在信号量限制下并发请求剩余页，
+        按页序合并结果。parse 在每页到达时转换条目，原始页数据随即释放；
+        启用 stream_json 时边读取响应体边逐条转换，整页原始数据不会同时驻留内存。
+        """
+        page_size = page_size or self.bug_page_size
+        semaphore = asyncio.Semaphore(max(1, concurrency or self.bug_fetch_concurrency))
+
+        done = 0
+        pages = 1
+
+        consume = self._stream_consumer(key, parse) if self.stream_json else None
+
+        async def fetch_page(page: int) -> Dict:
+            nonlocal done
+            params = {"page": page, "limit": page_size}
+            async with semaphore:
+                result = await self.api_request("get", url, params=params, consume=consume)
+            if consume is None and parse is not None and result["status"] == "success":
+                data = result["data"]
+                result = {**result, "data": {**data, key: [parse(item) for item in data.get(key, [])]}}
+            done += 1
+            if self.progress_callback is not None and page > 1:
+                self.progress_callback(done, pages)
+            return result
+
+        first = await fetch_page(1)
+        if first["status"] != "success":
+            return first
+
+        data = first["data"]
+        total = int(data.get("total", 0) or 0)
+        limit = int(data.get("limit", 0) or page_size)  # 服务端可能限制每页条数
+        pages = max(1, -(-total // limit)) if limit > 0 else 1
+        if self.progress_callback is not None:
+            self.progress_callback(done, pages)
+        self.log_message(
+            "Paginated fetch: %s total=%s pages=%s", url, total, pages, level=logging.DEBUG, event="zentao.paginate"
+        )
+
+        results = [first]
+        if pages > 1:
+            results += await asyncio.gather(*(fetch_page(page) for page in range(2, pages + 1)))
+
+        items: List[Dict] = []
+        seen = set()
+        for result in results:
+            if result["status"] != "success":
+                return result
+            for item in result["data"].get(key, []):
+                # 翻页期间数据可能移动，按ID去重避免重复计入
+                item_id = item.get("id")
+                if item_id is not None:
+                    if item_id in seen:
+                        continue
+                    seen.add(item_id)
+                items.append(item)
+        return {"status": "success", "data": items, "total": total}
+
+    def _stream_consumer(
+        self, key: str, parse: Optional[Callable[[Dict], Any]] = None
+    ) -> Callable[[aiohttp.ClientResponse], Awaitable[Dict]]:
+        """返回 _request 的 consume 回调：流式解析响应体，key 数组逐条经 parse 转换
+
+        结果与 response.json() 后再转换的结构相同：{其余顶层字段..., key: [转换后的条目]}。
+        """
+
+        async def consume(response: aiohttp.ClientResponse) -> Dict:
+            meta: Dict[str, Any] = {}
+            chunks = response.content.iter_chunked(self.stream_chunk_size)
+            if parse is None:
+                items = [item async for item in iter_json_array(chunks, key, meta)]
+            else:
+                items = [parse(item) async for item in iter_json_array(chunks, key, meta)]
+            return {**meta, key: items}
+
+        return consume
+
+    async def fetch_bug_delta(self, product_id: str, snapshot: BugSnapshot) -> Dict:
+        """增量拉取：按编辑时间倒序取水位之后变更的Bug，再按ID倒序取上次同步之后创建的Bug
+
+        从未编辑过的新Bug lastEditedDate 为空，按编辑时间排序时排在最后，第一遍翻不到，
+        因此第二遍按ID倒序补取比已知最大ID更大的Bug。两遍都在遇到已知数据时停止翻页。
+        """
+        url = f"{self.zentao_url}/api.php/v1/products/{product_id}/bugs"
+        edited = await self._fetch_until(url, "lastEditedDate_desc", snapshot.is_known)
+        if edited["status"] != "success":
+            return edited
+        created = await self._fetch_until(url, "id_desc", lambda bug: not snapshot.is_new(bug))
+        if created["status"] != "success":
+            return created
+        seen = {bug.get("id") for bug in edited["data"]}
+        changed = edited["data"] + [bug for bug in created["data"] if bug.get("id") not in seen]
+        return {"status": "success", "data": changed, "pages": edited["pages"] + created["pages"]}
+
+    async def _fetch_until(self, url: str, order: str, known: Callable[[Bug], bool]) -> Dict:
+        """按 order 逐页拉取Bug，直到遇到 known 为真的Bug或翻完"""
+        changed: List[Bug] = []
+        consume = self._stream_consumer("bugs", self.parse_bug) if self.stream_json else None
+        page = 1
+        while True:
+            params = {"page": page, "limit": self.delta_page_size, "order": order}
+            result = await self.api_request("get", url, params=params, consume=consume)
+            if result["status"] != "success":
+                return result
+            data = result["data"]
+            bugs = data.get("bugs", [])
+            for raw in bugs:
+                bug = self.parse_bug(raw)
+                if known(bug):
+                    return {"status": "success", "data": changed, "pages": page}
+                changed.append(bug)
+            limit = int(data.get("limit", 0) or self.delta_page_size)
+            if not bugs or page * limit >= int(data.get("total", 0) or 0):
+                return {"status": "success", "data": changed, "pages": page}
+            page += 1
+
+    async def sync_product_bugs(self, product_id: str) -> Dict:
+        """同步产品Bug到本地快照
+
+        首次同步或超过 full_sync_interval 时全量拉取，其余情况只拉取水位之后的变更。
+        返回完整快照和本次的变化(added/changed/removed)。同一产品同时只进行一次同步，
+        接口、定时任务和报表的并发调用等待并共享进行中的那一次。
+        """
+        product_id = str(product_id)
+        task = self._syncs.get(product_id)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._syncs[product_id] = asyncio.ensure_future(self._sync_product_bugs(product_id))
+
+            def forget(done: asyncio.Future) -> None:
+                if self._syncs.get(product_id) is done:
+                    del self._syncs[product_id]
+
+            task.add_done_callback(forget)
+        # shield 保证单个调用方被取消时不会中断其他调用方共享的同步
+        return await asyncio.shield(task)
+
+    async def _sync_product_bugs(self, product_id: str) -> Dict:
+        snapshot = self._snapshots.get(product_id)
+        if snapshot is None:
+            snapshot = self._snapshots[product_id] = await self._restore_snapshot(product_id)
+        initial = not snapshot.synced
+        full = (
+            not self.incremental_sync
+            or not snapshot.synced
+            or time.time() - snapshot.last_full_sync >= self.full_sync_interval
+        )
+
+        if full:
+            result = await self.fetch_paginated(
+                f"{self.zentao_url}/api.php/v1/products/{product_id}/bugs", "bugs", parse=self.parse_bug
+            )
+            if result["status"] != "success":
+                return result
+            changes = snapshot.replace(result["data"])
+            self.metrics.inc("bugs_fetched_total", len(result["data"]), product=product_id, mode="full")
+        else:
+            result = await self.fetch_bug_delta(product_id, snapshot)
+            if result["status"] != "success":
+                return result
+            changes = snapshot.merge(result["data"])
+            self.metrics.inc("bugs_fetched_total", len(result["data"]), product=product_id, mode="delta")
+
+        if self.store is not None:
+            # 写入的数据在事件循环中取出，工作线程不接触会被其他同步修改的快照
+            rows = snapshot.values() if full else changes["added"] + changes["changed"]
+            removed = [bug["id"] for bug in changes["removed"]]
+            await asyncio.to_thread(
+                self._persist_snapshot, product_id, rows, removed, snapshot.watermark, snapshot.last_full_sync
+            )
+        self.last_poll_success[product_id] = time.time()
+        if not initial:
+            # 首次加载不是变化，不推送
+            self.events.publish(product_id, changes)
+            self.sync_changes += sum(len(bugs) for bugs in changes.values())
+        self.log_message(
+            f"Synced product {product_id} ({'full' if full else 'delta'}): "
+            f"{len(changes['added'])} added, {len(changes['changed'])} changed, "
+            f"{len(changes['removed'])} removed",
+            level=logging.INFO,
+        )
+        return {"status": "success", "bugs": snapshot.values(), "changes": changes, "full": full, "initial": initial}
+
+    async def _restore_snapshot(self, product_id: str) -> BugSnapshot:
+        """从本地存储恢复产品快照"""
+        snapshot = BugSnapshot(product_id)
+        store = self.store
+        if store is None:
+            return snapshot
+        state = await asyncio.to_thread(store.load_sync_state, product_id)
+        if state:
+            bugs = parse_bugs(await asyncio.to_thread(store.query_bugs, product_id=product_id), self.bug_fields)
+            snapshot.load(bugs, *state)
+            self.log_message(f"Restored {len(bugs)} bugs of product {product_id} from store", level=logging.INFO)
+        return snapshot
+
+    def _persist_snapshot(
+        self, product_id: str, rows: List[Dict], removed: List[Any], watermark: str, last_full_sync: float
+    ) -> None:
+        """将同步结果写入本地存储，在工作线程中执行；参数为同步完成时快照内容的副本"""
+        store = self.store
+        store.upsert_bugs(product_id, rows)
+        store.delete_bugs(product_id, removed)
+        store.save_sync_state(product_id, watermark, last_full_sync)
+
+    ### **本地存储查询**
+    async def query_bugs(self, **filters) -> List[Dict]:
+        """从本地存储按条件查询Bug，参数见 BugStore.query_bugs"""
+        store = self.store
+        if store is None:
+            return []
+        return await asyncio.to_thread(store.query_bugs, **filters)
+
+    async def my_open_bugs(self, product_id: Optional[str] = None) -> List[Dict]:
+        """从本地存储查询指派给当前用户的激活Bug"""
+        filters = {"status": "active"}
+        if product_id is not None:
+            filters["product_id"] = product_id
+        if self.user_account:
+            filters["assigned_account"] = self.user_account
+        elif self.user_realname:
+            filters["assigned_realname"] = self.user_realname
+        else:
+            return []
+        return await self.query_bugs(**filters)
 
     async def get_zentao_token(self) -> Optional[str]:
-        """获取禅道API访问令牌"""
+        """获取禅道API访问令牌，并发调用只登录一次"""
+        return await self.tokens.refresh()
+
+    async def ensure_token(self) -> Optional[str]:
+        """返回可用令牌，缺失或即将过期时自动刷新"""
+        if not self.zentao_token:
+            self.log_message("No token available, fetching new token", level=logging.WARNING)
+        return await self.tokens.ensure()
+
+    async def _login(self) -> Optional[str]:
+        """登录禅道获取新令牌，令牌保存在内存中并异步持久化"""
         self.log_message("Getting ZenTao token", level=logging.INFO)
         login_url = f"{self.zentao_url}/api.php/v1/tokens"
         payload = {"account": self.zentao_username, "password": self.zentao_password}
 
-        result = await self.api_request("post", login_url, json=payload, headers={})
+        result = await self.api_request("post", login_url, auth=False, json=payload)
         if result["status"] == "success":
             token = result["data"].get("token")
             if token:
                 self.zentao_token = token
                 self.save_config()
+                self.metrics.inc("token_refresh_total", result="success")
                 self.log_message("Token obtained successfully", level=logging.INFO)
                 return token
             else:
+                self.metrics.inc("token_refresh_total", result="error")
                 self.log_message(f"Token not found in response: {result['data']}", level=logging.ERROR)
                 return None
+        self.metrics.inc("token_refresh_total", result="error")
         self.log_message(f"Failed to get token: {result.get('message', 'Unknown error')}", level=logging.ERROR)
         return None
 
-    async def fetch_user_info(self) -> Dict:
-        """获取当前用户信息"""
-        if not self.zentao_token:
-            self.log_message("No token available, fetching new token", level=logging.WARNING)
-            if not await self.get_zentao_token():
-                return {"status": "error", "message": "Failed to get token"}
+    async def fetch_user_info(self, fresh: bool = False) -> Dict:
+        """获取当前用户信息，fresh 为 True 时跳过响应缓存"""
+        if not await self.ensure_token():
+            return {"status": "error", "message": "Failed to get token"}
 
-        result = await self.api_request("get", f"{self.zentao_url}/api.php/v1/user")
+        result = await self.api_request("get", f"{self.zentao_url}/api.php/v1/user", cache=not fresh)
         if result["status"] == "success":
             user_info = result["data"].get("profile", {})
             self.user_realname = user_info.get("realname", "")
+            self.user_account = user_info.get("account", "")
             return {"status": "success", "realname": self.user_realname}
         return result
 
-    async def fetch_products(self) -> List[Dict]:
-        """获取产品列表"""
-        if not self.zentao_token:
-            self.log_message("No token available, fetching new token", level=logging.WARNING)
-            if not await self.get_zentao_token():
-                return []
+    async def fetch_products(self, fresh: bool = False) -> List[Dict]:
+        """获取产品列表，fresh 为 True 时跳过响应缓存"""
+        if not await self.ensure_token():
+            return []
 
-        result = await self.api_request("get", f"{self.zentao_url}/api.php/v1/products")
+        result = await self.api_request("get", f"{self.zentao_url}/api.php/v1/products", cache=not fresh)
         if result["status"] == "success":
             return result["data"].get("products", [])
         return []
@@ -177,97 +857,513 @@ class BugFetcherCore:
         if not self.selected_product_id:
             return {"status": "error", "message": "No product selected"}
 
-        if not self.zentao_token:
-            self.log_message("No token available, fetching new token", level=logging.WARNING)
-            if not await self.get_zentao_token():
-                return {"status": "error", "message": "Failed to get token"}
+        if not await self.ensure_token():
+            return {"status": "error", "message": "Failed to get token"}
 
-        result = await self.api_request(
-            "get",
-            f"{self.zentao_url}/api.php/v1/products/{self.selected_product_id}/bugs?limit=1000",
-        )
+        return await self.fetch_product_bugs(self.selected_product_id)
+
+    async def fetch_product_bugs(self, product_id: str) -> Dict:
+        """同步单个产品并筛选出指派给当前用户的Bug"""
+        try:
+            result = await self.sync_product_bugs(product_id)
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            result = self._fallback_bugs(product_id, "ZenTao unavailable")
+            if result is None:
+                raise
+        if result["status"] != "success":
+            result = self._fallback_bugs(product_id, result.get("message", "")) or result
         if result["status"] == "success":
-            bugs = result["data"].get("bugs", [])
+            bugs = result["bugs"]
             self.log_message(f"Total bugs fetched: {len(bugs)}", level=logging.INFO)
 
-            if not self.user_realname:
+            if not self.user_account and not self.user_realname:
                 await self.fetch_user_info()
 
-            unresolved_bugs = [
-                bug
-                for bug in bugs
-                if bug.get("assignedTo", {}).get("realname", "") == self.user_realname
-            ]
+            unresolved_bugs = [bug for bug in bugs if self._is_mine(bug)]
             self.log_message(f"Number of unresolved bugs: {len(unresolved_bugs)}", level=logging.INFO)
+            if result.get("stale"):
+                return {"status": "success", "bugs": unresolved_bugs, "stale": True}
             return {"status": "success", "bugs": unresolved_bugs}
         return result
 
-    async def send_to_feishu(self, message: FeishuMessage) -> Dict:
-        """发送消息到飞书"""
-        if not self.feishu_webhook_url:
-            self.log_message("Feishu Webhook URL not set", level=logging.ERROR)
-            return {"status": "error", "message": "Feishu Webhook URL not set"}
+    async def fetch_bugs_for_products(self, product_ids: Optional[List[str]] = None) -> Dict:
+        """并发轮询多个产品，共用同一会话和令牌，结果按产品汇总"""
+        product_ids = [str(product_id) for product_id in (product_ids or self.product_ids)]
+        if not product_ids:
+            return {"status": "error", "message": "No product selected"}
+
+        if not await self.ensure_token():
+            return {"status": "error", "message": "Failed to get token"}
+        if not self.user_account and not self.user_realname:
+            await self.fetch_user_info()
+
+        semaphore = asyncio.Semaphore(max(1, self.product_poll_concurrency))
+
+        async def poll(product_id: str) -> Dict:
+            async with semaphore:
+                try:
+                    return await self.fetch_product_bugs(product_id)
+                except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                    return {"status": "error", "message": f"Request failed: {e!r}"}
+
+        results = await asyncio.gather(*(poll(product_id) for product_id in product_ids))
+        products = dict(zip(product_ids, results))
+        total = sum(len(result["bugs"]) for result in results if result["status"] == "success")
+        failed = [product_id for product_id, result in products.items() if result["status"] != "success"]
+        self.log_message(
+            f"Polled {len(product_ids)} products: {total} bugs, {len(failed)} failed", level=logging.INFO
+        )
+        return {"status": "success", "total": total, "failed": failed, "products": products}
+
+    def _is_mine(self, bug: Dict) -> bool:
+        """优先按稳定的账号匹配指派人，未知账号时退回到真实姓名"""
+        account, realname = assignee(bug)
+        if self.user_account:
+            return account == self.user_account
+        return realname == self.user_realname
+
+    def _fallback_bugs(self, product_id: str, reason: str) -> Optional[Dict]:
+        """禅道不可用时使用本地快照(已从存储恢复)应答"""
+        snapshot = self._snapshots.get(str(product_id))
+        if snapshot is None or not snapshot.synced:
+            return None
+        self.log_message(f"Serving product {product_id} from local store: {reason}", level=logging.WARNING)
+        return {"status": "success", "bugs": snapshot.values(), "stale": True}
+
+    ### **团队通知**
+    async def notify_team(self, product_ids: Optional[List[str]] = None) -> Dict:
+        """每个产品只拉取一次，按指派人账号建立索引后给每个订阅成员发送通知"""
+        subscribers = self.team_subscribers
+        if not subscribers:
+            return {"status": "error", "message": "No team subscribers configured"}
+        product_ids = [str(product_id) for product_id in (product_ids or self.product_ids)]
+        if not product_ids:
+            return {"status": "error", "message": "No product selected"}
+        if not await self.ensure_token():
+            return {"status": "error", "message": "Failed to get token"}
+
+        poll_semaphore = asyncio.Semaphore(max(1, self.product_poll_concurrency))
+
+        async def sync(product_id: str) -> Dict:
+            async with poll_semaphore:
+                return await self.sync_product_bugs(product_id)
+
+        results = await asyncio.gather(*(sync(product_id) for product_id in product_ids), return_exceptions=True)
+        bugs: List[Dict] = []
+        failed = []
+        for product_id, result in zip(product_ids, results):
+            if isinstance(result, BaseException) or result["status"] != "success":
+                fallback = self._fallback_bugs(product_id, "sync failed")
+                if fallback is None:
+                    failed.append(product_id)
+                    continue
+                result = fallback
+            bugs.extend(result["bugs"])
+
+        index = index_by_assignee(bugs)
+        semaphore = asyncio.Semaphore(max(1, self.feishu_send_concurrency))
+
+        scope = "+".join(sorted(product_ids))
+
+        async def notify(account: str, webhook_url: str) -> Dict:
+            user_bugs = index.get(account, [])
+            realname = assignee(user_bugs[0])[1] if user_bugs else ""
+            async with semaphore:
+                return await self.notify_changes(
+                    f"{account}@{scope}", realname or account, user_bugs, webhook_url=webhook_url or None
+                )
+
+        sent = await asyncio.gather(*(notify(account, webhook) for account, webhook in subscribers.items()))
+        notified = dict(zip(subscribers, sent))
+        self.log_message(
+            f"Team notification: {len(bugs)} bugs indexed for {len(index)} assignees, "
+            f"{sum(1 for r in sent if r['status'] in ('success', 'queued'))} messages sent",
+            level=logging.INFO,
+        )
+        return {"status": "success", "failed": failed, "notified": notified}
+
+    async def notify_changes(
+        self, key: str, realname: str, bugs: List[Dict], webhook_url: Optional[str] = None
+    ) -> Dict:
+        """与上次通知的指纹比较，只发送新增/变更/已解决的部分，无变化时不发送
+
+        key 标识一个用户和产品范围。指纹在确认送达后才保存(经投递队列发送时在送达回调中)，
+        发送失败或重试耗尽被丢弃时保留旧指纹，下次轮询会重新发送。
+        """
+        previous = await self._load_fingerprint(key)
+        if not self.notify_only_changes or previous is None:
+            if not bugs:
+                return {"status": "skipped", "message": "No bugs assigned"}
+            diff = diff_bugs({}, bugs)
+            message = FeishuMessage(total=len(bugs), bugs=[as_dict(bug) for bug in bugs], realname=realname)
+        else:
+            diff = diff_bugs(previous, bugs)
+            if not diff["has_changes"]:
+                return {"status": "skipped", "message": "No changes"}
+            message = FeishuMessage(
+                total=len(bugs),
+                bugs=[as_dict(bug) for bug in diff["added"] + diff["changed"]],
+                realname=realname,
+                added=[bug.get("id") for bug in diff["added"]],
+                changed=[bug.get("id") for bug in diff["changed"]],
+                resolved=diff["resolved"],
+            )
+
+        async def delivered() -> None:
+            await self._save_fingerprint(key, diff["fingerprint"])
+
+        return await self.deliver(message, webhook_url=webhook_url, on_delivered=delivered)
+
+    async def fetch_and_notify(self) -> Dict:
+        """获取当前用户的Bug，仅在有变化时通知到飞书"""
+        result = await self.fetch_new_bugs()
+        if result["status"] != "success":
+            return result
+        key = f"{self.user_account or self.user_realname}@{self.selected_product_id}"
+        sent = await self.notify_changes(key, self.user_realname, result["bugs"])
+        return {"status": "success", "bugs": result["bugs"], "notification": sent}
+
+    ### **统计报表**
+    @property
+    def report_aging_days(self) -> List[float]:
+        """报表中未解决Bug的账龄分桶边界(天)"""
+        return self._config.get("report_aging_days", [7, 30, 90])
+
+    @property
+    def report_trend_weeks(self) -> int:
+        """报表中按周趋势的周数"""
+        return self._config.get("report_trend_weeks", 8)
 
-        bug_list = [
-            {"id": bug.get("id", "未知ID"), "title": bug.get("title", "未命名缺陷")}
-            for bug in message.bugs
+    async def bug_report(
+        self,
+        product_ids: Optional[List[str]] = None,
+        month: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        top: Optional[int] = None,
+    ) -> Dict:
+        """按产品/指派人/模块/严重程度统计Bug，区间默认为本月至今，见 analytics.build_report
+
+        先同步各产品(禅道不可用时使用本地快照)，按列聚合在工作线程中进行。
+        """
+        # 报表模块(及可选的 numpy)只在用到时导入，不拖慢 CLI 启动
+        from ..analytics import report_period
+
+        try:
+            period = report_period(month, since, until)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+        product_ids = [str(product_id) for product_id in (product_ids or self.product_ids)]
+        if not product_ids:
+            return {"status": "error", "message": "No product selected"}
+
+        if await self.ensure_token():
+            results = await asyncio.gather(
+                *(self.sync_product_bugs(product_id) for product_id in product_ids), return_exceptions=True
+            )
+        else:
+            results = [None] * len(product_ids)
+        failed = []
+        for product_id, result in zip(product_ids, results):
+            if isinstance(result, dict) and result["status"] == "success":
+                continue
+            if self._fallback_bugs(product_id, "sync failed") is None:
+                failed.append(product_id)
+        snapshots = [self._snapshots[product_id] for product_id in product_ids if product_id not in failed]
+        if not snapshots:
+            return {"status": "error", "message": "No bug data available", "failed": failed}
+
+        # 指纹和Bug列表在事件循环中取，工作线程不接触会被同步修改的快照
+        key = tuple(
+            (snapshot.product_id, snapshot.watermark, snapshot.last_full_sync, len(snapshot.bugs))
+            for snapshot in snapshots
+        )
+        bugs = {snapshot.product_id: dict(snapshot.bugs) for snapshot in snapshots}
+        started = time.perf_counter()
+        report = await asyncio.to_thread(self._build_report, key, bugs, period, top)
+        report["failed"] = failed
+        self.log_message(
+            "Bug report: %s bugs of %s products aggregated in %.0f ms (%s)",
+            report["bugs"], len(snapshots), (time.perf_counter() - started) * 1000, report["backend"],
+            level=logging.INFO,
+        )
+        return report
+
+    def _build_report(
+        self, key: tuple, bugs: Dict[str, Dict[Any, Dict]], period: Tuple[float, float], top: Optional[int]
+    ) -> Dict:
+        """在工作线程中把Bug转为列并聚合
+
+        产品不变时复用上次的列，只对快照指纹变化的产品按新增/变更/删除的Bug增量更新。
+        """
+        from ..analytics import BugColumns, build_report
+
+        with self._report_lock:
+            previous, columns = self._report_columns or ((), None)
+            if columns is None or [fingerprint[0] for fingerprint in previous] != list(bugs):
+                previous, columns = (), BugColumns()
+            for index, (product_id, product_bugs) in enumerate(bugs.items()):
+                if index >= len(previous) or previous[index] != key[index]:
+                    columns.update(product_id, product_bugs)
+            self._report_columns = (key, columns)
+            return build_report(
+                columns, *period, aging_days=self.report_aging_days, trend_weeks=self.report_trend_weeks, top=top
+            )
+
+    async def send_report(self, webhook_url: Optional[str] = None, **kwargs) -> Dict:
+        """生成报表，摘要作为 suggestion 发送到飞书，参数同 bug_report"""
+        from ..analytics import report_suggestion
+
+        report = await self.bug_report(**kwargs)
+        if report["status"] != "success":
+            return report
+        message = FeishuMessage(
+            total=report["summary"]["open"],
+            bugs=[],
+            realname=self.user_realname or self.zentao_username,
+            suggestion=report_suggestion(report),
+        )
+        return {"status": "success", "report": report, "notification": await self.deliver(message, webhook_url)}
+
+    ### **后台调度**
+    @property
+    def scheduler_enabled(self) -> bool:
+        """API服务是否在进程内定时轮询"""
+        return self._config.get("scheduler_enabled", True)
+
+    @property
+    def schedule_jitter(self) -> float:
+        """调度任务每次运行间隔附加的最大随机抖动(秒)"""
+        return self._config.get("schedule_jitter", 30)
+
+    def create_scheduler(self) -> Scheduler:
+        """按配置创建调度器
+
+        schedule_jobs 为任务列表，每项 {"name", "type", "interval", "jitter", "product_id"}，
+        type 为 sync(同步产品Bug)、notify(通知当前用户) 或 team(通知团队)。
+        未配置时为每个轮询产品创建一个 sync 任务，间隔为 fetch_interval 分钟。
+        轮询的产品或任务配置变化后按新配置重建任务。
+        """
+        scheduler = Scheduler(self.schedule_jobs(), log=self.log_message)
+
+        def reschedule(changed: Set[str]) -> None:
+            if changed & SCHEDULE_KEYS:
+                scheduler.replace(self.schedule_jobs())
+
+        self.config_listeners.append(reschedule)
+        return scheduler
+
+    def schedule_jobs(self) -> List[Job]:
+        """按当前配置生成调度任务，见 create_scheduler"""
+        specs = self._config.get("schedule_jobs") or [
+            {"name": f"sync:{product_id}", "type": "sync", "product_id": product_id}
+            for product_id in self.product_ids
         ]
+        jobs = []
+        for spec in specs:
+            job_type = spec.get("type", "sync")
+            if job_type == "sync":
+                product_id = str(spec.get("product_id") or self.selected_product_id)
+                func = lambda product_id=product_id: self.poll_product(product_id)
+            elif job_type == "notify":
+                func = self.fetch_and_notify
+            elif job_type == "team":
+                func = lambda product_ids=spec.get("product_ids"): self.notify_team(product_ids)
+            else:
+                raise ValueError(f"Unknown job type: {job_type}")
+            interval = spec.get("interval", self.fetch_interval * 60)
+            jobs.append(Job(
+                spec.get("name") or ":".join(filter(None, [job_type, str(spec.get("product_id") or "")])),
+                func,
+                interval=interval,
+                jitter=spec.get("jitter", self.schedule_jitter),
+                policy=self.poll_policy(product_id, base=interval) if job_type == "sync" else None,
+            ))
+        return jobs
 
-        feishu_message = {
-                    "msg_type": "text",
-                    "content": {
-                        "text": json.dumps(
-                            {
-                                "total": message.total,
-                                "bugs": bug_list,
-                                "realname": message.realname,
-                                "suggestion": message.suggestion,
-                            },
-                            ensure_ascii=False,
-                        )
-                    },
-                }
+    def poll_policy(self, product_id: Optional[str] = None, base: Optional[float] = None) -> AdaptiveInterval:
+        """轮询间隔策略
+
+        adaptive_polling 为 false 时固定为 base(默认 fetch_interval 分钟)；否则在
+        poll_min_interval ~ poll_max_interval 秒之间自适应，poll_bounds 可按产品覆盖 {"min", "max"}。
+        """
+        base = base if base is not None else self.fetch_interval * 60
+        if not self._config.get("adaptive_polling", True):
+            return AdaptiveInterval(base, base, base)
+        bounds = self._config.get("poll_bounds", {}).get(str(product_id), {}) if product_id else {}
+        return AdaptiveInterval(
+            base,
+            bounds.get("min", self._config.get("poll_min_interval", 60)),
+            bounds.get("max", self._config.get("poll_max_interval", base * 4)),
+        )
+
+    def retry_after(self) -> Optional[float]:
+        """距离禅道限流解除的秒数，未被限流时返回 None"""
+        remaining = self.rate_limited_until - time.time()
+        return remaining if remaining > 0 else None
 
-        self.log_message(f"Sending message to Feishu: {feishu_message}", level=logging.DEBUG)
+    async def poll_product(self, product_id: str) -> Dict:
+        """调度任务：同步单个产品，复用当前会话、令牌和快照
+
+        返回结果中的 changed/retry_after 用于调整下一次轮询间隔。
+        """
+        if not await self.ensure_token():
+            return {"status": "error", "message": "Failed to get token", "retry_after": self.retry_after()}
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.feishu_webhook_url,
-                    headers={"Content-Type": "application/json"},
-                    json=feishu_message,
-                    timeout=10,
-                ) as response:
-                    if response.status == 200:
-                        self.log_message("Successfully sent to Feishu", level=logging.INFO)
-                        return {"status": "success", "message": "Message sent to Feishu"}
-                    text = await response.text()
-                    self.log_message(f"Failed to send to Feishu: {text}", level=logging.ERROR)
-                    return {"status": "error", "message": f"Failed to send: {text}"}
+            result = await self.sync_product_bugs(product_id)
+        except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+            return {"status": "error", "message": repr(e)}
+        if result["status"] != "success":
+            return {**result, "retry_after": result.get("retry_after") or self.retry_after()}
+        return {
+            "status": "success",
+            "total": len(result["bugs"]),
+            "changed": not result["initial"] and any(result["changes"].values()),
+            "full": result["full"],
+        }
+
+    async def _load_fingerprint(self, key: str) -> Optional[Dict[str, str]]:
+        if self.store is None:
+            return self._fingerprints.get(key)
+        return await asyncio.to_thread(self.store.load_fingerprint, key)
+
+    async def _save_fingerprint(self, key: str, fingerprint: Dict[str, str]) -> None:
+        if self.store is None:
+            self._fingerprints[key] = fingerprint
+        else:
+            await asyncio.to_thread(self.store.save_fingerprint, key, fingerprint)
+
+    async def send_to_feishu(self, message: FeishuMessage, webhook_url: Optional[str] = None) -> Dict:
+        """发送消息到飞书，webhook_url 缺省使用配置中的地址"""
+        webhook_url = webhook_url or self.feishu_webhook_url
+        if not webhook_url:
+            self.log_message("Feishu Webhook URL not set", level=logging.ERROR)
+            return {"status": "error", "message": "Feishu Webhook URL not set"}
+
+        return await self.post_to_feishu(webhook_url, render_feishu_payload([message]))
+
+    async def post_to_feishu(self, webhook_url: str, feishu_message: Dict) -> Dict:
+        """向飞书Webhook发送已渲染的消息体，失败时返回状态码供重试判断"""
+        self.log_message(
+            "Sending %s message to Feishu", feishu_message.get("msg_type"), level=logging.DEBUG, event="feishu.send"
+        )
+        try:
+            session = await self.get_session()
+            async with session.post(
+                webhook_url,
+                headers={"Content-Type": "application/json"},
+                json=feishu_message,
+                timeout=aiohttp.ClientTimeout(total=self.feishu_timeout),
+            ) as response:
+                self.metrics.inc("feishu_deliveries_total", status=response.status)
+                if response.status == 200:
+                    self.log_message("Successfully sent to Feishu", level=logging.INFO)
+                    return {"status": "success", "message": "Message sent to Feishu"}
+                text = await response.text()
+                self.log_message(f"Failed to send to Feishu: {text}", level=logging.ERROR)
+                result = {"status": "error", "message": f"Failed to send: {text}", "code": response.status}
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    result["retry_after"] = int(retry_after)
+                return result
         except Exception as e:
+            self.metrics.inc("feishu_deliveries_total", status="error")
             self.log_message(f"Error sending to Feishu: {str(e)}", level=logging.ERROR)
             return {"status": "error", "message": str(e)}
 
+    ### **飞书后台投递**
+    async def start_delivery_queue(self) -> FeishuDeliveryQueue:
+        """启动飞书后台投递队列，之后 deliver() 将消息入队而不是同步发送"""
+        if self.deliveries is None:
+            self.deliveries = FeishuDeliveryQueue(
+                self.post_to_feishu,
+                spool_dir=self._config.get("feishu_spool_dir", "feishu_spool"),
+                workers=self._config.get("feishu_workers", 2),
+                rate_per_minute=self._config.get("feishu_rate_per_minute", 100),
+                burst=self._config.get("feishu_rate_burst", 5),
+                max_attempts=self._config.get("feishu_max_attempts", 5),
+                batch_size=self._config.get("feishu_batch_size", 10),
+                log=self.log_message,
+            )
+        await self.deliveries.start()
+        return self.deliveries
+
+    async def deliver(
+        self,
+        message: FeishuMessage,
+        webhook_url: Optional[str] = None,
+        on_delivered: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> Dict:
+        """投递飞书消息：队列运行时入队并立即返回投递ID，否则直接发送
+
+        on_delivered 在消息确认送达后调用(入队时为队列发送成功后)，发送失败时不调用。
+        """
+        webhook_url = webhook_url or self.feishu_webhook_url
+        if self.deliveries is None or not self.deliveries.running:
+            result = await self.send_to_feishu(message, webhook_url=webhook_url)
+            if result["status"] == "success" and on_delivered is not None:
+                await on_delivered()
+            return result
+        if not webhook_url:
+            return {"status": "error", "message": "Feishu Webhook URL not set"}
+        delivery_id = await self.deliveries.enqueue(message, webhook_url, on_delivered=on_delivered)
+        return {"status": "queued", "message": "Message queued for Feishu", "delivery_id": delivery_id}
+
     # 同步wrapper方法
-    def _sync_wrapper(self, async_func: Callable, *args, **kwargs) -> Any:
-        """将异步方法包装为同步方法"""
-        return asyncio.run(async_func(*args, **kwargs))
+    @property
+    def loop_thread(self) -> LoopThread:
+        """同步接口使用的常驻后台事件循环，首次使用时启动"""
+        if self._loop_thread is None:
+            self._loop_thread = LoopThread()
+        if not self._loop_thread.running:
+            self._loop_thread.start()
+        return self._loop_thread
+
+    @property
+    def sync_timeout(self) -> Optional[float]:
+        """同步接口默认等待时间(秒)，None 表示一直等待"""
+        return self._config.get("sync_timeout")
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """提交协程到后台循环，返回可取消的 Future"""
+        return self.loop_thread.submit(coro)
+
+    def _sync_wrapper(self, async_func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """将异步方法包装为同步方法
+
+        协程在常驻后台循环中执行，会话和连接池在多次调用间复用；
+        也可以在已有事件循环的线程中调用。超时后取消任务并抛出 TimeoutError。
+        """
+        return self.loop_thread.run(async_func(*args, **kwargs), timeout=timeout or self.sync_timeout)
+
+    def close_sync(self, timeout: Optional[float] = 10) -> None:
+        """关闭会话、本地存储并停止后台循环，写入待保存的配置"""
+        if self._loop_thread is not None and self._loop_thread.running:
+            try:
+                self._loop_thread.run(self.close(), timeout=timeout)
+            finally:
+                self._loop_thread.stop()
+        if self._config_watcher is not None:
+            self._config_watcher.stop()
+        self.config_manager.flush()
+        self.close_store()
 
-    def get_zentao_token_sync(self) -> Optional[str]:
+    def get_zentao_token_sync(self, timeout: Optional[float] = None) -> Optional[str]:
         """同步获取禅道令牌"""
-        return self._sync_wrapper(self.get_zentao_token)
+        return self._sync_wrapper(self.get_zentao_token, timeout=timeout)
 
-    def fetch_user_info_sync(self) -> Dict:
+    def fetch_user_info_sync(self, timeout: Optional[float] = None) -> Dict:
         """同步获取用户信息"""
-        return self._sync_wrapper(self.fetch_user_info)
+        return self._sync_wrapper(self.fetch_user_info, timeout=timeout)
 
-    def fetch_products_sync(self) -> List[Dict]:
+    def fetch_products_sync(self, timeout: Optional[float] = None) -> List[Dict]:
         """同步获取产品列表"""
-        return self._sync_wrapper(self.fetch_products)
+        return self._sync_wrapper(self.fetch_products, timeout=timeout)
 
-    def fetch_new_bugs_sync(self) -> Dict:
+    def fetch_new_bugs_sync(self, timeout: Optional[float] = None) -> Dict:
         """同步获取未解决的Bug"""
-        return self._sync_wrapper(self.fetch_new_bugs)
+        return self._sync_wrapper(self.fetch_new_bugs, timeout=timeout)
 
-    def send_to_feishu_sync(self, message: FeishuMessage) -> Dict:
+    def send_to_feishu_sync(self, message: FeishuMessage, timeout: Optional[float] = None) -> Dict:
         """同步发送消息到飞书"""
-        return self._sync_wrapper(self.send_to_feishu, message)
+        return self._sync_wrapper(self.send_to_feishu, message, timeout=timeout)
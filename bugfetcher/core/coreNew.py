@@ -15,6 +15,8 @@ class BugFetcherCore:
         self.user_realname = ""  # 用户真实姓名
         self._config = {}  # 配置缓存
         self._config_mtime = 0  # 配置文件修改时间戳
+        self._session: Optional[aiohttp.ClientSession] = None  # 共享HTTP会话
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None  # 会话所属事件循环
 
         # 配置日志
         self.logger = logging.getLogger("BugFetcher")
@@ -67,6 +69,16 @@ class BugFetcherCore:
         """更新令牌"""
         self._config["zentao_token"] = value
 
+    @property
+    def http_timeout(self) -> float:
+        """禅道请求总超时(秒)"""
+        return self._config.get("http_timeout", 30)
+
+    @property
+    def feishu_timeout(self) -> float:
+        """飞书请求总超时(秒)"""
+        return self._config.get("feishu_timeout", 10)
+
     @property
     def selected_product(self) -> str:
         return self._config.get("selected_product", "")
@@ -89,6 +101,56 @@ class BugFetcherCore:
         self._config_mtime = os.path.getmtime(self.config_path)
         self.log_message("Configuration saved", level=logging.INFO)
 
+    ### **HTTP会话管理**
+    async def get_session(self) -> aiohttp.ClientSession:
+        """获取共享的HTTP会话，连接池在所有禅道和飞书请求间复用"""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._session_loop is loop:
+            return self._session
+        if self._session is not None and not self._session.closed:
+            # 会话绑定在旧的事件循环上，无法跨循环复用
+            await self._discard_session()
+
+        connector = aiohttp.TCPConnector(
+            limit=self._config.get("http_pool_limit", 100),
+            limit_per_host=self._config.get("http_pool_limit_per_host", 10),
+            ttl_dns_cache=self._config.get("http_dns_cache_ttl", 300),
+            keepalive_timeout=self._config.get("http_keepalive_timeout", 30),
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.http_timeout,
+            connect=self._config.get("http_connect_timeout", 10),
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        self._session_loop = loop
+        self.log_message("HTTP session opened", level=logging.DEBUG)
+        return self._session
+
+    async def _discard_session(self) -> None:
+        """丢弃属于其他事件循环的会话"""
+        session, self._session, self._session_loop = self._session, None, None
+        try:
+            await session.close()
+        except RuntimeError:
+            # 原事件循环已关闭，只能放弃连接
+            pass
+
+    async def close(self) -> None:
+        """关闭共享HTTP会话"""
+        if self._session is None:
+            return
+        session, self._session, self._session_loop = self._session, None, None
+        if not session.closed:
+            await session.close()
+            self.log_message("HTTP session closed", level=logging.DEBUG)
+
+    async def __aenter__(self) -> "BugFetcherCore":
+        await self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
     ### **核心API请求方法**
     @retry(
         wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -107,24 +169,22 @@ class BugFetcherCore:
         self.log_message(f"Headers: {headers}", level=logging.DEBUG)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                http_method = getattr(session, method.lower())
-                async with http_method(
-                    url, headers=headers, timeout=30, **kwargs
-                ) as response:
-                    self.log_message(f"Response status: {response.status}", level=logging.DEBUG)
-                    if response.status in [200, 201]:
-                        data = await response.json()
-                        return {"status": "success", "data": data}
-                    if response.status == 401 and self.zentao_token:
-                        self.log_message("Token expired, refreshing", level=logging.WARNING)
-                        new_token = await self.get_zentao_token()
-                        if new_token:
-                            headers["Token"] = new_token
-                            return await self.api_request(method, url, headers=headers, **kwargs)
-                    response_text = await response.text()
-                    self.log_message(f"Error response: {response_text}", level=logging.ERROR)
-                    return {"status": "error", "message": response_text, "code": response.status}
+            session = await self.get_session()
+            http_method = getattr(session, method.lower())
+            async with http_method(url, headers=headers, **kwargs) as response:
+                self.log_message(f"Response status: {response.status}", level=logging.DEBUG)
+                if response.status in [200, 201]:
+                    data = await response.json()
+                    return {"status": "success", "data": data}
+                if response.status == 401 and self.zentao_token:
+                    self.log_message("Token expired, refreshing", level=logging.WARNING)
+                    new_token = await self.get_zentao_token()
+                    if new_token:
+                        headers["Token"] = new_token
+                        return await self.api_request(method, url, headers=headers, **kwargs)
+                response_text = await response.text()
+                self.log_message(f"Error response: {response_text}", level=logging.ERROR)
+                return {"status": "error", "message": response_text, "code": response.status}
         except asyncio.TimeoutError:
             self.log_message("Request timed out", level=logging.ERROR)
             raise
@@ -251,19 +311,19 @@ class BugFetcherCore:
 
         self.log_message(f"Sending message to Feishu: {feishu_message}", level=logging.DEBUG)
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.feishu_webhook_url,
-                    headers={"Content-Type": "application/json"},
-                    json=feishu_message,
-                    timeout=10,
-                ) as response:
-                    if response.status == 200:
-                        self.log_message("Successfully sent to Feishu", level=logging.INFO)
-                        return {"status": "success", "message": "Message sent to Feishu"}
-                    text = await response.text()
-                    self.log_message(f"Failed to send to Feishu: {text}", level=logging.ERROR)
-                    return {"status": "error", "message": f"Failed to send: {text}"}
+            session = await self.get_session()
+            async with session.post(
+                self.feishu_webhook_url,
+                headers={"Content-Type": "application/json"},
+                json=feishu_message,
+                timeout=aiohttp.ClientTimeout(total=self.feishu_timeout),
+            ) as response:
+                if response.status == 200:
+                    self.log_message("Successfully sent to Feishu", level=logging.INFO)
+                    return {"status": "success", "message": "Message sent to Feishu"}
+                text = await response.text()
+                self.log_message(f"Failed to send to Feishu: {text}", level=logging.ERROR)
+                return {"status": "error", "message": f"Failed to send: {text}"}
         except Exception as e:
             self.log_message(f"Error sending to Feishu: {str(e)}", level=logging.ERROR)
             return {"status": "error", "message": str(e)}
@@ -271,7 +331,15 @@ class BugFetcherCore:
     ### **同步方法包装**
     def _sync_wrapper(self, async_func: Callable, *args, **kwargs) -> Any:
         """将异步方法包装为同步方法"""
-        return asyncio.run(async_func(*args, **kwargs))
+
+        async def runner():
+            try:
+                return await async_func(*args, **kwargs)
+            finally:
+                # asyncio.run 结束后事件循环即被销毁，会话需随之关闭
+                await self.close()
+
+        return asyncio.run(runner())
 
     def get_zentao_token_sync(self) -> Optional[str]:
         """同步获取禅道令牌"""
@@ -0,0 +1,97 @@
+import time
+import asyncio
+import itertools
+from typing import Dict, Iterable, List, Optional, Set
+from ..store import assignee
+
+CLOSED_STATUS = {"resolved", "closed"}
+
+
+def change_events(product_id: str, changes: Dict[str, List[Dict]]) -> List[Dict]:
+    """把同步结果转换为事件：added / changed / resolved
+
+    变更为已解决/已关闭的Bug和从产品列表中消失的Bug都视为 resolved。
+    """
+    events = []
+    for bug in changes.get("added", []):
+        events.append(("added", bug))
+    for bug in changes.get("changed", []):
+        events.append(("resolved" if bug.get("status") in CLOSED_STATUS else "changed", bug))
+    for bug in changes.get("removed", []):
+        events.append(("resolved", bug))
+    now = time.time()
+    return [
+        {"type": kind, "product_id": str(product_id), "bug_id": bug.get("id"), "bug": bug, "ts": now}
+        for kind, bug in events
+    ]
+
+
+class Subscription:
+    """单个订阅者：按条件过滤事件，缓冲区满时丢弃最旧事件并在下次读取时提示重新同步"""
+
+    def __init__(
+        self,
+        product_ids: Optional[Iterable[str]] = None,
+        assignee: Optional[str] = None,
+        severity: Optional[Iterable[int]] = None,
+        buffer: int = 100,
+    ):
+        self.product_ids: Optional[Set[str]] = {str(p) for p in product_ids} if product_ids else None
+        self.assignee = assignee
+        self.severity: Optional[Set[int]] = {int(s) for s in severity} if severity else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, buffer))
+        self.dropped = 0
+
+    def matches(self, event: Dict) -> bool:
+        bug = event["bug"]
+        if self.product_ids is not None and event["product_id"] not in self.product_ids:
+            return False
+        if self.assignee and self.assignee not in assignee(bug):
+            return False
+        if self.severity is not None and bug.get("severity") not in self.severity:
+            return False
+        return True
+
+    def offer(self, event: Dict) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Dict:
+        """下一个事件；有事件被丢弃时先返回 overflow 事件"""
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return {"type": "overflow", "dropped": dropped, "ts": time.time()}
+        return await self.queue.get()
+
+
+class BugEventHub:
+    """Bug变化事件的进程内广播，一次上游同步的结果分发给所有订阅者"""
+
+    def __init__(self):
+        self.subscribers: Set[Subscription] = set()
+        self._ids = itertools.count(1)
+        self.stats = {"published": 0, "delivered": 0}
+
+    def subscribe(self, **filters) -> Subscription:
+        subscription = Subscription(**filters)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+
+    def publish(self, product_id: str, changes: Dict[str, List[Dict]]) -> int:
+        """发布一次同步的变化，返回生成的事件数"""
+        if not self.subscribers:
+            return 0
+        events = change_events(product_id, changes)
+        for event in events:
+            event["id"] = next(self._ids)
+            for subscription in self.subscribers:
+                if subscription.matches(event):
+                    subscription.offer(event)
+                    self.stats["delivered"] += 1
+        self.stats["published"] += len(events)
+        return len(events)
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import concurrent.futures
+from typing import Any, Awaitable, Optional
+
+
+class LoopThread:
+    """在后台线程中常驻运行的 asyncio 事件循环
+
+    同步代码(如 Tk 主线程)通过 submit() 提交协程，拿到 concurrent.futures.Future，
+    取消该 Future 会同时取消循环中的任务。
+    """
+
+    def __init__(self, name: str = "BugFetcherLoop"):
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "LoopThread":
+        if self.running:
+            return self
+        self._started.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def _run(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._started.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """提交协程到后台循环，立即返回 Future"""
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """提交协程并阻塞等待结果，超时后取消任务并抛出 TimeoutError"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("LoopThread.run() called from its own loop thread")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """停止事件循环并等待线程退出，未完成的任务会被取消"""
+        if not self.running:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
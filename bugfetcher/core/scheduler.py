@@ -0,0 +1,210 @@
+import time
+import random
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+from ..log import bind_request_id
+
+
+class AdaptiveInterval:
+    """按观察到的变化调整轮询间隔
+
+    有变化时间隔乘以 speedup 向 min_interval 收缩，无变化或失败时乘以 backoff 向 max_interval 退避；
+    禅道返回 Retry-After 时下一次间隔不小于该值。min_interval == max_interval 时即固定间隔。
+    """
+
+    def __init__(
+        self,
+        base: float,
+        min_interval: float,
+        max_interval: float,
+        backoff: float = 2.0,
+        speedup: float = 0.5,
+    ):
+        self.min_interval = min(min_interval, max_interval)
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.speedup = speedup
+        self.current = self._clamp(base)
+
+    def _clamp(self, interval: float) -> float:
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def update(self, changed: bool, retry_after: Optional[float] = None) -> float:
+        """记录一次轮询结果，返回到下一次轮询的秒数"""
+        self.current = self._clamp(self.current * (self.speedup if changed else self.backoff))
+        if retry_after:
+            return max(self.current, retry_after)
+        return self.current
+
+
+class Job:
+    """周期任务：按 interval 秒运行 func，每次间隔加上 0~jitter 秒随机抖动
+
+    指定 policy 时，func 返回结果中的 changed/retry_after 用于调整下一次间隔。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Dict]],
+        interval: float,
+        jitter: float = 0,
+        policy: Optional[AdaptiveInterval] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.interval = policy.current if policy else interval
+        self.jitter = jitter
+        self.policy = policy
+        self.paused = False
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.last_run: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_status: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.next_run: Optional[float] = None
+        self._wake = asyncio.Event()
+        self._forced = False
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "jitter": self.jitter,
+            "paused": self.paused,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run": self.last_run,
+            "last_duration": self.last_duration,
+            "last_status": self.last_status,
+            "last_error": self.last_error,
+            "next_run": self.next_run,
+        }
+
+
+def _in_loop(loop: asyncio.AbstractEventLoop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+class Scheduler:
+    """进程内调度器，每个任务一个协程循环，同一任务的运行不会重叠"""
+
+    def __init__(self, jobs: List[Job], log: Optional[Callable[..., None]] = None):
+        self.jobs: Dict[str, Job] = {job.name: job for job in jobs}
+        self._log = log or (lambda message, level=logging.INFO: logging.getLogger("BugFetcher").log(level, message))
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def running(self) -> bool:
+        return self._event_loop is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._event_loop = asyncio.get_running_loop()
+        self._tasks = {name: asyncio.create_task(self._loop(job)) for name, job in self.jobs.items()}
+        self._log(f"Scheduler started with {len(self.jobs)} jobs", level=logging.INFO)
+
+    async def stop(self) -> None:
+        tasks, self._tasks, self._event_loop = list(self._tasks.values()), {}, None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def replace(self, jobs: List[Job]) -> None:
+        """替换全部任务，可在任意线程调用
+
+        旧任务取消(正在进行的同步由核心共享，不会被中断)，新任务在调度器运行时立即启动；
+        同名任务保留暂停状态。
+        """
+        loop = self._event_loop
+        if loop is not None and not _in_loop(loop):
+            loop.call_soon_threadsafe(self.replace, jobs)
+            return
+        for job in jobs:
+            if job.name in self.jobs:
+                job.paused = self.jobs[job.name].paused
+        for task in self._tasks.values():
+            task.cancel()
+        self.jobs = {job.name: job for job in jobs}
+        if loop is not None:
+            self._tasks = {name: loop.create_task(self._loop(job)) for name, job in self.jobs.items()}
+            self._log(f"Scheduler jobs replaced: {', '.join(self.jobs) or 'none'}", level=logging.INFO)
+
+    def list(self) -> List[Dict]:
+        return [job.to_dict() for job in self.jobs.values()]
+
+    def pause(self, name: str) -> Optional[Dict]:
+        job = self.jobs.get(name)
+        if job is None:
+            return None
+        job.paused = True
+        return job.to_dict()
+
+    def resume(self, name: str) -> Optional[Dict]:
+        job = self.jobs.get(name)
+        if job is None:
+            return None
+        job.paused = False
+        return job.to_dict()
+
+    def trigger(self, name: str) -> Optional[Dict]:
+        """立即运行一次(暂停的任务也会运行)，正在运行时不重复触发"""
+        job = self.jobs.get(name)
+        if job is None:
+            return None
+        if not job.running:
+            job._forced = True
+            job._wake.set()
+        return job.to_dict()
+
+    def _delay(self, job: Job) -> float:
+        return job.interval + random.uniform(0, job.jitter)
+
+    async def _loop(self, job: Job) -> None:
+        # 首次运行也加抖动，避免多个任务同时请求禅道
+        job.next_run = time.time() + random.uniform(0, job.jitter)
+        while True:
+            try:
+                await asyncio.wait_for(job._wake.wait(), timeout=max(0.0, job.next_run - time.time()))
+            except asyncio.TimeoutError:
+                pass
+            job._wake.clear()
+            forced, job._forced = job._forced, False
+            if not job.paused or forced:
+                await self._run(job)
+            job.next_run = time.time() + self._delay(job)
+
+    async def _run(self, job: Job) -> None:
+        job.running = True
+        started = time.time()
+        result: Dict = {}
+        try:
+            # 每次运行一个关联ID，串起该次轮询产生的全部日志
+            with bind_request_id():
+                result = await job.func() or {}
+            job.last_status = result.get("status", "success")
+            job.last_error = result.get("message") if job.last_status == "error" else None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.last_status = "error"
+            job.last_error = repr(e)
+        finally:
+            job.running = False
+            job.runs += 1
+            job.last_run = started
+            job.last_duration = time.time() - started
+        if job.last_status == "error":
+            job.failures += 1
+            self._log(f"Job {job.name} failed: {job.last_error}", level=logging.WARNING)
+        if job.policy is not None:
+            job.interval = job.policy.update(bool(result.get("changed")), result.get("retry_after"))
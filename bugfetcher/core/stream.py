@@ -0,0 +1,158 @@
+import re
+import json
+import codecs
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+
+
+class _NeedMore(Exception):
+    """缓冲区中的数据不足以解析下一个值"""
+
+
+class JSONArrayParser:
+    """增量解析 {"key": [...], ...} 形式的JSON
+
+    feed() 传入响应体的字节块，返回本块中已完整的数组元素；数组以外的顶层字段
+    (page/total/limit 等)收集到 meta。缓冲区只保留尚未解析完的尾部，
+    内存占用与单个元素相当，而不是整个响应体。key 为 None 时解析顶层数组。
+    """
+
+    def __init__(self, key: Optional[str]):
+        self.key = key
+        self.meta: Dict[str, Any] = {}
+        self.done = False
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._state = "object" if key is not None else "array"
+        self._field: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        self._append(self._utf8.decode(chunk))
+        return self._parse()
+
+    def close(self) -> List[Any]:
+        """输入结束，返回剩余元素；文档不完整时抛出 ValueError"""
+        self._append(self._utf8.decode(b"", final=True))
+        self._eof = True
+        items = self._parse()
+        if not self.done:
+            raise ValueError("Incomplete JSON document")
+        return items
+
+    def _append(self, text: str) -> None:
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+
+    def _peek(self) -> str:
+        """跳过空白后的下一个字符，缓冲区耗尽时等待更多数据"""
+        self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+        if self._pos >= len(self._buffer):
+            raise _NeedMore
+        return self._buffer[self._pos]
+
+    def _expect(self, *chars: str) -> str:
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(f"Expected {' or '.join(map(repr, chars))} at position {self._pos}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _value(self) -> Any:
+        self._peek()
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if self._eof:
+                raise
+            raise _NeedMore
+        # 数字在块边界处可能还没读完："12" 后面还有 "3"，或 raw_decode 只取了 "2." / "2.5e" / "1e-" 的整数前缀
+        if not self._eof and isinstance(value, (int, float)) and (
+            end >= len(self._buffer) or self._buffer[end] in _NUMBER_CHARS
+        ):
+            raise _NeedMore
+        self._pos = end
+        return value
+
+    def _parse(self) -> List[Any]:
+        items: List[Any] = []
+        try:
+            while not self.done:
+                self._step(items)
+        except _NeedMore:
+            if self._eof:
+                raise ValueError("Incomplete JSON document")
+        return items
+
+    def _step(self, items: List[Any]) -> None:
+        state = self._state
+        if state == "object":
+            self._expect("{")
+            self._state = "first_field"
+        elif state in ("first_field", "field"):
+            if state == "first_field" and self._peek() == "}":
+                self._pos += 1
+                self.done = True
+                return
+            field = self._value()
+            if not isinstance(field, str):
+                raise ValueError(f"Expected object key at position {self._pos}")
+            self._field = field
+            self._state = "colon"
+        elif state == "colon":
+            self._expect(":")
+            self._state = "array" if self._field == self.key else "field_value"
+        elif state == "field_value":
+            self.meta[self._field] = self._value()
+            self._state = "next_field"
+        elif state == "next_field":
+            if self._expect(",", "}") == ",":
+                self._state = "field"
+            else:
+                self.done = True
+        elif state == "array":
+            if self._peek() != "[" and self.key is not None:
+                # "bugs": null 之类按普通字段处理
+                self._state = "field_value"
+                return
+            self._expect("[")
+            self._state = "first_item"
+        elif state in ("first_item", "item"):
+            if state == "first_item" and self._peek() == "]":
+                self._pos += 1
+                self._end_array()
+                return
+            items.append(self._value())
+            self._state = "next_item"
+        elif state == "next_item":
+            if self._expect(",", "]") == ",":
+                self._state = "item"
+            else:
+                self._end_array()
+
+    def _end_array(self) -> None:
+        if self.key is None:
+            self.done = True
+        else:
+            self._state = "next_field"
+
+
+async def iter_json_array(
+    chunks: AsyncIterable[bytes], key: Optional[str], meta: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Any]:
+    """逐个产出响应体中 key 数组的元素，结束后把其余顶层字段写入 meta
+
+    chunks 一般为 response.content.iter_chunked(n)。
+    """
+    parser = JSONArrayParser(key)
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.close():
+        yield item
+    if meta is not None:
+        meta.update(parser.meta)
@@ -0,0 +1,107 @@
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List
+from ..store import assignee
+
+
+def _date(value: Any) -> str:
+    """禅道用 "0000-00-00 00:00:00" 表示空日期，按缺失处理"""
+    if not value or str(value).startswith("0000-00-00"):
+        return ""
+    return value
+
+
+def edit_stamp(bug: Dict) -> str:
+    """Bug的最后编辑时间，从未编辑过的Bug使用创建时间"""
+    return _date(bug.get("lastEditedDate")) or _date(bug.get("openedDate"))
+
+
+def bug_number(bug: Dict) -> int:
+    """数字形式的Bug ID，无法转换时为 0"""
+    try:
+        return int(bug.get("id"))
+    except (TypeError, ValueError):
+        return 0
+
+
+class BugSnapshot:
+    """单个产品的本地Bug快照，记录增量同步的高水位"""
+
+    def __init__(self, product_id: str):
+        self.product_id = product_id
+        self.bugs: Dict[Any, Dict] = {}
+        self.watermark = ""  # 已同步的最大 lastEditedDate
+        self.max_id = 0  # 已同步的最大Bug ID，用于拉取从未编辑过的新Bug
+        self.last_full_sync = 0.0
+
+    @property
+    def synced(self) -> bool:
+        return self.last_full_sync > 0
+
+    def load(self, bugs: Iterable[Dict], watermark: str, last_full_sync: float) -> None:
+        """从本地存储恢复快照，重启后可直接进入增量同步"""
+        self.bugs = {bug.get("id"): bug for bug in bugs}
+        self.watermark = watermark
+        self.max_id = max(map(bug_number, self.bugs.values()), default=0)
+        self.last_full_sync = last_full_sync
+
+    def values(self) -> List[Dict]:
+        return list(self.bugs.values())
+
+    def is_known(self, bug: Dict) -> bool:
+        """编辑时间早于水位的Bug已在快照中；与水位同一时刻的Bug仍需重新合并"""
+        return edit_stamp(bug) < self.watermark
+
+    def is_new(self, bug: Dict) -> bool:
+        """ID大于已同步的最大ID，是上次同步之后创建的Bug"""
+        return bug_number(bug) > self.max_id
+
+    def merge(self, bugs: Iterable[Dict]) -> Dict[str, List[Dict]]:
+        """合并增量数据，返回新增和变更的Bug"""
+        changes: Dict[str, List[Dict]] = {"added": [], "changed": [], "removed": []}
+        for bug in bugs:
+            bug_id = bug.get("id")
+            previous = self.bugs.get(bug_id)
+            if previous is None:
+                changes["added"].append(bug)
+            elif previous != bug:
+                changes["changed"].append(bug)
+            else:
+                continue
+            self.bugs[bug_id] = bug
+            self._advance(bug)
+        return changes
+
+    def replace(self, bugs: Iterable[Dict]) -> Dict[str, List[Dict]]:
+        """全量替换快照，返回与旧快照相比的变化"""
+        bugs = list(bugs)
+        fresh_ids = {bug.get("id") for bug in bugs}
+        removed = [bug for bug_id, bug in self.bugs.items() if bug_id not in fresh_ids]
+        for bug in removed:
+            del self.bugs[bug.get("id")]
+        changes = self.merge(bugs)
+        changes["removed"] = removed
+        self.watermark = ""
+        self.max_id = 0
+        for bug in bugs:
+            self._advance(bug)
+        self.last_full_sync = time.time()
+        return changes
+
+    def _advance(self, bug: Dict) -> None:
+        stamp = edit_stamp(bug)
+        if stamp > self.watermark:
+            self.watermark = stamp
+        number = bug_number(bug)
+        if number > self.max_id:
+            self.max_id = number
+
+
+def index_by_assignee(bugs: Iterable[Dict]) -> Dict[str, List[Dict]]:
+    """一次遍历建立 指派人账号 -> Bug列表 的索引"""
+    index: Dict[str, List[Dict]] = defaultdict(list)
+    for bug in bugs:
+        account, _ = assignee(bug)
+        if account:
+            index[account].append(bug)
+    return index
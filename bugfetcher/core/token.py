@@ -0,0 +1,79 @@
+import time
+import asyncio
+import aiohttp
+from typing import Awaitable, Callable, Optional
+
+# 提前刷新因网络错误失败后，间隔多少秒再尝试
+REFRESH_RETRY_DELAY = 30.0
+
+
+class TokenManager:
+    """禅道令牌管理
+
+    并发请求同时遇到令牌过期时，只发起一次登录，其余请求等待同一个 future；
+    令牌接近过期时提前刷新；提前刷新遇到网络错误时继续使用当前令牌，
+    由请求本身失败后走离线回退，而不是在登录时就抛出异常。
+    """
+
+    def __init__(
+        self,
+        login: Callable[[], Awaitable[Optional[str]]],
+        current: Callable[[], str],
+        ttl: Callable[[], float],
+        refresh_margin: Callable[[], float],
+    ):
+        self._login = login
+        self._current = current
+        self._ttl = ttl
+        self._refresh_margin = refresh_margin
+        self._inflight: Optional[asyncio.Future] = None
+        self.obtained_at = time.monotonic()  # 从配置加载的令牌视为刚获取
+        self.refresh_count = 0
+        self._retry_at = 0.0  # 提前刷新失败后，此时间之前不再提前刷新
+
+    @property
+    def expiring(self) -> bool:
+        """令牌是否已接近过期，ttl 为 0 时不做提前刷新"""
+        ttl = self._ttl()
+        if ttl <= 0:
+            return False
+        now = time.monotonic()
+        return now >= self._retry_at and now - self.obtained_at >= ttl - self._refresh_margin()
+
+    async def ensure(self) -> Optional[str]:
+        """返回可用令牌，缺失或即将过期时刷新"""
+        token = self._current()
+        if token and not self.expiring:
+            return token
+        if not token:
+            return await self.refresh()
+        try:
+            refreshed = await self.refresh(stale_token=token)
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            refreshed = None
+        if not refreshed:
+            self._retry_at = time.monotonic() + REFRESH_RETRY_DELAY
+        return refreshed or self._current() or token
+
+    async def refresh(self, stale_token: Optional[str] = None) -> Optional[str]:
+        """刷新令牌，并发调用共享同一次登录
+
+        stale_token 为请求失败时使用的令牌；若当前令牌已不同，说明其他请求
+        已完成刷新，直接复用。
+        """
+        token = self._current()
+        if stale_token and token and token != stale_token:
+            return token
+
+        inflight = self._inflight
+        if inflight is None or inflight.done() or inflight.get_loop() is not asyncio.get_running_loop():
+            inflight = self._inflight = asyncio.ensure_future(self._do_refresh())
+        # shield 保证单个调用方被取消时不会中断其他调用方共享的登录
+        return await asyncio.shield(inflight)
+
+    async def _do_refresh(self) -> Optional[str]:
+        token = await self._login()
+        if token:
+            self.obtained_at = time.monotonic()
+            self.refresh_count += 1
+        return token
@@ -0,0 +1,2 @@
+from .delivery import FeishuDeliveryQueue, TokenBucket, render_feishu_payload
+from .diff import diff_bugs, fingerprint
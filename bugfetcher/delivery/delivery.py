@@ -0,0 +1,289 @@
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from ..models.models import FeishuMessage, model_to_dict
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def render_feishu_payload(messages: List[FeishuMessage]) -> Dict:
+    """渲染飞书消息体，多条通知合并为一条，顶层字段与单条消息保持一致"""
+    notifications = [
+        {
+            "total": message.total,
+            "bugs": [
+                {"id": bug.get("id", "未知ID"), "title": bug.get("title", "未命名缺陷")}
+                for bug in message.bugs
+            ],
+            "realname": message.realname,
+            "suggestion": message.suggestion,
+            **_delta_fields(message),
+        }
+        for message in messages
+    ]
+    if len(notifications) == 1:
+        content = notifications[0]
+    else:
+        content = {
+            "total": sum(item["total"] for item in notifications),
+            "bugs": [bug for item in notifications for bug in item["bugs"]],
+            "realname": "、".join(item["realname"] for item in notifications),
+            "suggestion": "\n".join(item["suggestion"] for item in notifications if item["suggestion"]) or None,
+            "notifications": notifications,
+        }
+    return {"msg_type": "text", "content": {"text": json.dumps(content, ensure_ascii=False)}}
+
+
+def _delta_fields(message: FeishuMessage) -> Dict:
+    """增量通知附带的新增/变更/已解决Bug ID"""
+    if message.resolved is None:
+        return {}
+    return {"added": message.added or [], "changed": message.changed or [], "resolved": message.resolved}
+
+
+class TokenBucket:
+    """令牌桶限流，rate 为每秒补充的令牌数"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FeishuDeliveryQueue:
+    """飞书后台投递队列
+
+    消息先写入磁盘暂存目录再入队，由多个worker按Webhook限流发送，
+    429/5xx 和网络错误按指数退避加抖动重试。同一Webhook下排队的多条消息合并为一条发送。
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, Dict], Awaitable[Dict]],
+        spool_dir: str = "feishu_spool",
+        workers: int = 2,
+        rate_per_minute: float = 100,
+        burst: int = 5,
+        max_attempts: int = 5,
+        batch_size: int = 10,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        max_records: int = 1000,
+        log: Optional[Callable[..., None]] = None,
+    ):
+        self._send = send
+        self.spool_dir = spool_dir
+        self.workers = workers
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_records = max_records
+        self._log = log or (lambda message, level=logging.INFO: logging.getLogger("BugFetcher").log(level, message))
+
+        self.records: "OrderedDict[str, Dict]" = OrderedDict()  # 投递ID -> 投递记录
+        self._pending: Dict[str, List[Dict]] = {}  # Webhook -> 待发送记录
+        self._scheduled: Set[str] = set()  # 已在就绪队列中的Webhook
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # 投递ID -> 送达后调用的回调；只在内存中，重启后从暂存目录恢复的消息没有回调
+        self._callbacks: Dict[str, Callable[[], Awaitable[None]]] = {}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def depth(self) -> int:
+        """待发送的消息数"""
+        return sum(len(records) for records in self._pending.values())
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._ready = asyncio.Queue()
+        os.makedirs(self.spool_dir, exist_ok=True)
+        spooled = await asyncio.to_thread(self._load_spool)
+        for record in spooled:
+            self._add(record)
+        if spooled:
+            self._log(f"Recovered {len(spooled)} spooled Feishu deliveries", level=logging.INFO)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(max(1, self.workers))]
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        """停止worker，尽量在超时前发完队列，未发送的消息保留在暂存目录"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._ready.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            self._log(f"Stopping with {self.depth} Feishu deliveries still spooled", level=logging.WARNING)
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def enqueue(
+        self,
+        message: FeishuMessage,
+        webhook_url: str,
+        on_delivered: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> str:
+        """消息落盘后入队，返回投递ID；on_delivered 在确认送达后调用，最终失败时不调用"""
+        record = {
+            "id": uuid.uuid4().hex,
+            "webhook_url": webhook_url,
+            "message": model_to_dict(message),
+            "status": "pending",
+            "attempts": 0,
+            "created_at": time.time(),
+            "error": None,
+        }
+        await asyncio.to_thread(self._spool_write, record)
+        if on_delivered is not None:
+            self._callbacks[record["id"]] = on_delivered
+        self._add(record)
+        return record["id"]
+
+    def get(self, delivery_id: str) -> Optional[Dict]:
+        record = self.records.get(delivery_id)
+        if record is None:
+            return None
+        return {key: value for key, value in record.items() if key != "message"}
+
+    def _add(self, record: Dict) -> None:
+        self.records[record["id"]] = record
+        self._pending.setdefault(record["webhook_url"], []).append(record)
+        self._schedule(record["webhook_url"])
+
+    def _schedule(self, webhook_url: str) -> None:
+        if webhook_url not in self._scheduled:
+            self._scheduled.add(webhook_url)
+            self._ready.put_nowait(webhook_url)
+
+    async def _worker(self) -> None:
+        while True:
+            webhook_url = await self._ready.get()
+            try:
+                pending = self._pending.get(webhook_url, [])
+                batch, self._pending[webhook_url] = pending[: self.batch_size], pending[self.batch_size:]
+                if batch:
+                    await self._deliver(webhook_url, batch)
+            except Exception as e:
+                self._log(f"Feishu delivery worker error: {e!r}", level=logging.ERROR)
+            finally:
+                self._scheduled.discard(webhook_url)
+                if self._pending.get(webhook_url):
+                    self._schedule(webhook_url)
+                else:
+                    self._pending.pop(webhook_url, None)
+                self._ready.task_done()
+
+    async def _deliver(self, webhook_url: str, batch: List[Dict]) -> None:
+        bucket = self._buckets.get(webhook_url)
+        if bucket is None:
+            bucket = self._buckets[webhook_url] = TokenBucket(self.rate_per_minute / 60.0, self.burst)
+        payload = render_feishu_payload([FeishuMessage(**record["message"]) for record in batch])
+        for record in batch:
+            record["status"] = "sending"
+
+        attempt = 0
+        while True:
+            attempt += 1
+            await bucket.acquire()
+            result = await self._send(webhook_url, payload)
+            for record in batch:
+                record["attempts"] += 1
+            if result["status"] == "success":
+                self._finish(batch, "delivered")
+                await self._confirm(batch)
+                return
+            retryable = result.get("code") is None or result["code"] in RETRYABLE_STATUS
+            if not retryable or attempt >= self.max_attempts:
+                self._finish(batch, "failed", result.get("message"))
+                return
+            delay = result.get("retry_after") or random.uniform(
+                0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+            )
+            self._log(
+                f"Feishu delivery failed ({result.get('code')}), retry {attempt} in {delay:.1f}s",
+                level=logging.WARNING,
+            )
+            await asyncio.sleep(delay)
+
+    async def _confirm(self, batch: List[Dict]) -> None:
+        """调用已送达消息的回调"""
+        for record in batch:
+            callback = self._callbacks.pop(record["id"], None)
+            if callback is None:
+                continue
+            try:
+                await callback()
+            except Exception as e:
+                self._log(f"Feishu delivery callback failed: {e!r}", level=logging.ERROR)
+
+    def _finish(self, batch: List[Dict], status: str, error: Optional[str] = None) -> None:
+        for record in batch:
+            record["status"] = status
+            record["error"] = error
+            record["finished_at"] = time.time()
+            self._spool_remove(record["id"])
+            if status == "failed":
+                self._callbacks.pop(record["id"], None)
+        self._log(f"{len(batch)} Feishu deliveries {status}", level=logging.INFO)
+        # 只保留最近的已完成记录，待发送记录不会被淘汰
+        finished = [key for key, record in self.records.items() if record["status"] in ("delivered", "failed")]
+        for key in finished[: max(0, len(finished) - self.max_records)]:
+            del self.records[key]
+
+    ### **磁盘暂存**
+    def _spool_path(self, delivery_id: str) -> str:
+        return os.path.join(self.spool_dir, f"{delivery_id}.json")
+
+    def _spool_write(self, record: Dict) -> None:
+        path = self._spool_path(record["id"])
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _spool_remove(self, delivery_id: str) -> None:
+        try:
+            os.remove(self._spool_path(delivery_id))
+        except FileNotFoundError:
+            pass
+
+    def _load_spool(self) -> List[Dict]:
+        records = []
+        for name in os.listdir(self.spool_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.spool_dir, name)) as f:
+                    record = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            record["status"] = "pending"
+            records.append(record)
+        records.sort(key=lambda record: record.get("created_at", 0))
+        return records
@@ -0,0 +1,35 @@
+import json
+import hashlib
+from typing import Dict, Iterable, List
+
+# 参与指纹计算的字段：标题和会出现在通知里的状态信息
+FINGERPRINT_FIELDS = ("title", "status", "severity", "pri")
+
+
+def bug_fingerprint(bug: Dict) -> str:
+    content = json.dumps([bug.get(field) for field in FINGERPRINT_FIELDS], ensure_ascii=False)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def fingerprint(bugs: Iterable[Dict]) -> Dict[str, str]:
+    """Bug集合的紧凑指纹：Bug ID -> 内容哈希"""
+    return {str(bug.get("id")): bug_fingerprint(bug) for bug in bugs}
+
+
+def diff_bugs(previous: Dict[str, str], bugs: List[Dict]) -> Dict:
+    """与上次通知的指纹比较，返回新增、变更和已解决(不再出现)的Bug"""
+    current = fingerprint(bugs)
+    added = [bug for bug in bugs if str(bug.get("id")) not in previous]
+    changed = [
+        bug
+        for bug in bugs
+        if str(bug.get("id")) in previous and previous[str(bug.get("id"))] != current[str(bug.get("id"))]
+    ]
+    resolved = [bug_id for bug_id in previous if bug_id not in current]
+    return {
+        "added": added,
+        "changed": changed,
+        "resolved": resolved,
+        "fingerprint": current,
+        "has_changes": bool(added or changed or resolved),
+    }
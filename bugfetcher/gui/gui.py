@@ -1,16 +1,31 @@
+import queue
 import tkinter as tk
-from tkinter import messagebox
+import concurrent.futures
+from tkinter import messagebox, ttk
 from ..core import BugFetcherCore
 
+POLL_MS = 100  # 检查后台任务结果的间隔
+
+
 class BugFetcherGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Bug Fetcher")
+        # 网络请求在核心模块的常驻后台事件循环中执行，Tk 主线程只负责界面
         self.fetcher = BugFetcherCore()
+        self.progress_queue = queue.Queue()
+        self.fetcher.progress_callback = lambda done, total: self.progress_queue.put((done, total))
+        # 其他进程(CLI/API)或手工修改 config.json 后自动生效
+        self.fetcher.watch_config()
         self.is_fetching = False
         self.fetch_job = None
+        self.fetch_future = None
+        self.poll_policy = None
+        self.changes_before = 0
         self.create_widgets()
         self.load_config()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(POLL_MS, self.poll_progress)
 
     def create_widgets(self):
         frame = tk.Frame(self.root, padx=10, pady=10)
@@ -42,8 +57,13 @@ class BugFetcherGUI:
         self.fetch_btn = tk.Button(frame, text="Start Fetching", command=self.toggle_fetching)
         self.fetch_btn.grid(row=6, column=0, columnspan=2)
 
+        self.status_label = tk.Label(frame, text="Idle", anchor=tk.W)
+        self.status_label.grid(row=7, column=0, sticky=tk.W)
+        self.progress = ttk.Progressbar(frame, mode="indeterminate")
+        self.progress.grid(row=7, column=1, sticky=tk.EW)
+
         self.log_text = tk.Text(frame, height=10, state='disabled')
-        self.log_text.grid(row=7, column=0, columnspan=2)
+        self.log_text.grid(row=8, column=0, columnspan=2)
 
     def log(self, message):
         self.fetcher.log_message(message)
@@ -51,6 +71,53 @@ class BugFetcherGUI:
         self.log_text.insert(tk.END, f"{message}\n")
         self.log_text.config(state='disabled')
 
+    ### **后台任务**
+    def run_async(self, coro, on_done, status, on_error=None):
+        """在后台循环中执行协程，完成后在 Tk 主线程回调 on_done(result)，抛出异常时回调 on_error(e)"""
+        future = self.fetcher.submit(coro)
+        self.set_busy(status)
+        self.root.after(POLL_MS, self.check_future, future, on_done, on_error)
+        return future
+
+    def check_future(self, future, on_done, on_error=None):
+        if not future.done():
+            self.root.after(POLL_MS, self.check_future, future, on_done, on_error)
+            return
+        self.set_idle()
+        try:
+            result = future.result()
+        except concurrent.futures.CancelledError:
+            self.log("Request cancelled")
+            return
+        except Exception as e:
+            self.log(f"Request failed: {e!r}")
+            if on_error is not None:
+                on_error(e)
+            return
+        on_done(result)
+
+    def set_busy(self, status):
+        self.status_label.config(text=status)
+        self.progress.config(mode="indeterminate")
+        self.progress.start(10)
+
+    def set_idle(self):
+        self.progress.stop()
+        self.progress.config(mode="determinate", value=0)
+        self.status_label.config(text="Idle")
+
+    def poll_progress(self):
+        """把后台线程上报的分页进度显示到进度条"""
+        try:
+            while True:
+                done, total = self.progress_queue.get_nowait()
+                self.progress.stop()
+                self.progress.config(mode="determinate", maximum=total, value=done)
+                self.status_label.config(text=f"Fetching page {done}/{total}")
+        except queue.Empty:
+            pass
+        self.root.after(POLL_MS, self.poll_progress)
+
     def load_config(self):
         config = self.fetcher._config
         self.zentao_url.insert(0, config.get("zentao_url", ""))
@@ -60,26 +127,40 @@ class BugFetcherGUI:
         self.fetch_interval.insert(0, str(config.get("fetch_interval", 60)))
 
     def login(self):
-        self.fetcher._config["zentao_url"] = self.zentao_url.get()
-        self.fetcher._config["zentao_username"] = self.zentao_username.get()
-        self.fetcher._config["zentao_password"] = self.zentao_password.get()
-        self.fetcher._config["feishu_webhook_url"] = self.feishu_webhook.get()
-        self.fetcher._config["fetch_interval"] = int(self.fetch_interval.get())
-        self.fetcher.save_config()
-        token = self.fetcher.get_zentao_token_sync()
+        self.fetcher.update_config({
+            "zentao_url": self.zentao_url.get(),
+            "zentao_username": self.zentao_username.get(),
+            "zentao_password": self.zentao_password.get(),
+            "feishu_webhook_url": self.feishu_webhook.get(),
+            "fetch_interval": int(self.fetch_interval.get()),
+        })
+        self.login_btn.config(state='disabled')
+        self.run_async(
+            self.login_flow(), self.on_login, "Logging in...",
+            on_error=lambda e: self.login_btn.config(state='normal'),
+        )
+
+    async def login_flow(self):
+        """登录、获取用户信息和产品列表，在后台循环中共用一个会话"""
+        token = await self.fetcher.get_zentao_token()
+        if not token:
+            return None, None, []
+        user_info = await self.fetcher.fetch_user_info()
+        products = await self.fetcher.fetch_products()
+        return token, user_info, products
+
+    def on_login(self, result):
+        self.login_btn.config(state='normal')
+        token, user_info, products = result
         if token:
-            self.fetcher.zentao_token = token
-            self.fetcher.save_config()
             self.log("Login successful")
-            user_info = self.fetcher.fetch_user_info_sync()
             self.log("User info: " + str(user_info))
-            self.select_product()
+            self.select_product(products)
         else:
             self.log("Login failed")
             messagebox.showerror("Error", "Login failed")
 
-    def select_product(self):
-        products = self.fetcher.fetch_products_sync()
+    def select_product(self, products):
         if products:
             win = tk.Toplevel(self.root)
             win.title("Select Product")
@@ -98,7 +179,7 @@ class BugFetcherGUI:
                 "selected_product_id": products[idx]['id']
             }
             self.log("Selected product: " + str(config_update))
-            self.fetcher.save_config()
+            self.fetcher.update_config(config_update)
             win.destroy()
 
     def toggle_fetching(self):
@@ -108,7 +189,7 @@ class BugFetcherGUI:
                 "fetch_interval": int(self.fetch_interval.get())
             }
             self.log("Saving configuration: " + str(config_update))
-            self.fetcher.save_config()
+            self.fetcher.update_config(config_update)
             self.start_fetching()
         else:
             self.log("Stopping fetching")
@@ -118,7 +199,7 @@ class BugFetcherGUI:
         self.is_fetching = True
         self.fetch_btn.config(text="Stop Fetching")
         self.log("Starting fetching")
-        self.fetcher.fetch_new_bugs_sync()
+        self.poll_policy = self.fetcher.poll_policy(self.fetcher.selected_product_id)
         self.schedule_fetch()
 
     def stop_fetching(self):
@@ -127,9 +208,40 @@ class BugFetcherGUI:
         self.log("Stopping fetching")
         if self.fetch_job:
             self.root.after_cancel(self.fetch_job)
+            self.fetch_job = None
+        if self.fetch_future and not self.fetch_future.done():
+            # 取消后台循环中正在进行的请求
+            self.fetch_future.cancel()
 
     def schedule_fetch(self):
         if self.is_fetching:
             self.log("Fetching new bugs")
-            self.fetcher.fetch_new_bugs_sync()
-            self.fetch_job = self.root.after(self.fetcher.fetch_interval * 60000, self.schedule_fetch)
+            self.changes_before = self.fetcher.sync_changes
+            self.fetch_future = self.run_async(
+                self.fetcher.fetch_new_bugs(), self.on_bugs_fetched, "Fetching bugs...",
+                # 请求抛出异常(如网络错误)时也要安排下一次获取，否则轮询就此停止
+                on_error=lambda e: self.schedule_next_fetch(),
+            )
+
+    def on_bugs_fetched(self, result):
+        if result["status"] == "error":
+            self.log(f"Failed to fetch new bugs: {result['message']}")
+        else:
+            self.log(f"Total new bugs: {len(result['bugs'])}")
+        self.schedule_next_fetch()
+
+    def schedule_next_fetch(self):
+        if self.is_fetching:
+            interval = self.poll_policy.update(
+                self.fetcher.sync_changes != self.changes_before, self.fetcher.retry_after()
+            )
+            self.log(f"Next fetch in {interval / 60:.1f} minutes")
+            self.fetch_job = self.root.after(int(interval * 1000), self.schedule_fetch)
+
+    def on_close(self):
+        self.stop_fetching()
+        try:
+            self.fetcher.close_sync(timeout=5)
+        except Exception as e:
+            self.fetcher.log_message(f"Error during shutdown: {e!r}")
+        self.root.destroy()
@@ -0,0 +1,9 @@
+from .log import (
+    LOGGER_NAME,
+    add_secret,
+    bind_request_id,
+    configure_logging,
+    new_request_id,
+    request_id_var,
+    shutdown_logging,
+)
@@ -0,0 +1,247 @@
+import re
+import sys
+import json
+import uuid
+import queue
+import atexit
+import random
+import logging
+import datetime
+import threading
+import contextlib
+import contextvars
+import logging.handlers
+from typing import Dict, Iterable, Iterator, Optional
+
+LOGGER_NAME = "BugFetcher"
+
+# 当前请求/轮询的关联ID，由 API 中间件、调度任务和 CLI 轮询设置
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+_SECRET_KEYS = r"token|password|passwd|secret|authorization|api[_-]?key"
+# 'Token': 'abc' / password=abc / "authorization": "Bearer abc"
+_SECRET_PATTERN = re.compile(
+    rf"""((?:['"]?)(?:{_SECRET_KEYS})(?:['"]?)\s*[:=]\s*['"]?)([^'"\s,&}}]+)""",
+    re.IGNORECASE,
+)
+_SECRET_FIELD = re.compile(_SECRET_KEYS, re.IGNORECASE)
+REDACTED = "***"
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+@contextlib.contextmanager
+def bind_request_id(request_id: Optional[str] = None) -> Iterator[str]:
+    """在当前上下文(协程/线程)中设置关联ID，退出时恢复"""
+    request_id = request_id or new_request_id()
+    token = request_id_var.set(request_id)
+    try:
+        yield request_id
+    finally:
+        request_id_var.reset(token)
+
+
+class Redactor:
+    """脱敏：按键名匹配 token/password 等字段，并替换已登记的密钥原文"""
+
+    def __init__(self):
+        self._secrets: set = set()
+
+    def add_secret(self, value: Optional[str]) -> None:
+        # 过短的值替换后会误伤正常文本
+        if value and len(value) >= 4:
+            self._secrets.add(value)
+
+    def redact(self, text: str) -> str:
+        for secret in self._secrets:
+            if secret in text:
+                text = text.replace(secret, REDACTED)
+        return _SECRET_PATTERN.sub(rf"\g<1>{REDACTED}", text)
+
+    def redact_fields(self, fields: Dict) -> Dict:
+        return {
+            key: REDACTED if _SECRET_FIELD.search(key)
+            else self.redact(value) if isinstance(value, str)
+            else value
+            for key, value in fields.items()
+        }
+
+
+class ContextFilter(logging.Filter):
+    """在发出日志的线程中附加关联ID并脱敏，之后记录经队列交给后台线程写出"""
+
+    def __init__(self, redactor: Redactor):
+        super().__init__()
+        self.redactor = redactor
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.msg = self.redactor.redact(record.getMessage())
+        record.args = None
+        fields = getattr(record, "fields", None)
+        if fields:
+            record.fields = self.redactor.redact_fields(fields)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """按事件名采样高频日志，rates 为 {事件: 保留比例}，未列出的事件全部保留"""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.rates = dict(rates or {})
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(getattr(record, "event", None))
+        return rate is None or random.random() < rate
+
+
+class JSONFormatter(logging.Formatter):
+    """每条日志一行JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        event = getattr(record, "event", None)
+        if event:
+            entry["event"] = event
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update({key: value for key, value in fields.items() if key not in entry})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """控制台格式：时间: [关联ID] 消息"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        timestamp = datetime.datetime.fromtimestamp(record.created)
+        request_id = getattr(record, "request_id", None)
+        prefix = f"[{request_id}] " if request_id else ""
+        text = f"{timestamp}: {prefix}{record.getMessage()}"
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        return text
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """写出时再取 sys.stdout，重定向标准输出(如基准测量期间)同样生效"""
+
+    def __init__(self):
+        super().__init__()
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class LoggingPipeline:
+    """QueueHandler + QueueListener：调用方只做级别判断、脱敏和入队，格式化和I/O在后台线程中进行"""
+
+    def __init__(
+        self,
+        level: int = logging.INFO,
+        fmt: str = "text",
+        log_file: Optional[str] = None,
+        sample_rates: Optional[Dict[str, float]] = None,
+        logger_name: str = LOGGER_NAME,
+    ):
+        self.settings = (level, fmt, log_file, tuple(sorted((sample_rates or {}).items())))
+        self.logger = logging.getLogger(logger_name)
+        self.redactor = Redactor()
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.queue_handler.addFilter(SamplingFilter(sample_rates))
+        self.queue_handler.addFilter(ContextFilter(self.redactor))
+
+        console = _StdoutHandler()
+        console.setFormatter(JSONFormatter() if fmt == "json" else TextFormatter())
+        handlers = [console]
+        if log_file:
+            # 文件始终为JSON行，便于检索
+            file_handler = logging.FileHandler(log_file, encoding="utf-8")
+            file_handler.setFormatter(JSONFormatter())
+            handlers.append(file_handler)
+        self.handlers = handlers
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+
+    def start(self) -> None:
+        self.logger.setLevel(self.settings[0])
+        self.logger.propagate = False
+        self.logger.addHandler(self.queue_handler)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """移除队列处理器并写完剩余日志"""
+        self.logger.removeHandler(self.queue_handler)
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for handler in self.handlers:
+            handler.close()
+
+
+_pipeline: Optional[LoggingPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def parse_level(level) -> int:
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    return value if isinstance(value, int) else logging.INFO
+
+
+def configure_logging(
+    level="INFO",
+    fmt: str = "text",
+    log_file: Optional[str] = None,
+    sample_rates: Optional[Dict[str, float]] = None,
+    secrets: Iterable[Optional[str]] = (),
+) -> LoggingPipeline:
+    """配置进程级日志管道，设置未变化时沿用当前管道，只登记新的密钥"""
+    global _pipeline
+    level = parse_level(level)
+    settings = (level, fmt, log_file, tuple(sorted((sample_rates or {}).items())))
+    with _pipeline_lock:
+        if _pipeline is None or _pipeline.settings != settings:
+            previous = _pipeline
+            _pipeline = LoggingPipeline(level, fmt, log_file, sample_rates)
+            if previous is not None:
+                _pipeline.redactor._secrets.update(previous.redactor._secrets)
+                previous.stop()
+            _pipeline.start()
+        for secret in secrets:
+            _pipeline.redactor.add_secret(secret)
+        return _pipeline
+
+
+def add_secret(value: Optional[str]) -> None:
+    """登记需要在日志中隐藏的值(如新获取的令牌)"""
+    if _pipeline is not None:
+        _pipeline.redactor.add_secret(value)
+
+
+def shutdown_logging() -> None:
+    global _pipeline
+    with _pipeline_lock:
+        pipeline, _pipeline = _pipeline, None
+    if pipeline is not None:
+        pipeline.stop()
+
+
+atexit.register(shutdown_logging)
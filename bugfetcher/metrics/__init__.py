@@ -0,0 +1 @@
+from .metrics import Metrics, NullMetrics, endpoint_label
@@ -0,0 +1,202 @@
+import re
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_label(path: str) -> str:
+    """把路径中的数字ID替换为 {id}，避免标签基数随产品/Bug数增长"""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """进程内指标注册表：计数器、仪表和直方图，按 Prometheus 文本格式导出
+
+    指标按首次使用自动注册；仪表也可以注册回调，在导出时取值。
+    """
+
+    enabled = True
+
+    def __init__(self, prefix: str = "bugfetcher", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauge_callbacks: Dict[str, Callable[[], Dict[LabelKey, float]]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def gauge_callback(self, name: str, callback: Callable[[], Dict[Tuple, float]]) -> None:
+        """注册导出时计算的仪表，callback 返回 {标签元组: 值}，无标签时键为 ()"""
+        self._gauge_callbacks[name] = callback
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def _gauge_values(self) -> Dict[str, Dict[LabelKey, float]]:
+        with self._lock:
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+        for name, callback in self._gauge_callbacks.items():
+            try:
+                values = callback()
+            except Exception:
+                continue
+            gauges[name] = {tuple(sorted(key)): value for key, value in values.items()}
+        return gauges
+
+    def render(self) -> str:
+        """Prometheus 文本格式(0.0.4)"""
+        lines: List[str] = []
+
+        def header(name: str, kind: str) -> str:
+            full_name = f"{self.prefix}_{name}"
+            if name in self._help:
+                lines.append(f"# HELP {full_name} {self._help[name]}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            return full_name
+
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {key: (list(h.counts), h.sum, h.count) for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+        for name, series in sorted(counters.items()):
+            full_name = header(name, "counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{full_name}{_format_labels(key)} {value:g}")
+        for name, series in sorted(self._gauge_values().items()):
+            full_name = header(name, "gauge")
+            for key, value in sorted(series.items()):
+                lines.append(f"{full_name}{_format_labels(key)} {value:g}")
+        for name, series in sorted(histograms.items()):
+            full_name = header(name, "histogram")
+            for key, (counts, total, count) in sorted(series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{full_name}_bucket{_format_labels(key, [('le', f'{bound:g}')])} {cumulative}")
+                lines.append(f"{full_name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+                lines.append(f"{full_name}_sum{_format_labels(key)} {total:g}")
+                lines.append(f"{full_name}_count{_format_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict:
+        """汇总视图：计数器按名称求和，直方图给出次数、平均值和近似 p50/p99"""
+        with self._lock:
+            counters = {name: sum(series.values()) for name, series in self._counters.items()}
+            merged: Dict[str, _Histogram] = {}
+            for name, series in self._histograms.items():
+                total = merged[name] = _Histogram(self.buckets)
+                for histogram in series.values():
+                    total.counts = [a + b for a, b in zip(total.counts, histogram.counts)]
+                    total.sum += histogram.sum
+                    total.count += histogram.count
+        gauges = {
+            name: max(series.values()) if series else 0
+            for name, series in self._gauge_values().items()
+        }
+        timings = {
+            name: {
+                "count": histogram.count,
+                "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                "p50": self._quantile(histogram, 0.5),
+                "p99": self._quantile(histogram, 0.99),
+            }
+            for name, histogram in merged.items()
+        }
+        return {"counters": counters, "gauges": gauges, "timings": timings}
+
+    def _quantile(self, histogram: _Histogram, q: float) -> Optional[float]:
+        """按桶上界估算分位数，落在最后一个桶之外时返回 None(表示 > 最大桶)"""
+        if not histogram.count:
+            return None
+        target = q * histogram.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, histogram.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return None
+
+
+class NullMetrics:
+    """禁用指标时使用，所有记录调用立即返回"""
+
+    enabled = False
+
+    def describe(self, name: str, help_text: str) -> None:
+        pass
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        pass
+
+    def set(self, name: str, value: float, **labels) -> None:
+        pass
+
+    def gauge_callback(self, name: str, callback: Callable[[], Dict[Tuple, float]]) -> None:
+        pass
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        pass
+
+    def render(self) -> str:
+        return ""
+
+    def summary(self) -> Dict:
+        return {"counters": {}, "gauges": {}, "timings": {}}
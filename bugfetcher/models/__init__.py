@@ -1 +1,2 @@
-from .models import ConfigModel, ProductSelection, FeishuMessage
+from .models import ConfigModel, ProductSelection, FeishuMessage, model_to_dict
+from .bug import Bug, as_dict, json_default, parse_bugs
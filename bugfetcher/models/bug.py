@@ -0,0 +1,175 @@
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# 禅道字段名 -> Bug 属性名，未列出的字段在解析时丢弃(可通过 extra_fields 保留)
+FIELD_ATTRS = {
+    "id": "id",
+    "product": "product",
+    "module": "module",
+    "title": "title",
+    "status": "status",
+    "severity": "severity",
+    "pri": "pri",
+    "type": "type",
+    "resolution": "resolution",
+    "openedBy": "opened_by",
+    "openedDate": "opened_date",
+    "lastEditedDate": "last_edited_date",
+    "resolvedDate": "resolved_date",
+}
+# 直接取值的字段，用户字段(openedBy/assignedTo)单独解析
+_SCALAR_FIELDS = tuple((field, attr) for field, attr in FIELD_ATTRS.items() if field != "openedBy")
+# 取值重复度高的字段，解析时 intern，10万个Bug共享同一批字符串对象
+_INTERNED = frozenset({"status", "type", "resolution"})
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _user(value: Any) -> Tuple[str, str]:
+    """禅道的用户字段可能是 {"account", "realname"} 或账号字符串"""
+    if isinstance(value, dict):
+        return _intern(value.get("account") or ""), _intern(value.get("realname") or "")
+    return _intern(str(value)) if value else "", ""
+
+
+class Bug:
+    """精简的Bug记录
+
+    只保存用到的字段，重复字符串被 intern；提供 get/[]/in 的只读字典接口(键为禅道字段名)，
+    筛选、快照、指纹等按字典处理Bug的代码无需区分。to_dict() 转回禅道格式用于API、存储和通知。
+    """
+
+    __slots__ = (
+        "id",
+        "product",
+        "module",
+        "title",
+        "status",
+        "severity",
+        "pri",
+        "type",
+        "resolution",
+        "assigned_account",
+        "assigned_realname",
+        "opened_by",
+        "opened_date",
+        "last_edited_date",
+        "resolved_date",
+        "extra",
+    )
+
+    def __init__(
+        self,
+        id: Any,
+        title: Optional[str] = None,
+        status: Optional[str] = None,
+        severity: Optional[int] = None,
+        pri: Optional[int] = None,
+        assigned_account: str = "",
+        assigned_realname: str = "",
+        opened_date: Optional[str] = None,
+        last_edited_date: Optional[str] = None,
+        resolved_date: Optional[str] = None,
+        product: Any = None,
+        module: Any = None,
+        type: Optional[str] = None,
+        resolution: Optional[str] = None,
+        opened_by: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        self.id = id
+        self.title = title
+        self.status = status
+        self.severity = severity
+        self.pri = pri
+        self.assigned_account = assigned_account
+        self.assigned_realname = assigned_realname
+        self.opened_date = opened_date
+        self.last_edited_date = last_edited_date
+        self.resolved_date = resolved_date
+        self.product = product
+        self.module = module
+        self.type = type
+        self.resolution = resolution
+        self.opened_by = opened_by
+        self.extra = extra
+
+    @classmethod
+    def from_zentao(cls, raw: Dict, extra_fields: Sequence[str] = ()) -> "Bug":
+        """从禅道返回的Bug字典解析，只保留 FIELD_ATTRS 和 extra_fields 中的字段"""
+        if isinstance(raw, Bug):
+            return raw
+        bug = cls.__new__(cls)
+        for field, attr in _SCALAR_FIELDS:
+            value = raw.get(field)
+            setattr(bug, attr, _intern(value) if attr in _INTERNED else value)
+        bug.opened_by = _user(raw.get("openedBy"))[0] or None
+        bug.assigned_account, bug.assigned_realname = _user(raw.get("assignedTo"))
+        extra = {field: raw[field] for field in extra_fields if field in raw}
+        bug.extra = extra or None
+        return bug
+
+    def _value(self, key: str) -> Any:
+        attr = FIELD_ATTRS.get(key)
+        if attr is not None:
+            return getattr(self, attr)
+        if key == "assignedTo":
+            if not (self.assigned_account or self.assigned_realname):
+                return None
+            return {"account": self.assigned_account, "realname": self.assigned_realname}
+        if self.extra:
+            return self.extra.get(key)
+        return None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._value(key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._value(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._value(key) is not None
+
+    def keys(self) -> Iterator[str]:
+        for key in (*FIELD_ATTRS, "assignedTo", *(self.extra or ())):
+            if self._value(key) is not None:
+                yield key
+
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """禅道格式的字典，fields 指定时只包含这些字段"""
+        return {key: self._value(key) for key in (fields or self.keys()) if key in self}
+
+    def _astuple(self) -> Tuple:
+        return tuple(getattr(self, attr) for attr in self.__slots__)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Bug):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Bug(id={self.id!r}, title={self.title!r}, status={self.status!r}, assignee={self.assigned_account!r})"
+
+
+def parse_bugs(items: Iterable[Dict], extra_fields: Sequence[str] = ()) -> List[Bug]:
+    return [Bug.from_zentao(item, extra_fields) for item in items]
+
+
+def as_dict(bug: Any) -> Dict:
+    """Bug 或禅道字典统一转为字典"""
+    return bug.to_dict() if isinstance(bug, Bug) else bug
+
+
+def json_default(obj: Any) -> Any:
+    """json.dumps / orjson 的 default 钩子：Bug 序列化为禅道格式字典"""
+    if isinstance(obj, Bug):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -1,6 +1,17 @@
 from pydantic import BaseModel
 from typing import Optional
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union, Any
+
+try:
+    from pydantic import field_validator
+except ImportError:  # pydantic 1.x
+    from pydantic import validator as field_validator
+
+
+def model_to_dict(model: BaseModel, **kwargs) -> Dict[str, Any]:
+    """pydantic 2.x 用 model_dump，1.x 退回到 dict，参数相同(如 exclude_unset)"""
+    dump = getattr(model, "model_dump", None) or model.dict
+    return dump(**kwargs)
 
 class ConfigModel(BaseModel):
     zentao_url: Optional[str] = None
@@ -10,7 +21,69 @@ class ConfigModel(BaseModel):
     fetch_interval: Optional[int] = None
     zentao_token: Optional[str] = None
     selected_product: Optional[str] = None
-    selected_product_id: Optional[str] = None
+    selected_product_id: Optional[Union[str, int]] = None
+    product_ids: Optional[List[Union[str, int]]] = None
+    product_poll_concurrency: Optional[int] = None
+    team_subscribers: Optional[List[Union[str, Dict[str, str]]]] = None
+    feishu_send_concurrency: Optional[int] = None
+    feishu_spool_dir: Optional[str] = None
+    feishu_workers: Optional[int] = None
+    feishu_rate_per_minute: Optional[float] = None
+    feishu_rate_burst: Optional[int] = None
+    feishu_max_attempts: Optional[int] = None
+    feishu_batch_size: Optional[int] = None
+    notify_only_changes: Optional[bool] = None
+    sync_timeout: Optional[float] = None
+    token_ttl: Optional[float] = None
+    token_refresh_margin: Optional[float] = None
+    max_auth_retries: Optional[int] = None
+    http_timeout: Optional[float] = None
+    http_connect_timeout: Optional[float] = None
+    http_pool_limit: Optional[int] = None
+    http_pool_limit_per_host: Optional[int] = None
+    http_keepalive_timeout: Optional[float] = None
+    http_dns_cache_ttl: Optional[int] = None
+    feishu_timeout: Optional[float] = None
+    bug_page_size: Optional[int] = None
+    bug_fetch_concurrency: Optional[int] = None
+    incremental_sync: Optional[bool] = None
+    delta_page_size: Optional[int] = None
+    full_sync_interval: Optional[int] = None
+    bug_store_enabled: Optional[bool] = None
+    bug_store_path: Optional[str] = None
+    bug_fields: Optional[List[str]] = None
+    response_cache_enabled: Optional[bool] = None
+    response_cache_ttls: Optional[Dict[str, float]] = None
+    response_cache_size: Optional[int] = None
+    response_cache_stale: Optional[float] = None
+    response_cache_dir: Optional[str] = None
+    api_cache_ttls: Optional[Dict[str, float]] = None
+    api_cache_size: Optional[int] = None
+    scheduler_enabled: Optional[bool] = None
+    schedule_jitter: Optional[float] = None
+    schedule_jobs: Optional[List[Dict[str, Any]]] = None
+    stream_buffer: Optional[int] = None
+    adaptive_polling: Optional[bool] = None
+    poll_min_interval: Optional[float] = None
+    poll_max_interval: Optional[float] = None
+    poll_bounds: Optional[Dict[str, Dict[str, float]]] = None
+    stream_heartbeat: Optional[float] = None
+    stream_json: Optional[bool] = None
+    stream_chunk_size: Optional[int] = None
+    config_watch_interval: Optional[float] = None
+    log_level: Optional[str] = None
+    log_format: Optional[str] = None
+    log_file: Optional[str] = None
+    log_sample_rates: Optional[Dict[str, float]] = None
+    metrics_enabled: Optional[bool] = None
+    metrics_summary_interval: Optional[float] = None
+    report_aging_days: Optional[List[float]] = None
+    report_trend_weeks: Optional[int] = None
+
+    @field_validator("product_ids")
+    def _product_ids_as_str(cls, value):
+        # config.json 中常写成数字 [1, 2]，统一为字符串
+        return [str(product_id) for product_id in value] if value is not None else value
 
 class ProductSelection(BaseModel):
     product_id: str
@@ -21,4 +94,8 @@ class FeishuMessage(BaseModel):
     bugs: List[Dict]
     realname: str
     suggestion: Optional[str] = None
+    # 增量通知：bugs 只包含新增和变更的Bug，resolved 为不再指派给该用户的Bug ID
+    added: Optional[List[Union[int, str]]] = None
+    changed: Optional[List[Union[int, str]]] = None
+    resolved: Optional[List[Union[int, str]]] = None
 
@@ -0,0 +1,217 @@
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from ..models.bug import Bug, as_dict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bugs (
+    product_id TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    title TEXT,
+    status TEXT,
+    severity INTEGER,
+    pri INTEGER,
+    assigned_account TEXT,
+    assigned_realname TEXT,
+    opened_date TEXT,
+    last_edited_date TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (product_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_bugs_product_status ON bugs (product_id, status);
+CREATE INDEX IF NOT EXISTS idx_bugs_assigned_account ON bugs (assigned_account, status);
+CREATE INDEX IF NOT EXISTS idx_bugs_assigned_realname ON bugs (assigned_realname, status);
+CREATE INDEX IF NOT EXISTS idx_bugs_severity ON bugs (product_id, severity);
+CREATE INDEX IF NOT EXISTS idx_bugs_opened_date ON bugs (product_id, opened_date);
+CREATE INDEX IF NOT EXISTS idx_bugs_last_edited_date ON bugs (product_id, last_edited_date);
+CREATE TABLE IF NOT EXISTS sync_state (
+    product_id TEXT PRIMARY KEY,
+    watermark TEXT NOT NULL DEFAULT '',
+    last_full_sync REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS notify_fingerprints (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO bugs (
+    product_id, id, title, status, severity, pri,
+    assigned_account, assigned_realname, opened_date, last_edited_date, data
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (product_id, id) DO UPDATE SET
+    title = excluded.title,
+    status = excluded.status,
+    severity = excluded.severity,
+    pri = excluded.pri,
+    assigned_account = excluded.assigned_account,
+    assigned_realname = excluded.assigned_realname,
+    opened_date = excluded.opened_date,
+    last_edited_date = excluded.last_edited_date,
+    data = excluded.data
+"""
+
+
+def assignee(bug: Dict) -> Tuple[str, str]:
+    """返回Bug指派人的 (account, realname)，兼容字符串形式的 assignedTo"""
+    if isinstance(bug, Bug):
+        return bug.assigned_account, bug.assigned_realname
+    assigned = bug.get("assignedTo") or {}
+    if isinstance(assigned, dict):
+        return assigned.get("account", "") or "", assigned.get("realname", "") or ""
+    return str(assigned), ""
+
+
+def _row(product_id: str, bug: Dict) -> Tuple:
+    account, realname = assignee(bug)
+    return (
+        product_id,
+        int(bug["id"]),
+        bug.get("title"),
+        bug.get("status"),
+        bug.get("severity"),
+        bug.get("pri"),
+        account,
+        realname,
+        bug.get("openedDate"),
+        bug.get("lastEditedDate"),
+        json.dumps(as_dict(bug), ensure_ascii=False),
+    )
+
+
+class BugStore:
+    """基于SQLite(WAL)的本地Bug存储，供禅道不可用时查询"""
+
+    def __init__(self, path: str = "bugs.db", batch_size: int = 500):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def upsert_bugs(self, product_id: str, bugs: Iterable[Dict]) -> int:
+        """在单个事务内分批写入Bug，返回写入条数"""
+        product_id = str(product_id)
+        count = 0
+        with self._lock, self._conn:
+            batch: List[Tuple] = []
+            for bug in bugs:
+                batch.append(_row(product_id, bug))
+                if len(batch) >= self.batch_size:
+                    self._conn.executemany(UPSERT_SQL, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self._conn.executemany(UPSERT_SQL, batch)
+                count += len(batch)
+        return count
+
+    def delete_bugs(self, product_id: str, bug_ids: Iterable[Any]) -> None:
+        rows = [(str(product_id), int(bug_id)) for bug_id in bug_ids]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM bugs WHERE product_id = ? AND id = ?", rows)
+
+    def query_bugs(
+        self,
+        product_id: Optional[str] = None,
+        assigned_account: Optional[str] = None,
+        assigned_realname: Optional[str] = None,
+        status: Optional[Union[str, Sequence[str]]] = None,
+        severity: Optional[Union[int, Sequence[int]]] = None,
+        opened_since: Optional[str] = None,
+        opened_until: Optional[str] = None,
+        edited_since: Optional[str] = None,
+        edited_until: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """按条件查询Bug，所有条件均命中索引列"""
+        clauses: List[str] = []
+        params: List[Any] = []
+
+        def add_in(column: str, value: Union[Any, Sequence[Any]]) -> None:
+            values = [value] if isinstance(value, (str, int)) else list(value)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+
+        if product_id is not None:
+            add_in("product_id", str(product_id))
+        if assigned_account:
+            add_in("assigned_account", assigned_account)
+        if assigned_realname:
+            add_in("assigned_realname", assigned_realname)
+        if status:
+            add_in("status", status)
+        if severity:
+            add_in("severity", severity)
+        for column, op, value in (
+            ("opened_date", ">=", opened_since),
+            ("opened_date", "<=", opened_until),
+            ("last_edited_date", ">=", edited_since),
+            ("last_edited_date", "<=", edited_until),
+        ):
+            if value:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+
+        sql = "SELECT data FROM bugs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY product_id, id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count_bugs(self, product_id: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM bugs WHERE product_id = ?", (str(product_id),)
+            ).fetchone()
+        return row[0]
+
+    def load_sync_state(self, product_id: str) -> Optional[Tuple[str, float]]:
+        """读取产品的 (watermark, last_full_sync)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT watermark, last_full_sync FROM sync_state WHERE product_id = ?",
+                (str(product_id),),
+            ).fetchone()
+
+    def save_sync_state(self, product_id: str, watermark: str, last_full_sync: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO sync_state (product_id, watermark, last_full_sync) VALUES (?, ?, ?) "
+                "ON CONFLICT (product_id) DO UPDATE SET "
+                "watermark = excluded.watermark, last_full_sync = excluded.last_full_sync",
+                (str(product_id), watermark, last_full_sync),
+            )
+
+    def load_fingerprint(self, key: str) -> Optional[Dict[str, str]]:
+        """读取上次通知的Bug指纹"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint FROM notify_fingerprints WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_fingerprint(self, key: str, fingerprint: Dict[str, str]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO notify_fingerprints (key, fingerprint) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET fingerprint = excluded.fingerprint",
+                (key, json.dumps(fingerprint)),
+            )
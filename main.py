@@ -1,21 +1,25 @@
 import sys
-import asyncio
-from bugfetcher.cli import run_cli
-from bugfetcher.gui import BugFetcherGUI
-from bugfetcher.api import app
-import tkinter as tk
-import uvicorn
+
 
 def main():
+    # 各模式按需导入，CLI 模式不加载 tkinter、FastAPI 和 uvicorn
     if len(sys.argv) > 1:
         mode = sys.argv[1]
         if mode == "cli":
+            import asyncio
+            from bugfetcher.cli import run_cli
+
             asyncio.run(run_cli(sys.argv[2:]))
         elif mode == "gui":
+            import tkinter as tk
+            from bugfetcher.gui import BugFetcherGUI
+
             root = tk.Tk()
             app = BugFetcherGUI(root)
             root.mainloop()
         elif mode == "api":
+            import uvicorn
+
             uvicorn.run("bugfetcher.api:app", host="0.0.0.0", port=55000)
         else:
             print("Usage: python main.py [cli|gui|api]")
@@ -0,0 +1,218 @@
+import os
+import json
+import random
+import datetime
+import unittest
+from aiohttp.test_utils import TestServer
+from benchmarks.zentao_stub import StubConfig, ZenTaoStub
+from bugfetcher.analytics import BugColumns, build_report, report_period, report_suggestion, to_timestamp
+from bugfetcher.analytics.analytics import _NumpyOps, _PythonOps, np
+from bugfetcher.core import BugFetcherCore
+from bugfetcher.models import Bug
+
+BACKENDS = [_PythonOps()] + ([_NumpyOps()] if np is not None else [])
+
+
+def make_bug(bug_id, opened, resolved=None, status=None, account="alice", module=1, severity=3):
+    return {
+        "id": bug_id,
+        "status": status or ("resolved" if resolved else "active"),
+        "severity": severity,
+        "module": module,
+        "assignedTo": {"account": account, "realname": account.title()},
+        "openedDate": opened,
+        "resolvedDate": resolved or "0000-00-00 00:00:00",
+    }
+
+
+class TestBuildReport(unittest.TestCase):
+    def setUp(self):
+        bugs = [
+            # 区间前创建，区间内解决，耗时 10 天
+            make_bug(1, "2024-04-25 10:00:00", "2024-05-05 10:00:00"),
+            # 区间内创建，2 天后解决
+            make_bug(2, "2024-05-10 08:00:00", "2024-05-12 08:00:00", account="bob", severity=1),
+            # 区间内创建，仍未解决，到期末 21 天
+            make_bug(3, "2024-05-10 00:00:00", account="bob", severity=1, module=2),
+            # 区间前创建，到期末已 151 天
+            make_bug(4, "2024-01-01 00:00:00", account="carol"),
+            # 区间内创建，区间后才解决：期末仍算未解决
+            make_bug(5, "2024-05-30 00:00:00", "2024-06-03 00:00:00", account="bob"),
+            # 区间后创建：不计入
+            make_bug(6, "2024-06-02 00:00:00"),
+            # 直接关闭、没有解决日期：不算未解决
+            make_bug(7, "2024-03-01 00:00:00", status="closed"),
+        ]
+        self.columns = BugColumns().extend("1", bugs[:4]).extend("2", bugs[4:])
+        self.since, self.until = report_period("2024-05", now=datetime.datetime(2024, 7, 1))
+
+    def report(self, backend, **kwargs):
+        return build_report(self.columns, self.since, self.until, backend=backend, trend_weeks=2, **kwargs)
+
+    def test_summary(self):
+        for backend in BACKENDS:
+            summary = self.report(backend)["summary"]
+            self.assertEqual(summary["total"], 6, backend.name)
+            self.assertEqual(summary["open"], 3, backend.name)
+            self.assertEqual(summary["opened"], 3, backend.name)
+            self.assertEqual(summary["resolved"], 2, backend.name)
+            self.assertEqual(summary["resolution_ratio"], 0.667, backend.name)
+            self.assertEqual(summary["mttr_days"], 6.0, backend.name)
+            self.assertEqual(summary["resolve_rate"], round(2 / 31, 3), backend.name)
+            self.assertEqual(summary["aging"], {"0-7d": 1, "7-30d": 1, "30-90d": 0, "90d+": 1}, backend.name)
+
+    def test_groups(self):
+        for backend in BACKENDS:
+            report = self.report(backend)
+            assignees = {row["key"]: row for row in report["by_assignee"]}
+            self.assertEqual([row["key"] for row in report["by_assignee"]], ["bob", "carol", "alice"])
+            self.assertEqual((assignees["bob"]["open"], assignees["bob"]["opened"]), (2, 3))
+            self.assertEqual(assignees["bob"]["mttr_days"], 2.0)
+            self.assertEqual({row["key"]: row["total"] for row in report["by_product"]}, {"1": 4, "2": 2})
+            self.assertEqual({row["key"]: row["open"] for row in report["by_severity"]}, {1: 1, 3: 2})
+            self.assertEqual({row["key"]: row["total"] for row in report["by_module"]}, {1: 5, 2: 1})
+            self.assertEqual(len(self.report(backend, top=1)["by_assignee"]), 1)
+
+    def test_trend_and_week_over_week(self):
+        for backend in BACKENDS:
+            report = self.report(backend)
+            self.assertEqual(
+                report["trend"],
+                [
+                    {"week_start": "2024-05-18", "opened": 0, "resolved": 0},
+                    {"week_start": "2024-05-25", "opened": 1, "resolved": 0},
+                ],
+            )
+            self.assertEqual(report["week_over_week"]["opened"], {"current": 1, "previous": 0, "change": None})
+
+    def test_backends_agree(self):
+        if np is None:
+            self.skipTest("numpy not installed")
+        rng = random.Random(7)
+        base = datetime.datetime(2024, 1, 1)
+        bugs = []
+        for bug_id in range(3000):
+            opened = base + datetime.timedelta(minutes=rng.randrange(200 * 24 * 60))
+            resolved = opened + datetime.timedelta(hours=rng.randrange(1000)) if rng.random() < 0.6 else None
+            bugs.append(make_bug(
+                bug_id, str(opened), str(resolved) if resolved else None,
+                account=f"user{rng.randrange(20)}", module=rng.randrange(30), severity=rng.randrange(1, 5),
+            ))
+        columns = BugColumns().extend("1", bugs)
+        since, until = report_period("2024-05", now=datetime.datetime(2025, 1, 1))
+        reports = [build_report(columns, since, until, backend=backend) for backend in BACKENDS]
+        for report in reports:
+            report.pop("backend")
+        self.assertEqual(reports[0], reports[1])
+
+    def test_bug_records_and_dicts_give_same_columns(self):
+        bugs = [make_bug(1, "2024-05-01 10:00:00", "2024-05-02 10:00:00"), make_bug(2, "2024-05-03 00:00:00")]
+        from_dicts = BugColumns().extend("1", bugs)
+        from_records = BugColumns().extend("1", [Bug.from_zentao(bug) for bug in bugs])
+        self.assertEqual(from_dicts.labels, from_records.labels)
+        self.assertEqual(list(from_dicts.resolved)[0], list(from_records.resolved)[0])
+        self.assertEqual(list(from_dicts.active), [0, 1])
+
+    def test_incremental_update_matches_rebuild(self):
+        first = {i: make_bug(i, "2024-05-0%d 10:00:00" % i, account=f"user{i}") for i in range(1, 6)}
+        second = {9: make_bug(9, "2024-05-09 00:00:00")}
+        columns = BugColumns()
+        self.assertEqual(columns.update("1", first), 5)
+        columns.update("2", second)
+        self.assertEqual(columns.update("1", dict(first)), 0)
+
+        first = dict(first)
+        del first[2]  # 删除的行由最后一行填补
+        first[4] = make_bug(4, "2024-05-04 10:00:00", "2024-05-06 10:00:00", account="user4")
+        first[6] = make_bug(6, "2024-05-06 00:00:00", account="user6")
+        self.assertEqual(columns.update("1", first), 3)
+        del second[9]
+        columns.update("2", second)
+
+        rebuilt = BugColumns().extend("1", first.values())
+        for backend in BACKENDS:
+            updated = build_report(columns, self.since, self.until, backend=backend)
+            expected = build_report(rebuilt, self.since, self.until, backend=backend)
+            self.assertEqual(len(columns), 5)
+            self.assertEqual(updated, expected)
+
+    def test_suggestion(self):
+        text = report_suggestion(self.report(BACKENDS[0]))
+        self.assertIn("新增 3 个Bug，解决 2 个(解决率 66.7%)", text)
+        self.assertIn("未解决 3 个，其中超过 90 天 1 个", text)
+        self.assertIn("bob(2)", text)
+        self.assertIn("严重程度1未解决 1 个", text)
+
+
+class TestReportPeriod(unittest.TestCase):
+    def test_periods(self):
+        now = datetime.datetime(2024, 5, 20, 12, 0, 0)
+        self.assertEqual(report_period("2024-02", now=now), (to_timestamp("2024-02-01"), to_timestamp("2024-03-01")))
+        # 当月截止到现在
+        self.assertEqual(report_period("2024-05", now=now), (to_timestamp("2024-05-01"), to_timestamp(now)))
+        self.assertEqual(report_period(now=now), (to_timestamp("2024-05-01"), to_timestamp(now)))
+        self.assertEqual(
+            report_period(since="2024-05-01", until="2024-05-08", now=now),
+            (to_timestamp("2024-05-01"), to_timestamp("2024-05-08")),
+        )
+
+    def test_invalid_periods(self):
+        for kwargs in ({"month": "2024/05"}, {"since": "yesterday"}, {"since": "2024-05-08", "until": "2024-05-01"}):
+            with self.assertRaises(ValueError):
+                report_period(**kwargs)
+
+    def test_zentao_dates(self):
+        self.assertEqual(to_timestamp("2024-01-01 00:00:00"), 1704067200.0)
+        self.assertEqual(to_timestamp("1970-01-02"), 86400.0)
+        for value in (None, "", "0000-00-00 00:00:00", "N/A"):
+            self.assertNotEqual(to_timestamp(value), to_timestamp(value))  # NaN
+
+
+class TestCoreReport(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.stub = ZenTaoStub(StubConfig(bugs=40, accounts=["admin", "alice"]))
+        self.server = TestServer(self.stub.make_app())
+        await self.server.start_server()
+        base_url = str(self.server.make_url("")).rstrip("/")
+        self.config_path = "test_report_config.json"
+        with open(self.config_path, "w") as f:
+            json.dump({
+                "zentao_url": base_url,
+                "zentao_username": "admin",
+                "zentao_password": "secret",
+                "feishu_webhook_url": f"{base_url}/feishu/webhook",
+                "selected_product_id": 1,
+                "bug_store_enabled": False,
+            }, f)
+        self.core = BugFetcherCore(self.config_path)
+
+    async def asyncTearDown(self):
+        await self.core.close()
+        await self.server.close()
+        for path in (self.config_path, self.core.config_manager.state_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def test_report_from_synced_product(self):
+        report = await self.core.bug_report(month="2024-01")
+        self.assertEqual(report["status"], "success")
+        self.assertEqual(report["summary"]["total"], 40)
+        self.assertEqual(report["summary"]["open"], 40)
+        self.assertEqual({row["key"]: row["open"] for row in report["by_assignee"]}, {"admin": 20, "alice": 20})
+        self.assertEqual(report["failed"], [])
+
+        # 快照未变化时复用列
+        columns = self.core._report_columns[1]
+        await self.core.bug_report(month="2024-01")
+        self.assertIs(self.core._report_columns[1], columns)
+
+    async def test_invalid_period(self):
+        report = await self.core.bug_report(month="May")
+        self.assertEqual(report["status"], "error")
+
+    async def test_send_report_fills_suggestion(self):
+        result = await self.core.send_report(month="2024-01")
+        self.assertEqual(result["notification"]["status"], "success")
+        content = json.loads(self.stub.feishu_messages[0]["content"]["text"])
+        self.assertEqual(content["total"], 40)
+        self.assertIn("未解决 40 个", content["suggestion"])
@@ -0,0 +1,68 @@
+import unittest
+import asyncio
+from bugfetcher.api.cache import EndpointCache, compute_etag
+
+
+class TestEndpointCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.cache = EndpointCache()
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"status": "success", "bugs": [{"id": self.calls}]}
+
+    async def test_concurrent_requests_share_one_fetch(self):
+        results = await asyncio.gather(*(self.cache.get_or_fetch("bugs", 5, self.fetch) for _ in range(100)))
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual({result.etag for result, _ in results}, {compute_etag({"status": "success", "bugs": [{"id": 1}]})})
+        self.assertEqual(self.cache.stats["coalesced"], 99)
+
+    async def test_result_served_until_ttl_expires(self):
+        await self.cache.get_or_fetch("bugs", 5, self.fetch)
+        _, hit = await self.cache.get_or_fetch("bugs", 5, self.fetch)
+        self.assertTrue(hit)
+        self.assertEqual(self.calls, 1)
+
+        self.cache._results["bugs"].expires_at = 0
+        _, hit = await self.cache.get_or_fetch("bugs", 5, self.fetch)
+        self.assertFalse(hit)
+        self.assertEqual(self.calls, 2)
+
+    async def test_expired_entries_dropped_and_size_bounded(self):
+        cache = EndpointCache(max_entries=3)
+        await cache.get_or_fetch("reports?top=1", 5, self.fetch)
+        cache._results["reports?top=1"].expires_at = 0
+        await cache.get_or_fetch("reports?top=2", 5, self.fetch)
+        self.assertEqual(list(cache._results), ["reports?top=2"])
+
+        for top in range(3, 6):
+            await cache.get_or_fetch(f"reports?top={top}", 5, self.fetch)
+        await cache.get_or_fetch("reports?top=3", 5, self.fetch)  # 命中后变为最近使用
+        await cache.get_or_fetch("reports?top=6", 5, self.fetch)
+        self.assertEqual(list(cache._results), ["reports?top=5", "reports?top=3", "reports?top=6"])
+        self.assertEqual(cache.stats["evictions"], 2)
+
+    async def test_errors_are_not_cached(self):
+        async def failing():
+            self.calls += 1
+            return {"status": "error", "message": "boom"}
+
+        await self.cache.get_or_fetch("bugs", 5, failing)
+        await self.cache.get_or_fetch("bugs", 5, failing)
+        self.assertEqual(self.calls, 2)
+
+    async def test_cancelled_caller_does_not_cancel_shared_fetch(self):
+        first = asyncio.create_task(self.cache.get_or_fetch("bugs", 5, self.fetch))
+        second = asyncio.create_task(self.cache.get_or_fetch("bugs", 5, self.fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        result, _ = await second
+        self.assertEqual(result.payload["bugs"], [{"id": 1}])
+
+
+if __name__ == "__main__":
+    unittest.main()
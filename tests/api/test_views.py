@@ -0,0 +1,52 @@
+import unittest
+from bugfetcher.api.views import InvalidCursor, decode_cursor, filter_bugs, paginate, parse_fields, project
+
+
+def bug(bug_id, **fields):
+    return {
+        "id": bug_id,
+        "title": f"Bug {bug_id}",
+        "status": "active",
+        "severity": 3,
+        "openedDate": f"2024-01-{bug_id:02d} 10:00:00",
+        **fields,
+    }
+
+
+class TestBugViews(unittest.TestCase):
+    def setUp(self):
+        self.bugs = [bug(i) for i in range(10, 0, -1)]
+
+    def test_cursor_pagination_walks_all_pages(self):
+        seen, cursor = [], None
+        while True:
+            page, cursor = paginate(self.bugs, cursor, limit=4)
+            seen.extend(item["id"] for item in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(range(1, 11)))
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("not a cursor!")
+
+    def test_filters(self):
+        self.bugs[0].update(status="resolved", severity=1, title="Crash on login")
+        self.bugs[1]["assignedTo"] = {"account": "alice"}
+
+        self.assertEqual([b["id"] for b in filter_bugs(self.bugs, status=["resolved"])], [10])
+        self.assertEqual([b["id"] for b in filter_bugs(self.bugs, severity=[1, 2])], [10])
+        self.assertEqual([b["id"] for b in filter_bugs(self.bugs, keyword="crash")], [10])
+        self.assertEqual([b["id"] for b in filter_bugs(self.bugs, assignee="alice")], [9])
+        self.assertEqual(
+            [b["id"] for b in filter_bugs(self.bugs, opened_since="2024-01-03", opened_until="2024-01-04 23:59:59")],
+            [4, 3],
+        )
+
+    def test_field_projection(self):
+        self.assertEqual(project([bug(1)], parse_fields("id, title,missing")), [{"id": 1, "title": "Bug 1"}])
+        self.assertIsNone(parse_fields(""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import json
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def imported_modules(code):
+    proc = subprocess.run(
+        [sys.executable, "-c", f"{code}; import sys, json; print(json.dumps(sorted(sys.modules)))"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+
+class TestStartupImports(unittest.TestCase):
+    def test_cli_path_skips_web_and_gui_stacks(self):
+        modules = imported_modules("import asyncio; from bugfetcher.cli import run_cli")
+        heavy_modules = ("fastapi", "uvicorn", "tkinter", "numpy", "bugfetcher.api", "bugfetcher.gui", "bugfetcher.analytics")
+        for heavy in heavy_modules:
+            self.assertNotIn(heavy, modules)
+
+    def test_package_attributes_load_lazily(self):
+        modules = imported_modules("import bugfetcher; bugfetcher.BugFetcherCore")
+        self.assertIn("bugfetcher.core", modules)
+        self.assertNotIn("bugfetcher.api", modules)
+
+    def test_api_import_has_no_side_effects(self):
+        proc = subprocess.run(
+            [sys.executable, "-c", "import bugfetcher.api"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # 导入时不应创建 BugFetcherCore(不读取配置、不输出日志)
+        self.assertEqual(proc.stdout, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import unittest
+import os
+import json
+import time
+import tempfile
+import warnings
+import threading
+from bugfetcher.config import ConfigManager, ConfigWatcher
+from bugfetcher.core import BugFetcherCore
+
+
+class TestConfigManager(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmpdir.name, "config.json")
+        self.write({"zentao_url": "http://zentao", "fetch_interval": 30, "zentao_token": "legacy"})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, data):
+        with open(self.config_path, "w") as f:
+            json.dump(data, f)
+
+    def read(self, path):
+        with open(path) as f:
+            return json.load(f)
+
+    def test_runtime_state_is_saved_separately(self):
+        manager = ConfigManager(self.config_path, debounce=0)
+        config = manager.load()
+        self.assertEqual(config["zentao_token"], "legacy")
+
+        manager.save({**config, "zentao_token": "fresh"})
+        self.assertEqual(self.read(self.config_path), {"zentao_url": "http://zentao", "fetch_interval": 30})
+        self.assertEqual(self.read(manager.state_path), {"zentao_token": "fresh"})
+
+        # 只有令牌变化时不重写 config.json
+        mtime = os.stat(self.config_path).st_mtime_ns
+        manager.save({**config, "zentao_token": "newer"})
+        self.assertEqual(os.stat(self.config_path).st_mtime_ns, mtime)
+        self.assertEqual(ConfigManager(self.config_path).load()["zentao_token"], "newer")
+
+    def test_saves_are_debounced(self):
+        manager = ConfigManager(self.config_path, debounce=0.05)
+        manager.load()
+        for interval in range(1, 6):
+            manager.save({"zentao_url": "http://zentao", "fetch_interval": interval})
+        self.assertEqual(self.read(self.config_path)["fetch_interval"], 30)
+        time.sleep(0.2)
+        self.assertEqual(self.read(self.config_path)["fetch_interval"], 5)
+        self.assertEqual(os.listdir(self.tmpdir.name), ["config.json"])
+
+    def test_flush_writes_pending_immediately(self):
+        manager = ConfigManager(self.config_path, debounce=60)
+        manager.load()
+        manager.save({"zentao_url": "http://other"})
+        manager.flush()
+        self.assertEqual(self.read(self.config_path), {"zentao_url": "http://other"})
+
+    def test_invalid_fields_are_dropped(self):
+        self.write({"zentao_url": "http://zentao", "fetch_interval": "soon", "bug_page_size": "100", "extra": 1})
+        config = ConfigManager(self.config_path).load()
+        self.assertNotIn("fetch_interval", config)
+        self.assertEqual(config["bug_page_size"], 100)
+        self.assertEqual(config["extra"], 1)
+
+    def test_load_avoids_deprecated_pydantic_api(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            config = ConfigManager(self.config_path).load()
+        self.assertEqual(config["fetch_interval"], 30)
+
+    def test_save_keeps_raw_values_of_unchanged_and_invalid_fields(self):
+        self.write({"zentao_url": "http://zentao", "fetch_interval": "soon", "product_ids": [1, 2]})
+        manager = ConfigManager(self.config_path, debounce=0)
+        config = manager.load()
+        self.assertEqual(config["product_ids"], ["1", "2"])
+
+        manager.save({**config, "selected_product_id": "3"})
+        self.assertEqual(self.read(self.config_path), {
+            "zentao_url": "http://zentao", "fetch_interval": "soon", "product_ids": [1, 2], "selected_product_id": "3",
+        })
+        manager.save({**config, "selected_product_id": "3", "fetch_interval": 60})
+        self.assertEqual(self.read(self.config_path)["fetch_interval"], 60)
+
+    def test_corrupt_file_loads_empty(self):
+        with open(self.config_path, "w") as f:
+            f.write("{")
+        self.assertEqual(ConfigManager(self.config_path).load(), {})
+
+    def test_watcher_ignores_own_writes_and_reports_external_changes(self):
+        manager = ConfigManager(self.config_path, debounce=0)
+        manager.load()
+        changes = []
+        changed = threading.Event()
+        watcher = ConfigWatcher(manager, lambda config: (changes.append(config), changed.set()), interval=0.01)
+
+        manager.save({"zentao_url": "http://zentao", "fetch_interval": 45})
+        self.assertFalse(watcher.check())
+
+        time.sleep(0.01)  # 保证修改时间不同
+        self.write({"zentao_url": "http://edited", "fetch_interval": 45})
+        watcher.start()
+        try:
+            self.assertTrue(changed.wait(2))
+        finally:
+            watcher.stop()
+        self.assertEqual(changes[0]["zentao_url"], "http://edited")
+
+    def test_external_edit_merges_with_pending_save(self):
+        manager = ConfigManager(self.config_path, debounce=60)
+        manager.load()
+        manager.save({"zentao_url": "http://zentao", "fetch_interval": 5, "selected_product_id": "3"})
+        time.sleep(0.01)
+        self.write({"zentao_url": "http://edited", "fetch_interval": 45})
+
+        static = manager.reload_static()
+        manager.flush()
+
+        expected = {"zentao_url": "http://edited", "fetch_interval": 5, "selected_product_id": "3"}
+        self.assertEqual(static, expected)
+        self.assertEqual(self.read(self.config_path), expected)
+
+
+class TestCoreConfig(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmpdir.name, "config.json")
+        with open(self.config_path, "w") as f:
+            json.dump({"zentao_url": "http://zentao", "response_cache_size": 10}, f)
+        self.core = BugFetcherCore(self.config_path)
+
+    async def asyncTearDown(self):
+        await self.core.close()
+        self.tmpdir.cleanup()
+
+    async def test_update_config_resets_dependent_components(self):
+        self.assertIsNotNone(self.core.response_cache)
+        notified = []
+        self.core.config_listeners.append(notified.append)
+
+        changed = self.core.update_config({"response_cache_size": 20, "zentao_url": "http://zentao"})
+
+        self.assertEqual(changed, {"response_cache_size"})
+        self.assertEqual(notified, [{"response_cache_size"}])
+        self.assertEqual(self.core.response_cache.max_entries, 20)
+
+    async def test_external_edit_keeps_runtime_state(self):
+        self.core.zentao_token = "in-memory"
+        with open(self.config_path, "w") as f:
+            json.dump({"zentao_url": "http://edited"}, f)
+        self.assertTrue(self.core.watch_config().check())
+
+        self.assertEqual(self.core.zentao_url, "http://edited")
+        self.assertEqual(self.core.zentao_token, "in-memory")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import os
+import json
+import time
+import asyncio
+import tempfile
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from bugfetcher.core import BugFetcherCore
+from bugfetcher.core.cache import ResponseCache
+
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = []
+        app = web.Application()
+        app.router.add_get("/api.php/v1/products", self.handle_products)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmpdir.name, "config.json")
+        self.config = {
+            "zentao_url": str(self.server.make_url("")).rstrip("/"),
+            "zentao_username": "user",
+            "zentao_token": "token",
+            "bug_store_enabled": False,
+        }
+        self.core = self.make_core()
+
+    def make_core(self, **overrides):
+        with open(self.config_path, "w") as f:
+            json.dump({**self.config, **overrides}, f)
+        return BugFetcherCore(self.config_path)
+
+    async def asyncTearDown(self):
+        await self.core.close()
+        await self.server.close()
+        self.tmpdir.cleanup()
+
+    async def handle_products(self, request):
+        self.requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({"products": [{"id": 1, "name": "P1"}]}, headers={"ETag": '"v1"'})
+
+    async def test_fresh_entry_served_from_memory(self):
+        first = await self.core.fetch_products()
+        second = await self.core.fetch_products()
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.requests), 1)
+        stats = self.core.cache_stats()
+        self.assertEqual((stats["misses"], stats["hits"]), (1, 1))
+
+    async def test_expired_entry_revalidated_with_etag(self):
+        self.core = self.make_core(response_cache_stale=0)
+        await self.core.fetch_products()
+        next(iter(self.core.response_cache._entries.values())).expires_at = 0
+
+        products = await self.core.fetch_products()
+
+        self.assertEqual(products, [{"id": 1, "name": "P1"}])
+        self.assertEqual(self.requests, [None, '"v1"'])
+        self.assertEqual(self.core.cache_stats()["revalidated"], 1)
+
+    async def test_stale_entry_returned_while_revalidating(self):
+        await self.core.fetch_products()
+        next(iter(self.core.response_cache._entries.values())).expires_at = time.time() - 1
+
+        result = await self.core.api_request("get", f"{self.core.zentao_url}/api.php/v1/products")
+        self.assertTrue(result["stale"])
+        await asyncio.gather(*self.core._background_tasks)
+
+        self.assertEqual(self.requests, [None, '"v1"'])
+        self.assertTrue(self.core.response_cache.is_fresh(next(iter(self.core.response_cache._entries.values()))))
+
+    async def test_fresh_flag_bypasses_cache(self):
+        await self.core.fetch_products()
+        await self.core.fetch_products(fresh=True)
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_disk_tier_survives_restart(self):
+        cache_dir = os.path.join(self.tmpdir.name, "cache")
+        self.core = self.make_core(response_cache_dir=cache_dir)
+        await self.core.fetch_products()
+        await self.core.close()
+
+        self.core = self.make_core(response_cache_dir=cache_dir)
+        await self.core.fetch_products()
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.core.cache_stats()["disk_hits"], 1)
+
+    async def test_lru_bound(self):
+        cache = ResponseCache(max_entries=2)
+        for index in range(3):
+            await cache.put(f"key{index}", index, ttl=60)
+
+        self.assertIsNone(await cache.get("key0"))
+        self.assertEqual(cache.stats["evictions"], 1)
+
+    def test_uncached_paths(self):
+        cache = ResponseCache()
+        self.assertEqual(cache.ttl_for("http://zentao/api.php/v1/products/1/bugs"), 0)
+        self.assertEqual(cache.ttl_for("http://zentao/api.php/v1/products"), 600)
+
+
+if __name__ == "__main__":
+    unittest.main()
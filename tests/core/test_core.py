@@ -1,103 +1,209 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import os
+import asyncio
+import concurrent.futures
 import json
+from aiohttp.test_utils import TestServer
+from benchmarks.zentao_stub import StubConfig, ZenTaoStub
 from bugfetcher.core import BugFetcherCore
+from bugfetcher.models import FeishuMessage
+
+class TestBugFetcherCore(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # 4 个Bug轮流指派给 admin/alice，当前用户为 admin
+        self.stub = ZenTaoStub(StubConfig(bugs=4, accounts=["admin", "alice"]))
+        self.server = TestServer(self.stub.make_app())
+        await self.server.start_server()
+        base_url = str(self.server.make_url("")).rstrip("/")
 
-class TestBugFetcherCore(unittest.TestCase):
-    def setUp(self):
         self.config_path = "test_config.json"
         with open(self.config_path, "w") as f:
             json.dump({
-                "zentao_url": "http://zentao.example.com",
+                "zentao_url": base_url,
                 "zentao_username": "testuser",
                 "zentao_password": "testpassword",
-                "feishu_webhook_url": "http://feishu.example.com/webhook",
+                "feishu_webhook_url": f"{base_url}/feishu/webhook",
                 "fetch_interval": 60,
-                "selected_product_id": 1
+                "selected_product_id": 1,
+                "bug_store_enabled": False,
             }, f)
         self.core = BugFetcherCore(self.config_path)
 
-    def tearDown(self):
-        if os.path.exists(self.config_path):
-            os.remove(self.config_path)
+    async def asyncTearDown(self):
+        await self.core.close()
+        await self.server.close()
+        for path in (self.config_path, self.core.config_manager.state_path):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_load_config(self):
         self.core._load_config()
-        self.assertEqual(self.core.zentao_url, "http://zentao.example.com")
+        self.assertTrue(self.core.zentao_url.startswith("http://127.0.0.1:"))
         self.assertEqual(self.core.zentao_username, "testuser")
         self.assertEqual(self.core.zentao_password, "testpassword")
-        self.assertEqual(self.core.feishu_webhook_url, "http://feishu.example.com/webhook")
+        self.assertTrue(self.core.feishu_webhook_url.endswith("/feishu/webhook"))
         self.assertEqual(self.core.fetch_interval, 60)
         self.assertEqual(self.core.selected_product_id, 1)
 
-    @patch("aiohttp.ClientSession.post")
-    async def test_get_zentao_token(self, mock_post):
-        mock_response = MagicMock()
-        mock_response.status = 200
-        mock_response.json.return_value = {"token": "testtoken"}
-        mock_post.return_value.__aenter__.return_value = mock_response
-
+    async def test_get_zentao_token(self):
         token = await self.core.get_zentao_token()
-        self.assertEqual(token, "testtoken")
-
-    @patch("aiohttp.ClientSession.get")
-    async def test_fetch_user_info(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.status = 200
-        mock_response.json.return_value = {"profile": {"realname": "Test User"}}
-        mock_get.return_value.__aenter__.return_value = mock_response
+        self.assertEqual(token, "token-1")
 
+    async def test_fetch_user_info(self):
         user_info = await self.core.fetch_user_info()
         self.assertEqual(user_info["status"], "success")
-        self.assertEqual(user_info["realname"], "Test User")
-
-    @patch("aiohttp.ClientSession.get")
-    async def test_fetch_products(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.status = 200
-        mock_response.json.return_value = {"products": [{"id": 1, "name": "Product 1"}]}
-        mock_get.return_value.__aenter__.return_value = mock_response
+        self.assertEqual(user_info["realname"], "Admin")
 
+    async def test_fetch_products(self):
         products = await self.core.fetch_products()
         self.assertEqual(len(products), 1)
         self.assertEqual(products[0]["id"], 1)
         self.assertEqual(products[0]["name"], "Product 1")
 
-    @patch("aiohttp.ClientSession.get")
-    async def test_fetch_new_bugs(self, mock_get):
-        mock_response = MagicMock()
-        mock_response.status = 200
-        mock_response.json.return_value = {
-            "bugs": [
-                {"id": 1, "title": "Bug 1", "assignedTo": {"realname": "Test User"}},
-                {"id": 2, "title": "Bug 2", "assignedTo": {"realname": "Test User"}},
-            ]
-        }
-        mock_get.return_value.__aenter__.return_value = mock_response
-
+    async def test_fetch_new_bugs(self):
         bugs = await self.core.fetch_new_bugs()
         self.assertEqual(bugs["status"], "success")
-        self.assertEqual(len(bugs["bugs"]), 2)
-
-    @patch("aiohttp.ClientSession.post")
-    async def test_send_to_feishu(self, mock_post):
-        mock_response = MagicMock()
-        mock_response.status = 200
-        mock_post.return_value.__aenter__.return_value = mock_response
-
-        message = MagicMock()
-        message.bugs = [
-            {"id": 1, "title": "Bug 1"},
-            {"id": 2, "title": "Bug 2"},
-        ]
-        message.total = 2
-        message.realname = "Test User"
-        message.suggestion = "Please fix these bugs."
+        self.assertEqual([bug["id"] for bug in bugs["bugs"]], [2, 4])
+
+    async def test_send_to_feishu(self):
+        message = FeishuMessage(
+            total=2,
+            bugs=[{"id": 1, "title": "Bug 1"}, {"id": 2, "title": "Bug 2"}],
+            realname="Test User",
+            suggestion="Please fix these bugs.",
+        )
 
         result = await self.core.send_to_feishu(message)
         self.assertEqual(result["status"], "success")
         self.assertEqual(result["message"], "Message sent to Feishu")
+        self.assertEqual(len(self.stub.feishu_messages), 1)
+
+    async def test_metrics_record_requests(self):
+        await self.core.fetch_new_bugs()
+        text = self.core.metrics.render()
+        self.assertIn('bugfetcher_token_refresh_total{result="success"} 1', text)
+        self.assertIn(
+            'bugfetcher_api_request_seconds_count{endpoint="/api.php/v1/products/{id}/bugs",method="GET",status="200"}',
+            text,
+        )
+        self.assertIn('bugfetcher_bugs_fetched_total{mode="full",product="1"} 4', text)
+        self.assertIn("bugfetcher_last_poll_age_seconds{product=", text)
+
+    async def test_metrics_disabled(self):
+        self.core._config["metrics_enabled"] = False
+        self.core.metrics = self.core._create_metrics()
+        await self.core.fetch_new_bugs()
+        self.assertFalse(self.core.metrics.enabled)
+        self.assertEqual(self.core.metrics.render(), "")
+
+
+class TestBugFetcherSession(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config_path = "test_session_config.json"
+        with open(self.config_path, "w") as f:
+            json.dump({"zentao_url": "http://zentao.example.com", "http_pool_limit_per_host": 4}, f)
+        self.core = BugFetcherCore(self.config_path)
+
+    def tearDown(self):
+        if os.path.exists(self.config_path):
+            os.remove(self.config_path)
+
+    async def test_session_is_shared(self):
+        session = await self.core.get_session()
+        self.assertIs(session, await self.core.get_session())
+        self.assertEqual(session.connector.limit_per_host, 4)
+        await self.core.close()
+        self.assertTrue(session.closed)
+
+    async def test_context_manager_closes_session(self):
+        async with self.core as core:
+            session = await core.get_session()
+        self.assertTrue(session.closed)
+        self.assertIsNot(session, await self.core.get_session())
+        await self.core.close()
+
+class TestBugFetcherPagination(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config_path = "test_pagination_config.json"
+        with open(self.config_path, "w") as f:
+            json.dump({"zentao_url": "http://zentao.example.com", "bug_page_size": 10}, f)
+        self.core = BugFetcherCore(self.config_path)
+        self.bugs = [{"id": i, "title": f"Bug {i}"} for i in range(1, 46)]
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def tearDown(self):
+        if os.path.exists(self.config_path):
+            os.remove(self.config_path)
+
+    async def fake_request(self, method, url, params=None, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        page, limit = params["page"], params["limit"]
+        page_bugs = self.bugs[(page - 1) * limit:page * limit]
+        return {"status": "success", "data": {"page": page, "limit": limit, "total": len(self.bugs), "bugs": page_bugs}}
+
+    async def test_fetches_all_pages_in_order(self):
+        with patch.object(self.core, "api_request", side_effect=self.fake_request) as mock_request:
+            result = await self.core.fetch_paginated("http://zentao.example.com/bugs", "bugs", concurrency=2)
+        self.assertEqual(result["status"], "success")
+        self.assertEqual([bug["id"] for bug in result["data"]], list(range(1, 46)))
+        self.assertEqual(mock_request.call_count, 5)
+        self.assertLessEqual(self.max_in_flight, 2)
+
+    async def test_page_error_is_returned(self):
+        async def failing_request(method, url, params=None, **kwargs):
+            if params["page"] == 3:
+                return {"status": "error", "message": "boom", "code": 500}
+            return await self.fake_request(method, url, params=params)
+
+        with patch.object(self.core, "api_request", side_effect=failing_request):
+            result = await self.core.fetch_paginated("http://zentao.example.com/bugs", "bugs")
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["code"], 500)
+
+class TestSyncFacade(unittest.TestCase):
+    def setUp(self):
+        self.config_path = "test_sync_facade_config.json"
+        with open(self.config_path, "w") as f:
+            json.dump({"zentao_url": "http://zentao.example.com", "bug_store_enabled": False}, f)
+        self.core = BugFetcherCore(self.config_path)
+
+    def tearDown(self):
+        self.core.close_sync()
+        if os.path.exists(self.config_path):
+            os.remove(self.config_path)
+
+    def test_session_reused_across_sync_calls(self):
+        first = self.core._sync_wrapper(self.core.get_session)
+        second = self.core._sync_wrapper(self.core.get_session)
+        self.assertIs(first, second)
+        self.assertFalse(first.closed)
+        self.core.close_sync()
+        self.assertTrue(first.closed)
+        self.assertFalse(self.core._loop_thread.running)
+
+    def test_timeout_cancels_call(self):
+        async def slow():
+            await asyncio.sleep(10)
+            return []
+
+        with patch.object(self.core, "fetch_products", side_effect=slow):
+            with self.assertRaises(concurrent.futures.TimeoutError):
+                self.core.fetch_products_sync(timeout=0.05)
+
+    def test_callable_from_running_loop(self):
+        async def products():
+            return [{"id": 1}]
+
+        async def caller():
+            return self.core.fetch_products_sync(timeout=1)
+
+        with patch.object(self.core, "fetch_products", side_effect=products):
+            self.assertEqual(asyncio.run(caller()), [{"id": 1}])
 
 if __name__ == "__main__":
     unittest.main()
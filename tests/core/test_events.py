@@ -0,0 +1,51 @@
+import unittest
+import unittest.mock
+from bugfetcher.core.events import BugEventHub, change_events
+
+
+def bug(bug_id, account="alice", severity=3, status="active"):
+    return {"id": bug_id, "assignedTo": {"account": account}, "severity": severity, "status": status}
+
+
+class TestBugEventHub(unittest.IsolatedAsyncioTestCase):
+    def test_change_events(self):
+        events = change_events("1", {
+            "added": [bug(1)],
+            "changed": [bug(2), bug(3, status="resolved")],
+            "removed": [bug(4)],
+        })
+        self.assertEqual([(e["type"], e["bug_id"]) for e in events],
+                         [("added", 1), ("changed", 2), ("resolved", 3), ("resolved", 4)])
+
+    async def test_filters(self):
+        hub = BugEventHub()
+        alice = hub.subscribe(assignee="alice")
+        severe = hub.subscribe(severity=[1, 2])
+        other_product = hub.subscribe(product_ids=["2"])
+
+        hub.publish("1", {"added": [bug(1), bug(2, account="bob", severity=1)]})
+
+        self.assertEqual((await alice.get())["bug_id"], 1)
+        self.assertEqual(alice.queue.qsize(), 0)
+        self.assertEqual((await severe.get())["bug_id"], 2)
+        self.assertTrue(other_product.queue.empty())
+
+    async def test_full_buffer_drops_oldest_and_reports_overflow(self):
+        hub = BugEventHub()
+        subscription = hub.subscribe(buffer=2)
+
+        hub.publish("1", {"added": [bug(1), bug(2), bug(3)]})
+
+        self.assertEqual(await subscription.get(), {"type": "overflow", "dropped": 1, "ts": unittest.mock.ANY})
+        self.assertEqual([(await subscription.get())["bug_id"] for _ in range(2)], [2, 3])
+
+    async def test_unsubscribed_clients_receive_nothing(self):
+        hub = BugEventHub()
+        subscription = hub.subscribe()
+        hub.unsubscribe(subscription)
+        self.assertEqual(hub.publish("1", {"added": [bug(1)]}), 0)
+        self.assertTrue(subscription.queue.empty())
+
+
+if __name__ == "__main__":
+    unittest.main()
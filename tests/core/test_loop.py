@@ -0,0 +1,50 @@
+import unittest
+import asyncio
+import threading
+import concurrent.futures
+from bugfetcher.core.loop import LoopThread
+
+
+class TestLoopThread(unittest.TestCase):
+    def setUp(self):
+        self.runner = LoopThread().start()
+
+    def tearDown(self):
+        self.runner.stop()
+
+    def test_runs_coroutines_on_background_thread(self):
+        async def where():
+            return threading.current_thread().name
+
+        self.assertEqual(self.runner.run(where(), timeout=1), "BugFetcherLoop")
+        self.assertIs(self.runner.run(asyncio.sleep(0, result=self.runner.loop), timeout=1), self.runner.loop)
+
+    def test_cancel_propagates_to_task(self):
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        future = self.runner.submit(slow())
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            future.result(0.05)
+        future.cancel()
+        self.assertTrue(cancelled.wait(1))
+
+    def test_run_timeout_cancels(self):
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            self.runner.run(asyncio.sleep(10), timeout=0.05)
+
+    def test_stop_cancels_pending_tasks(self):
+        future = self.runner.submit(asyncio.sleep(10))
+        self.runner.stop()
+        self.assertFalse(self.runner.running)
+        self.assertTrue(future.cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import unittest
+import os
+import json
+import asyncio
+import tempfile
+from bugfetcher.core import BugFetcherCore
+from bugfetcher.core.scheduler import AdaptiveInterval, Job, Scheduler
+
+
+class TestScheduler(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.runs = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def tearDown_scheduler(self, scheduler):
+        await scheduler.stop()
+        self.assertFalse(scheduler.running)
+
+    async def work(self):
+        self.runs += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        return {"status": "success"}
+
+    async def test_job_runs_on_interval_without_overlap(self):
+        scheduler = Scheduler([Job("sync", self.work, interval=0.01)])
+        scheduler.start()
+        await asyncio.sleep(0.2)
+        scheduler.trigger("sync")
+        await asyncio.sleep(0.05)
+        await self.tearDown_scheduler(scheduler)
+
+        self.assertGreaterEqual(self.runs, 2)
+        self.assertEqual(self.max_active, 1)
+
+    async def test_paused_job_only_runs_when_triggered(self):
+        job = Job("sync", self.work, interval=0.01)
+        job.paused = True
+        scheduler = Scheduler([job])
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.runs, 0)
+
+        scheduler.trigger("sync")
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.runs, 1)
+
+        scheduler.resume("sync")
+        await asyncio.sleep(0.15)
+        await self.tearDown_scheduler(scheduler)
+        self.assertGreater(self.runs, 1)
+
+    async def test_failures_are_recorded(self):
+        async def failing():
+            raise RuntimeError("boom")
+
+        scheduler = Scheduler([Job("sync", failing, interval=10)])
+        scheduler.start()
+        await asyncio.sleep(0.02)
+        await self.tearDown_scheduler(scheduler)
+
+        job = scheduler.list()[0]
+        self.assertEqual((job["runs"], job["failures"], job["last_status"]), (1, 1, "error"))
+        self.assertIn("boom", job["last_error"])
+
+    async def test_policy_adjusts_interval_from_result(self):
+        results = iter([{"changed": True}, {"changed": False, "retry_after": 500}])
+        job = Job("sync", lambda: asyncio.sleep(0, next(results)), interval=0,
+                  policy=AdaptiveInterval(100, 10, 1000))
+        scheduler = Scheduler([job])
+
+        await scheduler._run(job)
+        self.assertEqual(job.interval, 50)
+        await scheduler._run(job)
+        self.assertEqual(job.interval, 500)
+
+    async def test_replace_swaps_running_jobs(self):
+        calls = []
+
+        async def other():
+            calls.append("other")
+            return {"status": "success"}
+
+        scheduler = Scheduler([Job("sync", self.work, interval=10), Job("old", self.work, interval=10)])
+        scheduler.pause("sync")
+        scheduler.start()
+        scheduler.replace([Job("sync", other, interval=10), Job("new", other, interval=0.01)])
+        await asyncio.sleep(0.05)
+        await self.tearDown_scheduler(scheduler)
+
+        self.assertEqual([job["name"] for job in scheduler.list()], ["sync", "new"])
+        self.assertTrue(scheduler.jobs["sync"].paused)
+        self.assertEqual(self.runs, 0)
+        self.assertGreater(len(calls), 1)
+
+    def test_unknown_job(self):
+        scheduler = Scheduler([])
+        self.assertIsNone(scheduler.pause("missing"))
+        self.assertIsNone(scheduler.trigger("missing"))
+
+
+class TestAdaptiveInterval(unittest.TestCase):
+    def test_speeds_up_on_changes_and_backs_off_when_idle(self):
+        policy = AdaptiveInterval(base=600, min_interval=60, max_interval=2400)
+        self.assertEqual([policy.update(True) for _ in range(4)], [300, 150, 75, 60])
+        self.assertEqual([policy.update(False) for _ in range(7)], [120, 240, 480, 960, 1920, 2400, 2400])
+
+    def test_retry_after_is_a_floor(self):
+        policy = AdaptiveInterval(base=60, min_interval=60, max_interval=600)
+        self.assertEqual(policy.update(True, retry_after=900), 900)
+        self.assertEqual(policy.update(True), 60)
+
+    def test_equal_bounds_give_fixed_interval(self):
+        policy = AdaptiveInterval(base=300, min_interval=300, max_interval=300)
+        self.assertEqual({policy.update(changed) for changed in (True, False, True)}, {300})
+
+
+class TestCoreScheduler(unittest.TestCase):
+    def make_core(self, config):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        config_path = os.path.join(tmpdir.name, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({"bug_store_enabled": False, **config}, f)
+        return BugFetcherCore(config_path)
+
+    def test_default_jobs_sync_each_product(self):
+        core = self.make_core({"product_ids": ["1", "2"], "fetch_interval": 5, "schedule_jitter": 0})
+        jobs = core.create_scheduler().list()
+        self.assertEqual([job["name"] for job in jobs], ["sync:1", "sync:2"])
+        self.assertEqual(jobs[0]["interval"], 300)
+
+    def test_configured_jobs(self):
+        core = self.make_core({"schedule_jobs": [
+            {"name": "team", "type": "team", "interval": 60},
+            {"type": "notify", "interval": 120, "jitter": 5},
+        ]})
+        jobs = core.create_scheduler().list()
+        self.assertEqual([(job["name"], job["interval"]) for job in jobs], [("team", 60), ("notify", 120)])
+
+        with self.assertRaises(ValueError):
+            self.make_core({"schedule_jobs": [{"type": "unknown"}]}).create_scheduler()
+
+    def test_jobs_follow_product_selection(self):
+        core = self.make_core({"product_ids": ["1", "2"]})
+        scheduler = core.create_scheduler()
+        core.update_config({"product_ids": ["2", "3"]})
+        self.assertEqual([job["name"] for job in scheduler.list()], ["sync:2", "sync:3"])
+
+        core.update_config({"product_ids": [], "selected_product_id": 7})
+        self.assertEqual([job["name"] for job in scheduler.list()], ["sync:7"])
+
+    def test_poll_policy_bounds(self):
+        core = self.make_core({
+            "fetch_interval": 10,
+            "poll_bounds": {"1": {"min": 30, "max": 120}},
+        })
+        policy = core.poll_policy("1")
+        self.assertEqual((policy.min_interval, policy.max_interval, policy.current), (30, 120, 120))
+        policy = core.poll_policy("2")
+        self.assertEqual((policy.min_interval, policy.max_interval, policy.current), (60, 2400, 600))
+
+        fixed = self.make_core({"fetch_interval": 10, "adaptive_polling": False}).poll_policy("1")
+        self.assertEqual((fixed.min_interval, fixed.max_interval), (600, 600))
+
+
+if __name__ == "__main__":
+    unittest.main()
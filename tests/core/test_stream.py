@@ -0,0 +1,131 @@
+import os
+import json
+import unittest
+from aiohttp.test_utils import TestServer
+from benchmarks.zentao_stub import StubConfig, ZenTaoStub
+from bugfetcher.core import BugFetcherCore
+from bugfetcher.core.stream import JSONArrayParser, iter_json_array
+from bugfetcher.models import Bug
+
+
+def parse_in_chunks(body: bytes, key, size: int):
+    parser = JSONArrayParser(key)
+    items = []
+    for start in range(0, len(body), size):
+        items.extend(parser.feed(body[start:start + size]))
+    items.extend(parser.close())
+    return items, parser.meta
+
+
+class TestJSONArrayParser(unittest.TestCase):
+    def setUp(self):
+        self.document = {
+            "page": 1,
+            "total": 12345,
+            "bugs": [
+                {"id": 1, "title": "按钮 \"无响应\" \\ {[", "assignedTo": {"account": "admin"}},
+                {"id": 2, "title": "Bug 2", "tags": [1, [2, 3]], "deadline": None},
+                {"id": 3, "title": "😀", "pri": 3.5},
+            ],
+            "limit": 100,
+        }
+        self.body = json.dumps(self.document, ensure_ascii=False, indent=1).encode()
+
+    def test_every_chunk_size_gives_same_result(self):
+        for size in (1, 2, 3, 7, 64, len(self.body)):
+            items, meta = parse_in_chunks(self.body, "bugs", size)
+            self.assertEqual(items, self.document["bugs"], size)
+            self.assertEqual(meta, {"page": 1, "total": 12345, "limit": 100}, size)
+
+    def test_numbers_split_at_every_offset(self):
+        body = b'{"total":1.5,"ratio":-2.5E+3,"bugs":[2.5,2.5e3,-1e-2,10,0.125E2,[7.0e1]],"limit":100}'
+        expected = json.loads(body)
+        for offset in range(1, len(body)):
+            parser = JSONArrayParser("bugs")
+            items = parser.feed(body[:offset]) + parser.feed(body[offset:]) + parser.close()
+            self.assertEqual(items, expected["bugs"], offset)
+            self.assertEqual(parser.meta, {"total": 1.5, "ratio": -2500.0, "limit": 100}, offset)
+
+    def test_items_are_returned_as_they_complete(self):
+        parser = JSONArrayParser("bugs")
+        first_end = self.body.rindex(b"}", 0, self.body.index(b'"id": 2')) + 1
+        self.assertEqual(parser.feed(self.body[:first_end]), [self.document["bugs"][0]])
+        self.assertFalse(parser.done)
+
+    def test_buffer_holds_only_unparsed_tail(self):
+        body = json.dumps({"bugs": [{"id": i, "title": "x" * 100} for i in range(1000)]}).encode()
+        parser = JSONArrayParser("bugs")
+        largest = 0
+        for start in range(0, len(body), 256):
+            parser.feed(body[start:start + 256])
+            largest = max(largest, len(parser._buffer) - parser._pos)
+        parser.close()
+        self.assertLess(largest, 256 + 130)
+
+    def test_top_level_array_and_empty_or_null_arrays(self):
+        self.assertEqual(parse_in_chunks(b"[1, 22, 333]", None, 1)[0], [1, 22, 333])
+        self.assertEqual(parse_in_chunks(b'{"total": 0, "bugs": []}', "bugs", 3), ([], {"total": 0}))
+        self.assertEqual(parse_in_chunks(b'{"bugs": null}', "bugs", 2), ([], {"bugs": None}))
+        self.assertEqual(parse_in_chunks(b"{}", "bugs", 1), ([], {}))
+
+    def test_incomplete_or_invalid_document_raises(self):
+        with self.assertRaises(ValueError):
+            parse_in_chunks(b'{"bugs": [{"id": 1}, {"id":', "bugs", 4)
+        with self.assertRaises(ValueError):
+            parse_in_chunks(b'<html>502 Bad Gateway</html>', "bugs", 4)
+
+
+class TestIterJSONArray(unittest.IsolatedAsyncioTestCase):
+    async def test_yields_items_and_fills_meta(self):
+        async def chunks():
+            body = b'{"page": 2, "bugs": [{"id": 1}, {"id": 2}], "limit": 50}'
+            for start in range(0, len(body), 5):
+                yield body[start:start + 5]
+
+        meta = {}
+        items = [item async for item in iter_json_array(chunks(), "bugs", meta)]
+        self.assertEqual(items, [{"id": 1}, {"id": 2}])
+        self.assertEqual(meta, {"page": 2, "limit": 50})
+
+
+class TestStreamingFetch(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.stub = ZenTaoStub(StubConfig(bugs=23, accounts=["admin", "alice"]))
+        self.server = TestServer(self.stub.make_app())
+        await self.server.start_server()
+        self.base_url = str(self.server.make_url("")).rstrip("/")
+        self.config_path = "test_stream_config.json"
+        self.cores = []
+
+    async def asyncTearDown(self):
+        for core in self.cores:
+            await core.close()
+        await self.server.close()
+        for path in (self.config_path, self.config_path.replace(".json", ".state.json")):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def fetch(self, **config):
+        with open(self.config_path, "w") as f:
+            json.dump({
+                "zentao_url": self.base_url,
+                "zentao_username": "admin",
+                "zentao_password": "secret",
+                "bug_store_enabled": False,
+                "bug_page_size": 5,
+                **config,
+            }, f)
+        core = BugFetcherCore(self.config_path)
+        self.cores.append(core)
+        await core.ensure_token()
+        return await core.fetch_paginated(
+            f"{self.base_url}/api.php/v1/products/1/bugs", "bugs", parse=core.parse_bug
+        )
+
+    async def test_streaming_matches_buffered_parsing(self):
+        buffered = await self.fetch(stream_json=False)
+        streamed = await self.fetch(stream_json=True, stream_chunk_size=7)
+        self.assertEqual(streamed["status"], "success")
+        self.assertEqual(streamed["total"], 23)
+        self.assertTrue(all(isinstance(bug, Bug) for bug in streamed["data"]))
+        self.assertEqual(streamed["data"], buffered["data"])
@@ -0,0 +1,251 @@
+import unittest
+import asyncio
+from unittest.mock import patch
+import os
+import json
+from aiohttp.test_utils import TestServer
+from benchmarks.zentao_stub import StubConfig, ZenTaoStub
+from bugfetcher.core import BugFetcherCore
+from bugfetcher.core.sync import BugSnapshot, edit_stamp
+
+
+def make_bug(bug_id, edited, status="active"):
+    return {"id": bug_id, "title": f"Bug {bug_id}", "status": status, "lastEditedDate": edited}
+
+
+class TestBugSnapshot(unittest.TestCase):
+    def test_replace_tracks_watermark_and_removed(self):
+        snapshot = BugSnapshot("1")
+        snapshot.replace([make_bug(1, "2024-01-01 10:00:00"), make_bug(2, "2024-01-02 10:00:00")])
+        self.assertEqual(snapshot.watermark, "2024-01-02 10:00:00")
+
+        changes = snapshot.replace([make_bug(2, "2024-01-02 10:00:00")])
+        self.assertEqual([bug["id"] for bug in changes["removed"]], [1])
+        self.assertEqual(changes["added"], [])
+        self.assertEqual(changes["changed"], [])
+
+    def test_merge_reports_added_and_changed(self):
+        snapshot = BugSnapshot("1")
+        snapshot.replace([make_bug(1, "2024-01-01 10:00:00")])
+        changes = snapshot.merge([
+            make_bug(1, "2024-01-03 10:00:00", status="resolved"),
+            make_bug(2, "2024-01-03 11:00:00"),
+        ])
+        self.assertEqual([bug["id"] for bug in changes["changed"]], [1])
+        self.assertEqual([bug["id"] for bug in changes["added"]], [2])
+        self.assertEqual(snapshot.watermark, "2024-01-03 11:00:00")
+
+    def test_zero_edit_date_falls_back_to_opened_date(self):
+        bug = {"id": 1, "openedDate": "2024-01-05 09:00:00", "lastEditedDate": "0000-00-00 00:00:00"}
+        self.assertEqual(edit_stamp(bug), "2024-01-05 09:00:00")
+        snapshot = BugSnapshot("1")
+        snapshot.replace([bug, make_bug(7, "2024-01-01 10:00:00")])
+        self.assertEqual((snapshot.watermark, snapshot.max_id), ("2024-01-05 09:00:00", 7))
+
+
+class TestIncrementalSync(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config_path = "test_sync_config.json"
+        with open(self.config_path, "w") as f:
+            # fake_request 替换 api_request 直接返回整页数据，关闭流式解析
+            json.dump({
+                "zentao_url": "http://zentao.example.com",
+                "delta_page_size": 2,
+                "bug_store_enabled": False,
+                "stream_json": False,
+            }, f)
+        self.core = BugFetcherCore(self.config_path)
+        self.bugs = [make_bug(i, f"2024-01-{i:02d} 10:00:00") for i in range(1, 11)]
+        self.requests = []
+
+    def tearDown(self):
+        if os.path.exists(self.config_path):
+            os.remove(self.config_path)
+
+    async def fake_request(self, method, url, params=None, **kwargs):
+        self.requests.append(params)
+        bugs = self.bugs
+        if params.get("order") == "lastEditedDate_desc":
+            bugs = sorted(bugs, key=lambda bug: bug["lastEditedDate"], reverse=True)
+        elif params.get("order") == "id_desc":
+            bugs = sorted(bugs, key=lambda bug: bug["id"], reverse=True)
+        page, limit = params["page"], params["limit"]
+        return {
+            "status": "success",
+            "data": {"page": page, "limit": limit, "total": len(bugs), "bugs": bugs[(page - 1) * limit:page * limit]},
+        }
+
+    async def test_delta_sync_stops_at_known_data(self):
+        subscription = self.core.events.subscribe()
+        with patch.object(self.core, "api_request", side_effect=self.fake_request):
+            first = await self.core.sync_product_bugs("1")
+            self.assertTrue(first["full"])
+            self.assertEqual(len(first["bugs"]), 10)
+
+            self.bugs[2] = make_bug(3, "2024-02-01 10:00:00", status="resolved")
+            self.bugs.append(make_bug(11, "2024-02-02 10:00:00"))
+            self.requests.clear()
+            second = await self.core.sync_product_bugs("1")
+
+        self.assertFalse(second["full"])
+        self.assertEqual(len(second["bugs"]), 11)
+        self.assertEqual([bug["id"] for bug in second["changes"]["added"]], [11])
+        self.assertEqual([bug["id"] for bug in second["changes"]["changed"]], [3])
+        # 按编辑时间两条变更加一条已知数据，只需翻到第二页；按ID倒序第一页即遇到已知ID
+        self.assertEqual([params["order"] for params in self.requests], ["lastEditedDate_desc"] * 2 + ["id_desc"])
+        # 首次加载不推送，之后只推送变化
+        events = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+        self.assertEqual([(event["type"], event["bug_id"]) for event in events], [("added", 11), ("resolved", 3)])
+
+
+class TestDeltaSyncAgainstStub(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.stub = ZenTaoStub(StubConfig(bugs=30))
+        self.server = TestServer(self.stub.make_app())
+        await self.server.start_server()
+        self.config_path = "test_delta_stub_config.json"
+        with open(self.config_path, "w") as f:
+            json.dump({
+                "zentao_url": str(self.server.make_url("")).rstrip("/"),
+                "zentao_username": "admin",
+                "zentao_password": "secret",
+                "bug_store_enabled": False,
+                "delta_page_size": 5,
+            }, f)
+        self.core = BugFetcherCore(self.config_path)
+
+    async def asyncTearDown(self):
+        await self.core.close()
+        await self.server.close()
+        for path in (self.config_path, self.core.config_manager.state_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def test_never_edited_new_bugs_are_picked_up(self):
+        await self.core.ensure_token()
+        await self.core.sync_product_bugs("1")
+        touched = self.stub.touch(2)
+        created = self.stub.create(3, edited=False)
+
+        result = await self.core.sync_product_bugs("1")
+
+        self.assertFalse(result["full"])
+        self.assertEqual(sorted(bug["id"] for bug in result["changes"]["added"]), created)
+        self.assertEqual(sorted(bug["id"] for bug in result["changes"]["changed"]), sorted(touched))
+        self.assertEqual(len(result["bugs"]), 33)
+
+    async def test_concurrent_syncs_of_a_product_share_one_fetch(self):
+        await self.core.ensure_token()
+        results = await asyncio.gather(*(self.core.sync_product_bugs("1") for _ in range(5)))
+
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(self.stub.requests["/api.php/v1/products/{product_id}/bugs"], 1)
+        self.assertEqual(self.core._syncs, {})
+
+
+class TestMultiProductPolling(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config_path = "test_multi_product_config.json"
+        with open(self.config_path, "w") as f:
+            json.dump({
+                "zentao_url": "http://zentao.example.com",
+                "zentao_token": "token",
+                "product_ids": ["1", "2", "3"],
+                "bug_store_enabled": False,
+            }, f)
+        self.core = BugFetcherCore(self.config_path)
+        self.core.user_realname = "Alice"
+
+    def tearDown(self):
+        if os.path.exists(self.config_path):
+            os.remove(self.config_path)
+
+    async def fake_request(self, method, url, params=None, **kwargs):
+        product_id = url.split("/products/")[1].split("/")[0]
+        if product_id == "3":
+            return {"status": "error", "message": "not found", "code": 404}
+        bugs = [
+            {"id": int(product_id) * 100 + i, "assignedTo": {"realname": "Alice" if i % 2 else "Bob"}}
+            for i in range(int(product_id) * 2)
+        ]
+        return {"status": "success", "data": {"page": 1, "limit": 500, "total": len(bugs), "bugs": bugs}}
+
+    async def test_polls_products_concurrently(self):
+        with patch.object(self.core, "api_request", side_effect=self.fake_request):
+            result = await self.core.fetch_bugs_for_products()
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["failed"], ["3"])
+        self.assertEqual([bug["id"] for bug in result["products"]["1"]["bugs"]], [101])
+        self.assertEqual([bug["id"] for bug in result["products"]["2"]["bugs"]], [201, 203])
+        self.assertEqual(result["total"], 3)
+        self.assertEqual(set(self.core._snapshots), {"1", "2", "3"})
+
+
+class TestTeamNotification(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config_path = "test_team_config.json"
+        with open(self.config_path, "w") as f:
+            json.dump({
+                "zentao_url": "http://zentao.example.com",
+                "zentao_token": "token",
+                "feishu_webhook_url": "http://feishu.example.com/default",
+                "product_ids": ["1"],
+                "team_subscribers": ["alice", {"account": "bob", "webhook": "http://feishu.example.com/bob"}, "carol"],
+                "bug_store_enabled": False,
+            }, f)
+        self.core = BugFetcherCore(self.config_path)
+
+    def tearDown(self):
+        if os.path.exists(self.config_path):
+            os.remove(self.config_path)
+
+    async def test_one_scan_fans_out_per_account(self):
+        bugs = [
+            {"id": i, "title": f"Bug {i}", "assignedTo": {"account": account, "realname": account.title()}}
+            for i, account in enumerate(["alice", "bob", "alice", "dave"], start=1)
+        ]
+
+        async def fake_request(method, url, params=None, **kwargs):
+            return {"status": "success", "data": {"page": 1, "limit": 500, "total": len(bugs), "bugs": bugs}}
+
+        sent = []
+
+        async def fake_send(message, webhook_url=None):
+            sent.append((message.realname, [bug["id"] for bug in message.bugs], webhook_url))
+            return {"status": "success", "message": "Message sent to Feishu"}
+
+        with patch.object(self.core, "api_request", side_effect=fake_request) as mock_request, \
+                patch.object(self.core, "send_to_feishu", side_effect=fake_send):
+            result = await self.core.notify_team()
+
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(sorted(sent), [("Alice", [1, 3], "http://feishu.example.com/default"), ("Bob", [2], "http://feishu.example.com/bob")])
+        self.assertEqual(result["notified"]["carol"]["status"], "skipped")
+
+    async def test_product_syncs_are_bounded(self):
+        active = peak = 0
+
+        async def fake_request(method, url, params=None, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return {"status": "success", "data": {"page": 1, "limit": 500, "total": 0, "bugs": []}}
+
+        async def fake_send(message, webhook_url=None):
+            return {"status": "success", "message": "Message sent to Feishu"}
+
+        self.core._config.update({"product_ids": [str(i) for i in range(1, 7)], "product_poll_concurrency": 2})
+        with patch.object(self.core, "api_request", side_effect=fake_request) as mock_request, \
+                patch.object(self.core, "send_to_feishu", side_effect=fake_send):
+            result = await self.core.notify_team()
+
+        self.assertEqual(result["failed"], [])
+        self.assertEqual(mock_request.call_count, 6)
+        self.assertEqual(peak, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import os
+import json
+import asyncio
+import tempfile
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from bugfetcher.core import BugFetcherCore
+
+
+class TestTokenRefresh(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.logins = 0
+        self.valid_token = "fresh"
+        app = web.Application()
+        app.router.add_post("/api.php/v1/tokens", self.handle_login)
+        app.router.add_get("/api.php/v1/user", self.handle_user)
+        app.router.add_get("/api.php/v1/products/1/bugs", self.handle_rate_limited)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmpdir.name, "config.json")
+        with open(self.config_path, "w") as f:
+            json.dump({
+                "zentao_url": str(self.server.make_url("")).rstrip("/"),
+                "zentao_username": "user",
+                "zentao_password": "pass",
+                "zentao_token": "expired",
+                "bug_store_enabled": False,
+            }, f)
+        self.core = BugFetcherCore(self.config_path)
+
+    async def asyncTearDown(self):
+        await self.core.close()
+        await self.server.close()
+        self.tmpdir.cleanup()
+
+    async def handle_login(self, request):
+        self.logins += 1
+        await asyncio.sleep(0.05)
+        return web.json_response({"token": self.valid_token}, status=201)
+
+    async def handle_user(self, request):
+        if request.headers.get("Token") != self.valid_token:
+            return web.json_response({"error": "Unauthorized"}, status=401)
+        return web.json_response({"profile": {"account": "user", "realname": "User"}})
+
+    async def handle_rate_limited(self, request):
+        return web.json_response({"error": "Too many requests"}, status=429, headers={"Retry-After": "120"})
+
+    async def test_retry_after_is_recorded(self):
+        self.core.zentao_token = "fresh"
+        result = await self.core.poll_product("1")
+
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["retry_after"], 120)
+        self.assertGreater(self.core.retry_after(), 100)
+
+    async def test_concurrent_401s_share_one_login(self):
+        results = await asyncio.gather(*(self.core.fetch_user_info() for _ in range(10)))
+
+        self.assertTrue(all(result["status"] == "success" for result in results))
+        self.assertEqual(self.logins, 1)
+        self.assertEqual(self.core.zentao_token, "fresh")
+
+        await self.core.close()
+        # 令牌写入运行时状态文件，旧版 config.json 中的令牌被移出
+        with open(self.core.config_manager.state_path) as f:
+            self.assertEqual(json.load(f)["zentao_token"], "fresh")
+        with open(self.config_path) as f:
+            self.assertNotIn("zentao_token", json.load(f))
+
+    async def test_retry_depth_is_bounded(self):
+        self.valid_token = "never-matches"
+
+        async def login():
+            self.logins += 1
+            return f"token-{self.logins}"
+
+        self.core.tokens._login = login
+        result = await self.core.fetch_user_info()
+
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["code"], 401)
+        self.assertEqual(self.logins, 1)
+
+    async def test_proactive_refresh_before_expiry(self):
+        self.core._config["token_ttl"] = 100
+        self.core._config["token_refresh_margin"] = 10
+        self.core.tokens.obtained_at -= 50
+        self.assertEqual(await self.core.ensure_token(), "expired")
+
+        self.core.tokens.obtained_at -= 45
+        self.assertEqual(await self.core.ensure_token(), "fresh")
+        self.assertEqual(self.logins, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
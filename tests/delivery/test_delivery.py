@@ -0,0 +1,106 @@
+import unittest
+import os
+import json
+import asyncio
+import tempfile
+import warnings
+from bugfetcher.delivery import FeishuDeliveryQueue, render_feishu_payload
+from bugfetcher.models import FeishuMessage
+
+
+def make_message(realname, bug_ids):
+    return FeishuMessage(
+        total=len(bug_ids), bugs=[{"id": i, "title": f"Bug {i}"} for i in bug_ids], realname=realname
+    )
+
+
+class TestRenderPayload(unittest.TestCase):
+    def test_single_message_keeps_flat_format(self):
+        payload = render_feishu_payload([make_message("Alice", [1, 2])])
+        content = json.loads(payload["content"]["text"])
+        self.assertEqual(content["total"], 2)
+        self.assertEqual(content["realname"], "Alice")
+        self.assertNotIn("notifications", content)
+
+    def test_merged_messages(self):
+        payload = render_feishu_payload([make_message("Alice", [1]), make_message("Bob", [2, 3])])
+        content = json.loads(payload["content"]["text"])
+        self.assertEqual(content["total"], 3)
+        self.assertEqual(len(content["notifications"]), 2)
+
+
+class TestFeishuDeliveryQueue(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.spool_dir = os.path.join(self.tmpdir.name, "spool")
+        self.sent = []
+        self.responses = []
+
+    async def asyncTearDown(self):
+        self.tmpdir.cleanup()
+
+    async def fake_send(self, webhook_url, payload):
+        self.sent.append((webhook_url, json.loads(payload["content"]["text"])))
+        if self.responses:
+            return self.responses.pop(0)
+        return {"status": "success", "message": "Message sent to Feishu"}
+
+    def make_queue(self, **kwargs):
+        kwargs.setdefault("backoff_base", 0.01)
+        return FeishuDeliveryQueue(self.fake_send, spool_dir=self.spool_dir, rate_per_minute=6000, **kwargs)
+
+    async def test_retries_on_server_error(self):
+        self.responses = [{"status": "error", "message": "busy", "code": 503}]
+        queue = self.make_queue()
+        await queue.start()
+        delivery_id = await queue.enqueue(make_message("Alice", [1]), "http://hook")
+        await queue.stop()
+
+        self.assertEqual(len(self.sent), 2)
+        self.assertEqual(queue.get(delivery_id)["status"], "delivered")
+        self.assertEqual(queue.get(delivery_id)["attempts"], 2)
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    async def test_client_error_is_not_retried(self):
+        self.responses = [{"status": "error", "message": "bad request", "code": 400}]
+        queue = self.make_queue()
+        await queue.start()
+        delivery_id = await queue.enqueue(make_message("Alice", [1]), "http://hook")
+        await queue.stop()
+
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(queue.get(delivery_id)["status"], "failed")
+
+    async def test_pending_messages_for_same_webhook_are_merged(self):
+        queue = self.make_queue(workers=1)
+        await queue.start()
+        # 占住唯一的worker，让后续消息在队列中累积
+        self.responses = [{"status": "error", "message": "busy", "code": 429, "retry_after": 0.05}]
+        await queue.enqueue(make_message("Alice", [1]), "http://hook")
+        await asyncio.sleep(0.01)
+        await queue.enqueue(make_message("Bob", [2]), "http://hook")
+        await queue.enqueue(make_message("Carol", [3]), "http://hook")
+        await queue.stop()
+
+        self.assertEqual(len(self.sent), 3)
+        self.assertEqual(self.sent[-1][1]["realname"], "Bob、Carol")
+
+    async def test_spooled_messages_survive_restart(self):
+        queue = self.make_queue()
+        queue._ready = asyncio.Queue()
+        os.makedirs(self.spool_dir)
+        # 未启动worker即“退出”，消息只存在于暂存目录
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            await queue.enqueue(make_message("Alice", [1]), "http://hook")
+        self.assertEqual(len(os.listdir(self.spool_dir)), 1)
+
+        restarted = self.make_queue()
+        await restarted.start()
+        await restarted.stop()
+        self.assertEqual([content["realname"] for _, content in self.sent], ["Alice"])
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
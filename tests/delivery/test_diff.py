@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import patch
+import os
+import json
+import tempfile
+from bugfetcher.core import BugFetcherCore
+from bugfetcher.delivery import diff_bugs, fingerprint
+
+
+def make_bug(bug_id, title=None, status="active"):
+    return {"id": bug_id, "title": title or f"Bug {bug_id}", "status": status, "severity": 3, "pri": 2}
+
+
+class TestDiffBugs(unittest.TestCase):
+    def test_added_changed_resolved(self):
+        previous = fingerprint([make_bug(1), make_bug(2), make_bug(3)])
+        diff = diff_bugs(previous, [make_bug(1), make_bug(2, title="Renamed"), make_bug(4)])
+
+        self.assertEqual([bug["id"] for bug in diff["added"]], [4])
+        self.assertEqual([bug["id"] for bug in diff["changed"]], [2])
+        self.assertEqual(diff["resolved"], ["3"])
+        self.assertTrue(diff["has_changes"])
+
+    def test_unrendered_fields_do_not_count_as_changes(self):
+        bug = make_bug(1)
+        previous = fingerprint([bug])
+        self.assertFalse(diff_bugs(previous, [{**bug, "lastEditedDate": "2024-01-02"}])["has_changes"])
+
+
+class TestNotifyChanges(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.config_path = "test_notify_config.json"
+        with open(self.config_path, "w") as f:
+            json.dump({"feishu_webhook_url": "http://feishu.example.com", "bug_store_enabled": False}, f)
+        self.core = BugFetcherCore(self.config_path)
+        self.messages = []
+
+    def tearDown(self):
+        if os.path.exists(self.config_path):
+            os.remove(self.config_path)
+
+    async def fake_deliver(self, message, webhook_url=None, on_delivered=None):
+        self.messages.append(message)
+        await on_delivered()
+        return {"status": "success", "message": "Message sent to Feishu"}
+
+    async def test_only_deltas_are_sent(self):
+        with patch.object(self.core, "deliver", side_effect=self.fake_deliver):
+            first = await self.core.notify_changes("alice@1", "Alice", [make_bug(1), make_bug(2)])
+            unchanged = await self.core.notify_changes("alice@1", "Alice", [make_bug(1), make_bug(2)])
+            delta = await self.core.notify_changes("alice@1", "Alice", [make_bug(2), make_bug(3)])
+
+        self.assertEqual(first["status"], "success")
+        self.assertEqual(unchanged["status"], "skipped")
+        self.assertEqual(delta["status"], "success")
+        self.assertEqual(len(self.messages), 2)
+        self.assertEqual(len(self.messages[0].bugs), 2)
+        self.assertEqual([bug["id"] for bug in self.messages[1].bugs], [3])
+        self.assertEqual(self.messages[1].resolved, ["1"])
+        self.assertEqual(self.messages[1].total, 2)
+
+    async def test_failed_delivery_is_retried_next_poll(self):
+        async def failing_deliver(message, webhook_url=None, on_delivered=None):
+            return {"status": "error", "message": "down"}
+
+        with patch.object(self.core, "deliver", side_effect=failing_deliver):
+            await self.core.notify_changes("alice@1", "Alice", [make_bug(1)])
+        with patch.object(self.core, "deliver", side_effect=self.fake_deliver):
+            result = await self.core.notify_changes("alice@1", "Alice", [make_bug(1)])
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(len(self.messages), 1)
+
+    async def test_fingerprint_saved_after_queued_delivery_confirmed(self):
+        responses = [{"status": "error", "message": "bad request", "code": 400}]
+        posts = []
+
+        async def post(webhook_url, payload):
+            posts.append(json.loads(payload["content"]["text"]))
+            return responses.pop(0) if responses else {"status": "success", "message": "Message sent to Feishu"}
+
+        with tempfile.TemporaryDirectory() as spool_dir:
+            self.core._config["feishu_spool_dir"] = spool_dir
+            self.core.post_to_feishu = post
+            await self.core.start_delivery_queue()
+            try:
+                # 入队后投递失败(不可重试)：不保存指纹，下次轮询重新发送
+                queued = await self.core.notify_changes("alice@1", "Alice", [make_bug(1)])
+                await self.core.deliveries.stop()
+                self.assertEqual(queued["status"], "queued")
+                self.assertIsNone(await self.core._load_fingerprint("alice@1"))
+
+                await self.core.deliveries.start()
+                await self.core.notify_changes("alice@1", "Alice", [make_bug(1)])
+                await self.core.deliveries.stop()
+                self.assertEqual(len(posts), 2)
+                self.assertIsNotNone(await self.core._load_fingerprint("alice@1"))
+                skipped = await self.core.notify_changes("alice@1", "Alice", [make_bug(1)])
+                self.assertEqual(skipped["status"], "skipped")
+            finally:
+                await self.core.deliveries.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
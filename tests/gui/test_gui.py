@@ -0,0 +1,56 @@
+import unittest
+import concurrent.futures
+from unittest.mock import MagicMock
+from bugfetcher.core.scheduler import AdaptiveInterval
+from bugfetcher.gui import BugFetcherGUI
+
+
+class FakeRoot:
+    """记录 after 调用，不需要显示器"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func, *args):
+        self.scheduled.append((ms, func, args))
+        return len(self.scheduled)
+
+
+class TestFetchLoop(unittest.TestCase):
+    def setUp(self):
+        # 不创建 Tk 窗口，只组装轮询需要的属性
+        self.gui = BugFetcherGUI.__new__(BugFetcherGUI)
+        self.gui.root = FakeRoot()
+        self.gui.fetcher = MagicMock(sync_changes=0)
+        self.gui.fetcher.retry_after.return_value = None
+        self.gui.log = MagicMock()
+        self.gui.set_busy = self.gui.set_idle = lambda *args: None
+        self.gui.is_fetching = True
+        self.gui.poll_policy = AdaptiveInterval(60, 60, 60)
+        self.gui.changes_before = 0
+
+    def finish(self, future):
+        self.gui.schedule_fetch()
+        _, check, args = self.gui.root.scheduled.pop()
+        self.gui.root.scheduled.clear()
+        check(future, *args[1:])
+        return self.gui.root.scheduled
+
+    def test_failed_fetch_schedules_next_fetch(self):
+        future = concurrent.futures.Future()
+        future.set_exception(ConnectionError("boom"))
+        self.assertEqual(self.finish(future), [(60000, self.gui.schedule_fetch, ())])
+
+    def test_successful_fetch_schedules_next_fetch(self):
+        future = concurrent.futures.Future()
+        future.set_result({"status": "success", "bugs": []})
+        self.assertEqual(self.finish(future), [(60000, self.gui.schedule_fetch, ())])
+
+    def test_cancelled_fetch_stops_polling(self):
+        future = concurrent.futures.Future()
+        future.cancel()
+        self.assertEqual(self.finish(future), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import os
+import json
+import asyncio
+import logging
+import tempfile
+from bugfetcher.log import bind_request_id, request_id_var
+from bugfetcher.log.log import LoggingPipeline, Redactor, SamplingFilter
+
+
+class TestRedactor(unittest.TestCase):
+    def test_redacts_known_keys_and_registered_secrets(self):
+        redactor = Redactor()
+        redactor.add_secret("s3cr3t-token")
+        text = redactor.redact("Headers: {'Token': 'abc123', 'Content-Type': 'application/json'} password=hunter2")
+        self.assertNotIn("abc123", text)
+        self.assertNotIn("hunter2", text)
+        self.assertIn("application/json", text)
+        self.assertEqual(redactor.redact("login failed for s3cr3t-token"), "login failed for ***")
+
+    def test_redacts_structured_fields(self):
+        fields = Redactor().redact_fields({"zentao_password": "x", "url": "http://h/?token=abc", "count": 2})
+        self.assertEqual(fields, {"zentao_password": "***", "url": "http://h/?token=***", "count": 2})
+
+
+class TestSamplingFilter(unittest.TestCase):
+    def test_only_listed_events_are_sampled(self):
+        sampler = SamplingFilter({"zentao.request": 0})
+        record = logging.makeLogRecord({"event": "zentao.request"})
+        self.assertFalse(sampler.filter(record))
+        self.assertTrue(sampler.filter(logging.makeLogRecord({"event": "sync"})))
+        self.assertTrue(sampler.filter(logging.makeLogRecord({})))
+
+
+class TestLoggingPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmpdir.name, "app.log")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_pipeline(self, level, emit):
+        pipeline = LoggingPipeline(level=level, log_file=self.log_file, logger_name="BugFetcherTest")
+        pipeline.handlers[0].setLevel(logging.CRITICAL + 1)  # 测试中不输出到控制台
+        pipeline.start()
+        try:
+            emit(pipeline.logger)
+        finally:
+            pipeline.stop()
+        with open(self.log_file) as f:
+            return [json.loads(line) for line in f]
+
+    def test_writes_json_with_request_id_and_fields(self):
+        def emit(logger):
+            with bind_request_id("req-1"):
+                logger.info("Synced %s bugs", 3, extra={"event": "sync", "fields": {"product": "1"}})
+            logger.warning("outside")
+
+        entries = self.run_pipeline(logging.INFO, emit)
+        self.assertEqual(entries[0]["message"], "Synced 3 bugs")
+        self.assertEqual(entries[0]["request_id"], "req-1")
+        self.assertEqual(entries[0]["event"], "sync")
+        self.assertEqual(entries[0]["product"], "1")
+        self.assertNotIn("request_id", entries[1])
+
+    def test_disabled_level_is_not_formatted(self):
+        formatted = []
+
+        class Expensive:
+            def __str__(self):
+                formatted.append(True)
+                return "payload"
+
+        entries = self.run_pipeline(logging.INFO, lambda logger: logger.debug("payload: %s", Expensive()))
+        self.assertEqual(entries, [])
+        self.assertEqual(formatted, [])
+
+
+class TestRequestId(unittest.IsolatedAsyncioTestCase):
+    async def test_request_ids_are_isolated_per_task(self):
+        async def handler(request_id):
+            with bind_request_id(request_id):
+                await asyncio.sleep(0.01)
+                return request_id_var.get()
+
+        self.assertEqual(await asyncio.gather(handler("a"), handler("b")), ["a", "b"])
+        self.assertIsNone(request_id_var.get())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from bugfetcher.metrics import Metrics, NullMetrics, endpoint_label
+
+
+class TestMetrics(unittest.TestCase):
+    def test_endpoint_label_collapses_ids(self):
+        self.assertEqual(endpoint_label("/api.php/v1/products/12/bugs"), "/api.php/v1/products/{id}/bugs")
+        self.assertEqual(endpoint_label("/api.php/v1/bugs/7"), "/api.php/v1/bugs/{id}")
+        self.assertEqual(endpoint_label("/api.php/v1/user"), "/api.php/v1/user")
+
+    def test_render_prometheus_text(self):
+        metrics = Metrics()
+        metrics.describe("token_refresh_total", "ZenTao logins by result")
+        metrics.inc("token_refresh_total", result="success")
+        metrics.inc("token_refresh_total", result="success")
+        metrics.set("queue_depth", 3)
+        metrics.observe("api_request_seconds", 0.02, endpoint="/user", status=200)
+        text = metrics.render()
+
+        self.assertIn("# HELP bugfetcher_token_refresh_total ZenTao logins by result", text)
+        self.assertIn("# TYPE bugfetcher_token_refresh_total counter", text)
+        self.assertIn('bugfetcher_token_refresh_total{result="success"} 2', text)
+        self.assertIn("bugfetcher_queue_depth 3", text)
+        self.assertIn("# TYPE bugfetcher_api_request_seconds histogram", text)
+        self.assertIn('bugfetcher_api_request_seconds_bucket{endpoint="/user",status="200",le="0.01"} 0', text)
+        self.assertIn('bugfetcher_api_request_seconds_bucket{endpoint="/user",status="200",le="0.025"} 1', text)
+        self.assertIn('bugfetcher_api_request_seconds_bucket{endpoint="/user",status="200",le="+Inf"} 1', text)
+        self.assertIn('bugfetcher_api_request_seconds_count{endpoint="/user",status="200"} 1', text)
+
+    def test_gauge_callback_and_label_escaping(self):
+        metrics = Metrics()
+        metrics.gauge_callback("poll_age", lambda: {(("product", 'a"b'),): 5})
+        metrics.gauge_callback("broken", lambda: 1 / 0)
+        text = metrics.render()
+        self.assertIn('bugfetcher_poll_age{product="a\\"b"} 5', text)
+        self.assertNotIn("broken", text)
+
+    def test_summary(self):
+        metrics = Metrics()
+        metrics.inc("bugs_fetched_total", 10, product="1")
+        metrics.inc("bugs_fetched_total", 5, product="2")
+        for value in (0.003, 0.003, 0.2, 20):
+            metrics.observe("api_request_seconds", value, status=200)
+        summary = metrics.summary()
+
+        self.assertEqual(summary["counters"]["bugs_fetched_total"], 15)
+        timing = summary["timings"]["api_request_seconds"]
+        self.assertEqual(timing["count"], 4)
+        self.assertEqual(timing["p50"], 0.005)
+        # 超出最大桶的分位数未知
+        self.assertIsNone(timing["p99"])
+
+    def test_null_metrics(self):
+        metrics = NullMetrics()
+        metrics.inc("x")
+        metrics.observe("y", 1.0)
+        self.assertFalse(metrics.enabled)
+        self.assertEqual(metrics.render(), "")
+        self.assertEqual(metrics.summary(), {"counters": {}, "gauges": {}, "timings": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
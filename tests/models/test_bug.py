@@ -0,0 +1,83 @@
+import unittest
+import json
+from bugfetcher.models import Bug, as_dict, json_default
+from bugfetcher.store import assignee
+from bugfetcher.core.sync import BugSnapshot
+from bugfetcher.api.views import filter_bugs, project
+
+
+def raw_bug(bug_id, status="active", account="alice", **extra):
+    return {
+        "id": bug_id,
+        "title": f"Bug {bug_id}",
+        "status": status,
+        "severity": 2,
+        "pri": 3,
+        "assignedTo": {"id": 7, "account": account, "avatar": "", "realname": account.title()},
+        "openedBy": {"id": 1, "account": "bob", "realname": "Bob"},
+        "openedDate": "2024-01-01 10:00:00",
+        "lastEditedDate": "2024-01-02 10:00:00",
+        "steps": "<p>long html</p>",
+        "mailto": [],
+        **extra,
+    }
+
+
+class TestBug(unittest.TestCase):
+    def test_projects_needed_fields(self):
+        bug = Bug.from_zentao(raw_bug(1))
+        self.assertEqual(bug.to_dict(), {
+            "id": 1,
+            "title": "Bug 1",
+            "status": "active",
+            "severity": 2,
+            "pri": 3,
+            "openedBy": "bob",
+            "openedDate": "2024-01-01 10:00:00",
+            "lastEditedDate": "2024-01-02 10:00:00",
+            "assignedTo": {"account": "alice", "realname": "Alice"},
+        })
+        self.assertNotIn("steps", bug)
+        self.assertFalse(hasattr(bug, "__dict__"))
+
+    def test_extra_fields_are_configurable(self):
+        bug = Bug.from_zentao(raw_bug(1, deadline="2024-02-01"), extra_fields=["deadline", "missing"])
+        self.assertEqual(bug["deadline"], "2024-02-01")
+        self.assertEqual(bug.to_dict(["id", "deadline"]), {"id": 1, "deadline": "2024-02-01"})
+
+    def test_repeated_strings_are_interned(self):
+        first = Bug.from_zentao(json.loads(json.dumps(raw_bug(1))))
+        second = Bug.from_zentao(json.loads(json.dumps(raw_bug(2))))
+        self.assertIs(first.status, second.status)
+        self.assertIs(first.assigned_account, second.assigned_account)
+
+    def test_mapping_interface(self):
+        bug = Bug.from_zentao(raw_bug(1, account=""))
+        self.assertEqual(bug.get("assignedTo", ""), "")
+        self.assertEqual(bug.get("resolvedDate", "n/a"), "n/a")
+        with self.assertRaises(KeyError):
+            bug["resolvedDate"]
+        self.assertEqual(Bug.from_zentao({"id": 2, "assignedTo": "carol"})["assignedTo"]["account"], "carol")
+
+    def test_works_with_dict_based_pipeline(self):
+        bugs = [Bug.from_zentao(raw_bug(1)), Bug.from_zentao(raw_bug(2, status="resolved", account="bob"))]
+        self.assertEqual(assignee(bugs[1]), ("bob", "Bob"))
+        self.assertEqual([bug.id for bug in filter_bugs(bugs, status=["active"], assignee="alice")], [1])
+        self.assertEqual(project(bugs, ["id", "status"]), [{"id": 1, "status": "active"}, {"id": 2, "status": "resolved"}])
+
+        snapshot = BugSnapshot("1")
+        snapshot.replace(bugs)
+        changes = snapshot.merge([Bug.from_zentao(raw_bug(1))])
+        self.assertEqual(changes["changed"], [])
+        changes = snapshot.merge([Bug.from_zentao(raw_bug(2, title="Renamed"))])
+        self.assertEqual([bug.id for bug in changes["changed"]], [2])
+
+    def test_serialization(self):
+        bug = Bug.from_zentao(raw_bug(1))
+        self.assertEqual(json.loads(json.dumps({"bugs": [bug]}, default=json_default))["bugs"][0], bug.to_dict())
+        self.assertEqual(as_dict(bug), bug.to_dict())
+        self.assertEqual(Bug.from_zentao(bug.to_dict()), bug)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import os
+import json
+import socket
+import tempfile
+from bugfetcher.core import BugFetcherCore
+from bugfetcher.store import BugStore
+
+
+def make_bug(bug_id, account, status="active", severity=3, edited="2024-01-01 10:00:00"):
+    return {
+        "id": bug_id,
+        "title": f"Bug {bug_id}",
+        "status": status,
+        "severity": severity,
+        "openedDate": "2024-01-01 09:00:00",
+        "lastEditedDate": edited,
+        "assignedTo": {"account": account, "realname": account.title()},
+    }
+
+
+class TestBugStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = BugStore(os.path.join(self.tmpdir.name, "bugs.db"), batch_size=2)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_upsert_and_query(self):
+        self.store.upsert_bugs("1", [make_bug(i, "alice" if i % 2 else "bob") for i in range(1, 6)])
+        self.store.upsert_bugs("1", [make_bug(1, "alice", status="resolved")])
+
+        self.assertEqual(self.store.count_bugs("1"), 5)
+        mine = self.store.query_bugs(product_id="1", assigned_account="alice", status="active")
+        self.assertEqual([bug["id"] for bug in mine], [3, 5])
+        by_realname = self.store.query_bugs(assigned_realname="Bob")
+        self.assertEqual([bug["id"] for bug in by_realname], [2, 4])
+
+    def test_delete_and_sync_state(self):
+        self.store.upsert_bugs("1", [make_bug(1, "alice"), make_bug(2, "alice")])
+        self.store.delete_bugs("1", [1])
+        self.store.save_sync_state("1", "2024-01-01 10:00:00", 123.0)
+
+        self.assertEqual([bug["id"] for bug in self.store.query_bugs(product_id="1")], [2])
+        self.assertEqual(self.store.load_sync_state("1"), ("2024-01-01 10:00:00", 123.0))
+        self.assertIsNone(self.store.load_sync_state("2"))
+
+
+class TestCoreStoreFallback(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmpdir.name, "config.json")
+        with open(self.config_path, "w") as f:
+            json.dump({
+                "zentao_url": "http://zentao.example.com",
+                "zentao_token": "token",
+                "selected_product_id": "1",
+                "bug_store_path": os.path.join(self.tmpdir.name, "bugs.db"),
+            }, f)
+        store = BugStore(os.path.join(self.tmpdir.name, "bugs.db"))
+        store.upsert_bugs("1", [make_bug(1, "alice"), make_bug(2, "bob")])
+        store.save_sync_state("1", "2024-01-01 10:00:00", 1.0)
+        store.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_serves_from_store_when_zentao_fails(self):
+        core = BugFetcherCore(self.config_path)
+        core.user_realname = "Alice"
+
+        async def failing_request(*args, **kwargs):
+            return {"status": "error", "message": "down", "code": 502}
+
+        core.api_request = failing_request
+        result = await core.fetch_new_bugs()
+        core.close_store()
+
+        self.assertEqual(result["status"], "success")
+        self.assertTrue(result["stale"])
+        self.assertEqual([bug["id"] for bug in result["bugs"]], [1])
+
+    async def test_serves_from_store_when_token_expired_and_zentao_down(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]  # 关闭后无人监听，连接被拒绝
+        core = BugFetcherCore(self.config_path)
+        core.update_config({"zentao_url": f"http://127.0.0.1:{port}", "token_ttl": 100, "http_timeout": 2})
+        core.user_realname = "Alice"
+        core.tokens.obtained_at -= 200
+
+        result = await core.fetch_new_bugs()
+        await core.close()
+
+        self.assertEqual(result["status"], "success")
+        self.assertTrue(result["stale"])
+        self.assertEqual([bug["id"] for bug in result["bugs"]], [1])
+        self.assertEqual(core.zentao_token, "token")
+
+    async def test_my_open_bugs(self):
+        core = BugFetcherCore(self.config_path)
+        core.user_account = "bob"
+        bugs = await core.my_open_bugs("1")
+        core.close_store()
+        self.assertEqual([bug["id"] for bug in bugs], [2])
+
+
+if __name__ == "__main__":
+    unittest.main()